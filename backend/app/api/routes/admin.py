@@ -0,0 +1,82 @@
+import hmac
+from fastapi import APIRouter, Header, HTTPException
+from pydantic import BaseModel
+from typing import Optional
+from ..services.admission import admission_stats
+from ..services.executor import executor_stats
+from ..services.recommendation import (
+    list_versions, model_store, model_version, pipeline_timings, recommendation_cache, version_path
+)
+from ..services.tmdb import tmdb_breaker
+from ...core.config import settings
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+class ReloadRequest(BaseModel):
+    version: Optional[str] = None  # Saved version to serve; the serving artifact if omitted
+
+def _check_token(token: Optional[str]) -> None:
+    # Fail closed: without a configured token the admin routes are disabled
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API disabled; set ADMIN_TOKEN to enable it")
+    if token is None or not hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+def _model_state():
+    return {
+        "version": model_store.version,
+        "previous_version": model_version(model_store.previous) if model_store.previous is not None else None,
+        "reload": model_store.status
+    }
+
+@router.get("/model")
+def get_model_info(x_admin_token: Optional[str] = Header(None)):
+    """
+    Get the serving and previous model versions, reload status, saved versions,
+    recommendation cache counters, retrieval/re-rank stage timings and the
+    TMDB circuit breaker state
+    """
+    _check_token(x_admin_token)
+    return {
+        **_model_state(),
+        "available_versions": list_versions(),
+        "recommendation_cache": recommendation_cache.stats(),
+        "pipeline_timings": pipeline_timings.stats(),
+        "tmdb_circuit": tmdb_breaker.stats(),
+        "executors": executor_stats(),
+        "admission": admission_stats()
+    }
+
+@router.post("/model/reload", status_code=202)
+def reload_model(request: Optional[ReloadRequest] = None, x_admin_token: Optional[str] = Header(None)):
+    """
+    Load a model version in the background, warm it up and swap it in atomically
+
+    Requests keep being served by the current model until the swap; poll
+    GET /admin/model for the outcome.
+    """
+    _check_token(x_admin_token)
+    version = request.version if request else None
+    if version:
+        try:
+            if not version_path(version).exists():
+                raise HTTPException(status_code=404, detail=f"Model version {version} not found")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    try:
+        model_store.reload_in_background(version)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return _model_state()
+
+@router.post("/model/rollback")
+def rollback_model(x_admin_token: Optional[str] = Header(None)):
+    """
+    Swap back to the previously served model
+    """
+    _check_token(x_admin_token)
+    try:
+        model_store.rollback()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return _model_state()
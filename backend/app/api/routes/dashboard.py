@@ -1,69 +1,104 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Dict, List, Any
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Callable, Dict, List, Any, Optional, Tuple
 import numpy as np
-import pandas as pd
 from app.models.hybrid import HybridRecommender
-from ..services.recommendation import get_recommender_model
-from ...data.processor import DataProcessor
-from ...data.id_mapper import MovieIdMapper
+from ..services.executor import ExecutorSaturatedError, scoring_executor
+from ..services.recommendation import get_cached_recommendations, get_recommender_model, model_version
+from ...data.id_mapper import get_id_mapper
 from ..services.tmdb import TMDBService
+from ..serialization import dumps, encode_event, stream_media_type
+from ...core.logging import logger
 from app.core.config import settings
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 # Initialize services
 tmdb_service = TMDBService(api_key=settings.TMDB_API_KEY)
-id_mapper = MovieIdMapper()
-id_mapper.load_mappings()
 
 @router.get("/user/{user_id}")
-def get_user_dashboard(user_id: int, recommender: HybridRecommender = Depends(get_recommender_model)):
+async def get_user_dashboard(user_id: int,
+                       genres: Optional[List[str]] = Query(None, description="Only recommend these genres"),
+                       year_from: Optional[int] = Query(None, description="Earliest release year"),
+                       year_to: Optional[int] = Query(None, description="Latest release year"),
+                       accept: Optional[str] = Header(None),
+                       recommender: HybridRecommender = Depends(get_recommender_model)):
     """
     Get user dashboard data with recommendation analysis
+
+    With Accept: text/event-stream (e.g. from EventSource) or application/x-ndjson
+    each section is sent as an event named after it as soon as it is computed,
+    recommendations first, followed by an "end" event. Sections are computed on
+    the scoring executor, off the event loop.
     """
     try:
-        # Get recommendations with detailed scores
-        recommendations = recommender.get_recommendations(user_id, 24)
-        
-        # Process recommendations to include TMDB IDs
-        processed_recommendations = _process_recommendations_with_tmdb_ids(recommendations)
-        
+        recommender.build_filter_mask(genres, year_from, year_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    sections = _dashboard_sections(user_id, recommender, genres, year_from, year_to)
+    media_type = stream_media_type(accept)
+    if media_type is not None:
+        return StreamingResponse(_stream_sections(sections, media_type), media_type=media_type,
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    
+    try:
+        return await scoring_executor.run(lambda: {name: compute() for name, compute in sections})
+    except ExecutorSaturatedError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=f"Error generating dashboard: {str(e)}")
+
+def _dashboard_sections(user_id: int, recommender: HybridRecommender, genres: Optional[List[str]],
+                        year_from: Optional[int], year_to: Optional[int]) -> List[Tuple[str, Callable[[], Any]]]:
+    """Dashboard sections in display order, each computed on demand"""
+    return [
+        # Get recommendations with detailed scores, including TMDB IDs
+        ("recommendations", lambda: _process_recommendations_with_tmdb_ids(get_cached_recommendations(
+            recommender, user_id, 24, genres=genres, year_from=year_from, year_to=year_to
+        ))),
         # Analyze favorite genres
-        genre_preferences = _analyze_genre_preferences(user_id, recommender)
-        
+        ("genre_preferences", lambda: _analyze_genre_preferences(user_id, recommender)),
         # Get user factors (latent space representation)
-        user_factors = _get_user_factors(user_id, recommender)
-        
+        ("user_factors", lambda: _get_user_factors(user_id, recommender)),
         # Get similar users
-        similar_users = _get_similar_users(user_id, recommender)
-        
+        ("similar_users", lambda: _get_similar_users(user_id, recommender)),
         # Get content-based keyword analysis
-        content_keywords = _analyze_content_keywords(user_id, recommender)
-        
-        return {
-            "recommendations": processed_recommendations,
-            "genre_preferences": genre_preferences,
-            "user_factors": user_factors,
-            "similar_users": similar_users,
-            "content_keywords": content_keywords
-        }
+        ("content_keywords", lambda: _analyze_content_keywords(user_id, recommender)),
+        # Get item-item "because you watched" recommendations
+        ("because_you_watched", lambda: _get_because_you_watched(user_id, recommender)),
+        ("model_version", lambda: model_version(recommender)),
+    ]
+
+async def _stream_sections(sections: List[Tuple[str, Callable[[], Any]]], media_type: str) -> AsyncIterator[bytes]:
+    """Compute and emit dashboard sections one by one, then an "end" event"""
+    try:
+        for name, compute in sections:
+            yield encode_event(name, dumps(await scoring_executor.run(compute)), media_type)
+        yield encode_event("end", b"{}", media_type)
     except Exception as e:
-        raise HTTPException(status_code=404, detail=f"Error generating dashboard: {str(e)}")
+        logger.error(f"Error streaming dashboard: {str(e)}")
+        yield encode_event("error", dumps({"detail": f"Error generating dashboard: {str(e)}"}), media_type)
 
 def _analyze_genre_preferences(user_id: int, recommender: HybridRecommender) -> Dict[str, float]:
-    """Analyze user's genre preferences based on recommendations"""
+    """Analyze user's genre preferences based on their own ratings"""
     try:
-        # Get all movies rated by the user
+        # Rating-weighted genre profile computed at train time: one row read
+        preferences = recommender.get_genre_preferences(user_id)
+        if preferences is not None:
+            return preferences
+        
+        # Models without genre profiles: count genres of the user's recommendations
         user_idx = recommender.collab_model.user_idx_map.get(user_id)
         if user_idx is None:
             return {}
             
         # Process genres from user's recommendations
-        recs = recommender.get_recommendations(user_id, 50)
+        recs = get_cached_recommendations(recommender, user_id, 50)
         all_genres = []
         for rec in recs:
             genres = rec['genres'].split('|')
-            all_genres.extend(genres)
+            all_genres.extend(genre for genre in genres if genre)
             
         # Calculate genre frequency
         genre_counts = {}
@@ -128,64 +163,40 @@ def _analyze_content_keywords(user_id: int, recommender: HybridRecommender) -> D
     """Analyze top keywords from content-based model for the user's recommendations"""
     try:
         # Get recommendations
-        recs = recommender.get_recommendations(user_id, 10)
+        recs = get_cached_recommendations(recommender, user_id, 10)
         
         # If no recommendations, return empty
         if not recs:
             return {}
         
-        # Get TF-IDF feature names if available
-        if not hasattr(recommender.content_model, 'vectorizer') or not recommender.content_model.vectorizer:
-            return {}
-            
-        # Get feature names (words) from the vectorizer
-        try:
-            feature_names = recommender.content_model.vectorizer.get_feature_names_out()
-        except:
-            # Fallback for older sklearn versions
-            feature_names = recommender.content_model.vectorizer.get_feature_names()
+        # Keywords per movie are precomputed at train time; the profile is one sparse row-sum
+        rows = recommender.filter_index.positions([rec['movieId'] for rec in recs])
+        return recommender.content_model.keyword_profile(rows, 15)
+    except Exception as e:
+        logger.error(f"Error analyzing content keywords: {str(e)}")
+        return {}
+
+def _get_because_you_watched(user_id: int, recommender: HybridRecommender) -> List[Dict[str, Any]]:
+    """Get item-item recommendations with the watched movie that triggered each"""
+    try:
+        recs = recommender.get_because_you_watched(user_id, 12)
+        if not recs:
+            return []
         
-        # Calculate average importance of each keyword across recommended movies
-        keyword_scores = {}
+        # Resolve titles for recommended and source movies in one lookup
+        movie_ids = {rec["movieId"] for rec in recs} | {rec["because_of"] for rec in recs}
+        titles = recommender.get_movie_titles(list(movie_ids))
         
-        # For each recommended movie
+        results = []
         for rec in recs:
-            movie_id = rec['movieId']
-            
-            # Get the movie's index in the TF-IDF matrix
-            if movie_id not in recommender.content_model.movie_to_idx:
-                continue
-                
-            idx = recommender.content_model.movie_to_idx[movie_id]
-            
-            # Get the movie's TF-IDF vector
-            movie_vector = recommender.content_model.tfidf_matrix[idx].toarray()[0]
-            
-            # Get top keywords for this movie
-            top_keyword_indices = movie_vector.argsort()[-20:][::-1]
-            
-            # Add to the total score for each keyword
-            for i in top_keyword_indices:
-                if movie_vector[i] > 0:  # Only consider non-zero values
-                    keyword = feature_names[i]
-                    if keyword.isalpha() and len(keyword) > 2:  # Filter out non-word tokens
-                        if keyword not in keyword_scores:
-                            keyword_scores[keyword] = 0
-                        keyword_scores[keyword] += movie_vector[i]
-        
-        # Sort by score and take top 15
-        sorted_keywords = dict(sorted(keyword_scores.items(), key=lambda x: x[1], reverse=True)[:15])
-        
-        # Normalize scores
-        total = sum(sorted_keywords.values())
-        if total > 0:
-            normalized_keywords = {k: v/total for k, v in sorted_keywords.items()}
-            return normalized_keywords
-            
-        return sorted_keywords
-    except Exception as e:
-        print(f"Error analyzing content keywords: {e}")
-        return {}
+            results.append({
+                **rec,
+                "title": titles.get(rec["movieId"], ""),
+                "because_of_title": titles.get(rec["because_of"], "")
+            })
+        return _process_recommendations_with_tmdb_ids(results)
+    except Exception:
+        return []
 
 def _process_recommendations_with_tmdb_ids(recommendations):
     """
@@ -199,14 +210,14 @@ def _process_recommendations_with_tmdb_ids(recommendations):
     """
     processed_recommendations = []
     
-    for rec in recommendations:
-        movielens_id = rec["movieId"]
-        tmdb_id = id_mapper.get_tmdb_id(movielens_id)
-        
-        if tmdb_id:
+    # Map all IDs in one vectorized lookup
+    tmdb_ids = get_id_mapper().get_tmdb_ids([rec["movieId"] for rec in recommendations])
+    
+    for rec, tmdb_id in zip(recommendations, tmdb_ids):
+        if tmdb_id > 0:
             # Create a copy of the recommendation with TMDB ID added
             processed_rec = rec.copy()
-            processed_rec["id"] = tmdb_id  # Add TMDB ID for frontend compatibility
+            processed_rec["id"] = int(tmdb_id)  # Add TMDB ID for frontend compatibility
             processed_recommendations.append(processed_rec)
     
     return processed_recommendations
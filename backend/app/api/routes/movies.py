@@ -3,7 +3,11 @@ from typing import List, Optional, Dict, Callable
 from pydantic import BaseModel
 from functools import lru_cache
 import time
-from ..services.tmdb import TMDBService
+from ..services.executor import ExecutorSaturatedError, io_executor
+from ..services.single_flight import SingleFlightCache
+from ..services.tmdb import TMDBService, TMDBUnavailableError
+from ..serialization import FragmentCache, RawJSONResponse, dumps, encode_array, loads
+from ...data.search_index import get_search_index
 from ...core.config import settings
 from ...core.logging import logger
 
@@ -15,6 +19,15 @@ tmdb_service = TMDBService(api_key=settings.TMDB_API_KEY)
 cache = {}
 cache_ttl = {}
 CACHE_DURATION = 300  # 5 minutes cache
+SEARCH_PAGE_SIZE = 20  # Matches TMDB's page size
+DEGRADED_HEADERS = {"X-Degraded": "tmdb"}  # Marks responses built from local data while TMDB is unavailable
+
+# Encoded per-movie JSON objects, keyed by TMDB ID
+movie_fragments = FragmentCache(max_entries=20000, ttl=CACHE_DURATION)
+
+# Encoded details, credits and videos from one append_to_response fetch, keyed by TMDB ID;
+# the detail page's concurrent requests for one movie share a single upstream call
+movie_bundles = SingleFlightCache(max_entries=5000, ttl=CACHE_DURATION)
 
 # Data models for API responses
 class Movie(BaseModel):
@@ -23,8 +36,10 @@ class Movie(BaseModel):
     overview: str
     poster_path: Optional[str]
     release_date: Optional[str]
-    vote_average: float
+    vote_average: Optional[float]  # TMDB's; None when served from local data
     genres: List[str]
+    ml_rating_10: Optional[float] = None  # MovieLens mean rating doubled to 0-10; set on local data
+    year: Optional[int] = None  # Release year from movies.csv; set on local data
 
 class CastMember(BaseModel):
     id: int
@@ -50,6 +65,11 @@ class Video(BaseModel):
     site: str
     type: str
 
+class MovieFull(BaseModel):
+    movie: Movie
+    credits: MovieCredits
+    videos: List[Video]
+
 # Helper functions
 def get_cached_data(key: str, fetch_func: Callable, ttl: int = CACHE_DURATION):
     """
@@ -80,15 +100,18 @@ def get_cached_data(key: str, fetch_func: Callable, ttl: int = CACHE_DURATION):
     
     return data
 
-def process_movie_data(movie: Dict) -> Movie:
+def process_movie_data(movie: Dict) -> Dict:
     """
-    Convert raw TMDB movie data to our Movie model
+    Convert raw TMDB movie data to the Movie response shape
+    
+    The result is trusted internal data and is encoded without Pydantic
+    validation; the Movie model documents its shape.
     
     Args:
         movie: Raw movie data from TMDB
         
     Returns:
-        Processed Movie object
+        Movie fields as a dict
     """
     # Extract genres based on whether we have genre_ids or genres
     genres = []
@@ -97,29 +120,252 @@ def process_movie_data(movie: Dict) -> Movie:
     elif "genres" in movie:
         genres = [genre["name"] for genre in movie["genres"]]
     
-    # Create Movie object with standardized data
-    return Movie(
-        id=movie["id"],
-        title=movie["title"],
-        overview=movie["overview"],
-        poster_path=tmdb_service.get_poster_url(movie["poster_path"]),
-        release_date=movie.get("release_date"),  # Use get() for optional fields
-        vote_average=movie["vote_average"],
-        genres=genres
-    )
+    # Create movie dict with standardized data
+    return {
+        "id": movie["id"],
+        "title": movie["title"],
+        "overview": movie["overview"],
+        "poster_path": tmdb_service.get_poster_url(movie["poster_path"]),
+        "release_date": movie.get("release_date"),  # Use get() for optional fields
+        "vote_average": movie["vote_average"],
+        "genres": genres
+    }
 
-@router.get("/movies/popular", response_model=List[Movie])
-async def get_popular_movies(page: int = Query(1, ge=1), limit: int = Query(None, description="Limit the number of results")):
+def movie_fragment(movie: Dict) -> bytes:
     """
-    Get list of popular movies from TMDB with optimized performance
+    Get the encoded Movie JSON for raw TMDB movie data, encoding it once per TTL
     
     Args:
-        page: Page number for pagination
-        limit: Optional limit for number of movies to return
+        movie: Raw movie data from TMDB
         
     Returns:
-        List of popular movies
+        Encoded JSON object
+    """
+    return movie_fragments.get(movie["id"], lambda: process_movie_data(movie))
+
+def local_movie_data(result: Dict, degraded: bool = False) -> Dict:
+    """
+    Convert a local search index result to the Movie response shape
+    
+    Overview, poster and release date are taken from the movie's cached TMDB
+    fragment when there is one; otherwise they are empty, and the year from
+    movies.csv is the only date.
+    
+    Args:
+        result: Result dict from the title search index (movies.csv data)
+        degraded: Flag the movie as a stand-in for TMDB details
+        
+    Returns:
+        Movie fields as a dict; the MovieLens rating is in ml_rating_10 and
+        vote_average is TMDB's, None unless cached
+    """
+    movie = {
+        "id": result["id"],
+        "title": result["title"],
+        "overview": "",
+        "poster_path": None,
+        "release_date": None,
+        "vote_average": None,
+        "genres": result["genres"],
+        "ml_rating_10": result["ml_rating_10"],
+        "year": result["year"]
+    }
+    cached = movie_fragments.peek(result["id"])
+    if cached is not None:
+        details = loads(cached)
+        for field in ("overview", "poster_path", "release_date", "vote_average"):
+            movie[field] = details[field]
+    if degraded:
+        movie["degraded"] = True
+    return movie
+
+def movie_fragment_by_id(tmdb_id: int) -> bytes:
+    """
+    Get the encoded Movie JSON for a TMDB ID, fetching details only on a miss
+    
+    While TMDB is unavailable (circuit open, timeouts) the title, genres and
+    year from movies.csv are returned instead, flagged "degraded" and not
+    cached, so full details come back as soon as TMDB does.
+    
+    Args:
+        tmdb_id: TMDB movie ID
+        
+    Returns:
+        Encoded JSON object
+        
+    Raises:
+        TMDBUnavailableError: If TMDB is unavailable and the movie is not in movies.csv
+    """
+    try:
+        return movie_fragments.get(tmdb_id, lambda: process_movie_data(tmdb_service.get_movie_details(tmdb_id)))
+    except TMDBUnavailableError:
+        local = get_search_index().get_movie(tmdb_id)
+        if local is None:
+            raise
+        return dumps(local_movie_data(local, degraded=True))
+
+def movie_media(tmdb_id: int) -> Dict:
+    """
+    TMDB-only fields of a movie: overview, poster, release date and vote average
+    
+    Title, genres and year come from the model's metadata store; TMDB is only
+    asked for what the dataset lacks, and the answer is cached per movie.
+    
+    Args:
+        tmdb_id: TMDB movie ID
+        
+    Returns:
+        Dict with overview, poster_path, release_date and vote_average, or an empty dict
+        while TMDB is unavailable or doesn't know the movie
     """
+    try:
+        movie = loads(movie_fragment_by_id(tmdb_id))
+    except Exception as e:
+        logger.warning(f"No TMDB details for movie {tmdb_id}: {str(e)}")
+        return {}
+    if movie.get("degraded"):
+        return {}
+    return {
+        "overview": movie["overview"], "poster_path": movie["poster_path"], "release_date": movie["release_date"],
+        "vote_average": movie["vote_average"]
+    }
+
+def process_credits_data(credits: Dict) -> Dict:
+    """
+    Convert raw TMDB credits to the MovieCredits response shape
+    
+    Args:
+        credits: Raw credits data from TMDB
+        
+    Returns:
+        Dict with cast and crew lists
+    """
+    return {
+        "cast": [
+            {
+                "id": member["id"],
+                "name": member["name"],
+                "character": member["character"],
+                "profile_path": tmdb_service.get_poster_url(member["profile_path"])
+            }
+            for member in credits["cast"]
+        ],
+        "crew": [
+            {
+                "id": member["id"],
+                "name": member["name"],
+                "job": member["job"],
+                "department": member["department"],
+                "profile_path": tmdb_service.get_poster_url(member["profile_path"])
+            }
+            for member in credits["crew"]
+        ]
+    }
+
+def process_videos_data(videos: Dict) -> List[Dict]:
+    """
+    Convert raw TMDB videos to the Video response shape
+    
+    Args:
+        videos: Raw videos data from TMDB
+        
+    Returns:
+        List of video dicts
+    """
+    return [
+        {
+            "id": video["id"],
+            "key": video["key"],
+            "name": video["name"],
+            "site": video["site"],
+            "type": video["type"]
+        }
+        for video in videos["results"]
+    ]
+
+def fetch_movie_bundle(movie_id: int) -> Dict[str, bytes]:
+    """
+    Fetch details, credits and videos in one TMDB call and encode each part
+    
+    The details part also refreshes the per-movie fragment cache.
+    
+    Args:
+        movie_id: TMDB movie ID
+        
+    Returns:
+        Dict with encoded "movie", "credits" and "videos" fragments
+    """
+    raw = tmdb_service.get_movie_full(movie_id)
+    bundle = {
+        "movie": dumps(process_movie_data(raw)),
+        "credits": dumps(process_credits_data(raw.get("credits") or {"cast": [], "crew": []})),
+        "videos": dumps(process_videos_data(raw.get("videos") or {"results": []}))
+    }
+    movie_fragments.put(movie_id, bundle["movie"])
+    return bundle
+
+def movie_bundle(movie_id: int) -> Dict[str, bytes]:
+    """
+    Get the cached movie bundle, fetching it once on a miss
+    
+    Args:
+        movie_id: TMDB movie ID
+        
+    Returns:
+        Dict with encoded "movie", "credits" and "videos" fragments
+        
+    Raises:
+        TMDBUnavailableError: If the bundle is not cached and TMDB is unavailable
+    """
+    return movie_bundles.get(movie_id, lambda: fetch_movie_bundle(movie_id))
+
+def degraded_movie_bundle(movie_id: int) -> Dict[str, bytes]:
+    """
+    Build a bundle from local data while TMDB is unavailable; never cached
+    
+    Args:
+        movie_id: TMDB movie ID
+        
+    Returns:
+        Dict with the local "movie" fragment and empty "credits" and "videos"
+        
+    Raises:
+        TMDBUnavailableError: If the movie is not in movies.csv either
+    """
+    local = get_search_index().get_movie(movie_id)
+    if local is None:
+        raise TMDBUnavailableError(f"TMDB is unavailable and movie {movie_id} is not known locally")
+    return {
+        "movie": dumps(local_movie_data(local, degraded=True)),
+        "credits": b'{"cast":[],"crew":[]}',
+        "videos": b"[]"
+    }
+
+def movie_bundle_response(movie_id: int, build: Callable[[Dict[str, bytes]], bytes]) -> RawJSONResponse:
+    """
+    Answer from the movie bundle, degrading to local data if TMDB is unavailable
+    
+    Args:
+        movie_id: TMDB movie ID
+        build: Assembles the response body from the bundle's fragments
+        
+    Returns:
+        Response with the assembled body; degraded responses carry X-Degraded
+        
+    Raises:
+        HTTPException: 503 if TMDB is unavailable and the movie is unknown locally
+    """
+    try:
+        return RawJSONResponse(build(movie_bundle(movie_id)))
+    except TMDBUnavailableError:
+        pass
+    try:
+        return RawJSONResponse(build(degraded_movie_bundle(movie_id)), headers=DEGRADED_HEADERS)
+    except TMDBUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+def _popular_movies(page: int, limit: Optional[int]):
+    """Blocking part of get_popular_movies, run on the I/O executor"""
     try:
         # Create a unique cache key based on parameters
         cache_key = f"popular_movies_page{page}_limit{limit}"
@@ -129,34 +375,73 @@ async def get_popular_movies(page: int = Query(1, ge=1), limit: int = Query(None
             return tmdb_service.get_popular_movies(page=page)
         
         # Get data from cache or fetch it
-        response = get_cached_data(cache_key, fetch_data)
+        try:
+            response = get_cached_data(cache_key, fetch_data)
+        except TMDBUnavailableError:
+            # Most-rated local movies instead of waiting on TMDB
+            local = get_search_index().most_popular((page - 1) * SEARCH_PAGE_SIZE, limit or SEARCH_PAGE_SIZE)
+            return RawJSONResponse(dumps([local_movie_data(movie, degraded=True) for movie in local]),
+                                   headers=DEGRADED_HEADERS)
         
         # Apply optional limit
         results = response["results"]
         if limit:
             results = results[:limit]
         
-        # Process all movies at once and return
-        return [process_movie_data(movie) for movie in results]
+        # Assemble the response from cached per-movie fragments
+        return RawJSONResponse(encode_array(movie_fragment(movie) for movie in results))
     
     except Exception as e:
         logger.error(f"Error fetching popular movies: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/movies/search", response_model=List[Movie])
-async def search_movies(query: str, page: int = Query(1, ge=1), limit: int = Query(None, description="Limit the number of results")):
+@router.get("/movies/popular", response_model=List[Movie])
+async def get_popular_movies(page: int = Query(1, ge=1), limit: int = Query(None, description="Limit the number of results")):
     """
-    Search movies by title
+    Get list of popular movies from TMDB with optimized performance
+    
+    Args:
+        page: Page number for pagination
+        limit: Optional limit for number of movies to return
+        
+    Returns:
+        List of popular movies
+    """
+    # TMDB calls block, so they run on the I/O executor instead of the event loop
+    return await io_executor.run(_popular_movies, page, limit)
+
+def search_local_movies(query: str, page: int, limit: Optional[int], complete_only: bool = True) -> Optional[List[Dict]]:
+    """
+    Search the local title index built from movies.csv
     
     Args:
         query: Search term
         page: Page number for pagination
         limit: Optional limit for number of movies to return
+        complete_only: Only accept titles containing every query token; typo and
+            partial matches are too weak to answer for TMDB
         
     Returns:
-        List of movies matching the search
+        Page of matching movies, possibly empty past the last local page, or None
+        if the local index has no match for the query on any page
     """
+    results = get_search_index().search(query, limit=page * SEARCH_PAGE_SIZE, complete_only=complete_only)
+    if not results:
+        return None
+    results = results[(page - 1) * SEARCH_PAGE_SIZE:]
+    if limit:
+        results = results[:limit]
+    return [local_movie_data(result) for result in results]
+
+def _search_movies(query: str, page: int, limit: Optional[int]):
+    """Blocking part of search_movies, run on the I/O executor"""
     try:
+        # Whether the index answers a query doesn't depend on the page, so every page
+        # of one query comes from the same source
+        local_results = search_local_movies(query, page, limit)
+        if local_results is not None:
+            return RawJSONResponse(dumps(local_results))
+        
         # Create a unique cache key based on parameters
         cache_key = f"search_movies_query{query}_page{page}_limit{limit}"
         
@@ -165,7 +450,12 @@ async def search_movies(query: str, page: int = Query(1, ge=1), limit: int = Que
             return tmdb_service.search_movies(query=query, page=page)
         
         # Get data from cache or fetch it
-        response = get_cached_data(cache_key, fetch_data)
+        try:
+            response = get_cached_data(cache_key, fetch_data)
+        except TMDBUnavailableError:
+            # TMDB can't be asked now: typo and partial local matches are better than nothing
+            weak_results = search_local_movies(query, page, limit, complete_only=False) or []
+            return RawJSONResponse(dumps(weak_results), headers=DEGRADED_HEADERS)
         
         # Apply optional limit
         results = response["results"]
@@ -174,12 +464,28 @@ async def search_movies(query: str, page: int = Query(1, ge=1), limit: int = Que
             
         # Process movies without individual API calls
         # Use genre_ids instead of fetching details for each movie
-        return [process_movie_data(movie) for movie in results]
+        return RawJSONResponse(encode_array(movie_fragment(movie) for movie in results))
         
     except Exception as e:
         logger.error(f"Error searching movies: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/movies/search", response_model=List[Movie])
+async def search_movies(query: str, page: int = Query(1, ge=1), limit: int = Query(None, description="Limit the number of results")):
+    """
+    Search movies by title, using the local index when a title contains every query token and TMDB otherwise
+    
+    Args:
+        query: Search term
+        page: Page number for pagination
+        limit: Optional limit for number of movies to return
+        
+    Returns:
+        List of movies matching the search
+    """
+    # TMDB calls block, so they run on the I/O executor instead of the event loop
+    return await io_executor.run(_search_movies, query, page, limit)
+
 @router.get("/movies/{movie_id}", response_model=Movie)
 async def get_movie_details(movie_id: int):
     """
@@ -192,19 +498,10 @@ async def get_movie_details(movie_id: int):
         Detailed movie information
     """
     try:
-        # Create cache key for this movie
-        cache_key = f"movie_details_{movie_id}"
-        
-        # Define function to fetch data if cache miss
-        def fetch_data():
-            return tmdb_service.get_movie_details(movie_id)
-        
-        # Get data from cache or fetch it
-        movie = get_cached_data(cache_key, fetch_data)
-        
-        # Process and return movie data
-        return process_movie_data(movie)
-        
+        # TMDB calls block, so they run on the I/O executor instead of the event loop
+        return await io_executor.run(movie_bundle_response, movie_id, lambda bundle: bundle["movie"])
+    except (HTTPException, ExecutorSaturatedError):
+        raise
     except Exception as e:
         logger.error(f"Error fetching movie details: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -221,38 +518,10 @@ async def get_movie_credits(movie_id: int):
         Cast and crew information
     """
     try:
-        # Create cache key for movie credits
-        cache_key = f"movie_credits_{movie_id}"
-        
-        # Define function to fetch data if cache miss
-        def fetch_data():
-            return tmdb_service.get_movie_credits(movie_id)
-        
-        # Get data from cache or fetch it
-        credits = get_cached_data(cache_key, fetch_data)
-        
-        # Process and return the credits information
-        return MovieCredits(
-            cast=[
-                CastMember(
-                    id=member["id"],
-                    name=member["name"],
-                    character=member["character"],
-                    profile_path=tmdb_service.get_poster_url(member["profile_path"])
-                )
-                for member in credits["cast"]
-            ],
-            crew=[
-                CrewMember(
-                    id=member["id"],
-                    name=member["name"],
-                    job=member["job"],
-                    department=member["department"],
-                    profile_path=tmdb_service.get_poster_url(member["profile_path"])
-                )
-                for member in credits["crew"]
-            ]
-        )
+        # TMDB calls block, so they run on the I/O executor instead of the event loop
+        return await io_executor.run(movie_bundle_response, movie_id, lambda bundle: bundle["credits"])
+    except (HTTPException, ExecutorSaturatedError):
+        raise
     except Exception as e:
         logger.error(f"Error fetching movie credits: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -269,27 +538,37 @@ async def get_movie_videos(movie_id: int):
         List of video information
     """
     try:
-        # Create cache key for movie videos
-        cache_key = f"movie_videos_{movie_id}"
-        
-        # Define function to fetch data if cache miss
-        def fetch_data():
-            return tmdb_service.get_movie_videos(movie_id)
-        
-        # Get data from cache or fetch it
-        videos = get_cached_data(cache_key, fetch_data)
-        
-        # Process and return video information
-        return [
-            Video(
-                id=video["id"],
-                key=video["key"],
-                name=video["name"],
-                site=video["site"],
-                type=video["type"]
-            )
-            for video in videos["results"]
-        ]
+        # TMDB calls block, so they run on the I/O executor instead of the event loop
+        return await io_executor.run(movie_bundle_response, movie_id, lambda bundle: bundle["videos"])
+    except (HTTPException, ExecutorSaturatedError):
+        raise
     except Exception as e:
         logger.error(f"Error fetching movie videos: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/movies/{movie_id}/full", response_model=MovieFull)
+async def get_movie_full(movie_id: int):
+    """
+    Get details, credits and videos for a movie in one response
+    
+    All three come from a single TMDB request (append_to_response) cached as
+    one record, so a detail page view costs at most one upstream call.
+    
+    Args:
+        movie_id: TMDB movie ID
+        
+    Returns:
+        Object with "movie", "credits" and "videos"
+    """
+    try:
+        return await io_executor.run(
+            movie_bundle_response,
+            movie_id,
+            lambda bundle: b'{"movie":' + bundle["movie"] + b',"credits":' + bundle["credits"]
+                           + b',"videos":' + bundle["videos"] + b"}"
+        )
+    except (HTTPException, ExecutorSaturatedError):
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching full movie details: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
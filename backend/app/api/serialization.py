@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+
+    def dumps(content: Any) -> bytes:
+        """Encode content to JSON bytes (orjson, with NumPy support)"""
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    import json
+
+    def _default(value: Any):
+        if hasattr(value, "tolist"):
+            return value.tolist()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    def dumps(content: Any) -> bytes:
+        """Encode content to JSON bytes (stdlib fallback)"""
+        return json.dumps(content, separators=(",", ":"), default=_default).encode("utf-8")
+
+    loads = json.loads
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+class RawJSONResponse(Response):
+    """
+    Response for content that is already encoded JSON bytes
+
+    Returning a Response from a route skips FastAPI's response_model validation
+    and jsonable_encoder pass, so use it only for trusted internal data.
+    """
+    media_type = "application/json"
+
+def encode_array(fragments: Iterable[bytes]) -> bytes:
+    """
+    Join pre-encoded JSON values into a JSON array
+    Args:
+        fragments: Encoded JSON values
+    Returns:
+        Encoded JSON array
+    """
+    return b"[" + b",".join(fragments) + b"]"
+
+def extend_fragment(fragment: bytes, extra: Dict[str, Any]) -> bytes:
+    """
+    Add fields to a pre-encoded JSON object without decoding it
+    Args:
+        fragment: Encoded JSON object
+        extra: Fields to append; must not repeat keys already in the fragment
+    Returns:
+        Encoded JSON object with the extra fields
+    """
+    if not extra:
+        return fragment
+    encoded = dumps(extra)
+    if fragment == b"{}":
+        return encoded
+    return fragment[:-1] + b"," + encoded[1:]
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+def stream_media_type(accept: Optional[str]) -> Optional[str]:
+    """
+    Streaming format requested through an Accept header
+    Args:
+        accept: Accept header value
+    Returns:
+        NDJSON_MEDIA_TYPE or SSE_MEDIA_TYPE, or None for a plain JSON response
+    """
+    if not accept:
+        return None
+    for media_type in (SSE_MEDIA_TYPE, NDJSON_MEDIA_TYPE):
+        if media_type in accept:
+            return media_type
+    return None
+
+def encode_event(event: str, fragment: bytes, media_type: str) -> bytes:
+    """
+    Frame one pre-encoded JSON value for a streaming response
+    Args:
+        event: Event name (e.g. "recommendation", "end")
+        fragment: Encoded JSON value
+        media_type: NDJSON_MEDIA_TYPE or SSE_MEDIA_TYPE
+    Returns:
+        An SSE event, or an NDJSON line {"event": ..., "data": ...}
+    """
+    if media_type == SSE_MEDIA_TYPE:
+        return b"event: " + event.encode("utf-8") + b"\ndata: " + fragment + b"\n\n"
+    return b'{"event":' + dumps(event) + b',"data":' + fragment + b"}\n"
+
+class FragmentCache:
+    """Thread-safe LRU cache of encoded JSON fragments with a TTL"""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> bytes:
+        """
+        Get an encoded fragment, building and encoding it on a miss
+        Args:
+            key: Cache key
+            build: Returns the (trusted) value to encode on a miss
+        Returns:
+            Encoded JSON bytes
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        fragment = dumps(build())
+        self.put(key, fragment)
+        return fragment
+
+    def peek(self, key: Hashable) -> Optional[bytes]:
+        """
+        Get a cached fragment without building it on a miss
+        Args:
+            key: Cache key
+        Returns:
+            Encoded JSON bytes, or None if the key is not cached or has expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+        return None
+
+    def put(self, key: Hashable, fragment: bytes) -> None:
+        """
+        Store an already encoded fragment
+        Args:
+            key: Cache key
+            fragment: Encoded JSON bytes
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, fragment)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
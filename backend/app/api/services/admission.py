@@ -0,0 +1,208 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Collection, Dict, Optional, Sequence
+from ..serialization import FastJSONResponse
+from ...core.config import settings
+
+TIER_CHEAP = "cheap"
+TIER_EXPENSIVE = "expensive"
+
+class RateLimiter:
+    """
+    Token-bucket rate limit per client
+
+    Each client gets a bucket of `burst` tokens refilled at `rate` tokens per
+    second; a request takes one token or is rejected. A bucket is two floats
+    refilled lazily when the client calls, so a check is O(1). Buckets live in
+    an LRU of at most max_clients entries; an evicted client starts over with
+    a full bucket, which only ever errs towards admitting.
+    """
+
+    def __init__(self, rate: float, burst: int, max_clients: int = 10000):
+        """
+        Initialize the limiter
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity, i.e. requests allowed back to back
+            max_clients: Buckets kept before the least recently seen is dropped
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    def acquire(self, client: str) -> float:
+        """
+        Take a token from a client's bucket
+        Args:
+            client: Client key (API key or address)
+        Returns:
+            0 if the request is admitted, otherwise seconds until a token is available
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = [float(self.burst), now]
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                self.allowed += 1
+                return 0.0
+            self.rejected += 1
+            return (1 - bucket[0]) / self.rate
+
+    def stats(self) -> Dict[str, Any]:
+        """Limits, tracked clients and admission counters"""
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "clients": len(self._buckets),
+                "allowed": self.allowed,
+                "rejected": self.rejected
+            }
+
+class ConcurrencyLimiter:
+    """Non-blocking cap on requests in flight; a request over the cap is rejected, not queued"""
+
+    def __init__(self, limit: int):
+        """
+        Initialize the limiter
+        Args:
+            limit: Requests allowed in flight at once
+        """
+        self.limit = limit
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.rejected = 0
+
+    def try_acquire(self) -> bool:
+        """Take a slot; False if all are taken"""
+        with self._lock:
+            if self.in_flight >= self.limit:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            return True
+
+    def release(self) -> None:
+        """Give back a slot taken by try_acquire"""
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Limit, current and peak requests in flight, and rejections"""
+        with self._lock:
+            return {"limit": self.limit, "in_flight": self.in_flight, "peak": self.peak, "rejected": self.rejected}
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware admitting requests by client rate and model concurrency
+
+    Requests under `expensive_prefixes` (model-backed routes) take a token from
+    the client's expensive budget and a slot of the global concurrency limit,
+    held until the response, including a stream, is fully sent. Other requests
+    take a token from the cheap budget; `exempt_prefixes` (health checks) skip
+    admission. Clients are identified by their API key header if the key is
+    on the allow-list, else by their address, so sending made-up keys does not
+    buy fresh buckets. Rate-limited requests get 429 and concurrency-limited ones 503,
+    both with Retry-After.
+    """
+
+    def __init__(self, app, cheap: RateLimiter, expensive: RateLimiter, concurrency: ConcurrencyLimiter,
+                 expensive_prefixes: Sequence[str], exempt_prefixes: Sequence[str] = (),
+                 api_key_header: str = "x-api-key", api_keys: Collection[str] = (), enabled: bool = True):
+        """
+        Wrap an ASGI app
+        Args:
+            app: The wrapped application
+            cheap: Per-client budget of the other routes
+            expensive: Per-client budget of the model-backed routes
+            concurrency: Global limit of model-backed requests in flight
+            expensive_prefixes: Path prefixes of the model-backed routes
+            exempt_prefixes: Path prefixes never limited
+            api_key_header: Header identifying a client, lower case
+            api_keys: Keys that get their own budget; other keys count against the address
+            enabled: False passes every request through
+        """
+        self.app = app
+        self.limiters = {TIER_CHEAP: cheap, TIER_EXPENSIVE: expensive}
+        self.concurrency = concurrency
+        self.expensive_prefixes = tuple(expensive_prefixes)
+        self.exempt_prefixes = tuple(exempt_prefixes)
+        self.api_key_header = api_key_header.encode("latin-1")
+        self.api_keys = frozenset(key.encode("latin-1") for key in api_keys)
+        self.enabled = enabled
+
+    def tier(self, path: str) -> Optional[str]:
+        """Budget a path is charged to, None if exempt"""
+        if path.startswith(self.exempt_prefixes):
+            return None
+        return TIER_EXPENSIVE if path.startswith(self.expensive_prefixes) else TIER_CHEAP
+
+    def client_key(self, scope) -> str:
+        """Allow-listed API key of the request, else the client address"""
+        for name, value in scope.get("headers", ()):
+            if name == self.api_key_header and value in self.api_keys:
+                return "key:" + value.decode("latin-1")
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def __call__(self, scope, receive, send):
+        # CORS preflights carry no credentials and must not use up a budget
+        if not self.enabled or scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        tier = self.tier(scope["path"])
+        if tier is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self.limiters[tier].acquire(self.client_key(scope))
+        if retry_after:
+            response = FastJSONResponse({"detail": "Rate limit exceeded"}, status_code=429,
+                                        headers={"Retry-After": str(math.ceil(retry_after))})
+            await response(scope, receive, send)
+            return
+        if tier == TIER_CHEAP:
+            await self.app(scope, receive, send)
+            return
+
+        if not self.concurrency.try_acquire():
+            response = FastJSONResponse({"detail": "Too many recommendation requests in flight, retry shortly"},
+                                        status_code=503, headers={"Retry-After": "1"})
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.concurrency.release()
+
+# Per-client budgets and the global limit of model-backed requests
+cheap_limiter = RateLimiter(settings.RATE_LIMIT_CHEAP_RATE, settings.RATE_LIMIT_CHEAP_BURST,
+                            settings.RATE_LIMIT_MAX_CLIENTS)
+expensive_limiter = RateLimiter(settings.RATE_LIMIT_EXPENSIVE_RATE, settings.RATE_LIMIT_EXPENSIVE_BURST,
+                                settings.RATE_LIMIT_MAX_CLIENTS)
+model_concurrency = ConcurrencyLimiter(settings.MODEL_CONCURRENCY_LIMIT)
+
+def admission_stats() -> Dict[str, Any]:
+    """Per-budget rate limit counters and the concurrency limit"""
+    return {
+        "enabled": settings.RATE_LIMIT_ENABLED,
+        TIER_CHEAP: cheap_limiter.stats(),
+        TIER_EXPENSIVE: expensive_limiter.stats(),
+        "concurrency": model_concurrency.stats()
+    }
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+class CircuitBreaker:
+    """
+    Circuit breaker over a sliding window of recent call outcomes
+
+    A call is bad when it fails or takes longer than `slow_call_seconds`. Once
+    the window holds at least `min_calls` outcomes and the share of bad ones
+    reaches `failure_rate`, the circuit opens and callers fail fast for
+    `reset_timeout` seconds. Then a single trial call is let through (half
+    open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, window: int = 20, min_calls: int = 5, failure_rate: float = 0.5,
+                 slow_call_seconds: float = 2.0, reset_timeout: float = 30.0):
+        """
+        Initialize a closed breaker
+        Args:
+            window: Number of recent outcomes considered
+            min_calls: Outcomes needed before the breaker can open
+            failure_rate: Share of bad outcomes that opens the circuit
+            slow_call_seconds: Calls slower than this count as bad
+            reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self._outcomes: deque = deque(maxlen=window)
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        """Current state; an open circuit past its reset timeout reports half open"""
+        with self._lock:
+            if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return STATE_HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """
+        Check that a call may go upstream
+        Raises:
+            CircuitOpenError: If the circuit is open, or half open with a trial already running
+        """
+        with self._lock:
+            if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = STATE_HALF_OPEN
+            if self._state == STATE_CLOSED:
+                return
+            if self._state == STATE_HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.rejected += 1
+        raise CircuitOpenError("Upstream circuit is open")
+
+    def record(self, succeeded: bool, duration: float) -> None:
+        """
+        Record the outcome of a call that before_call let through
+        Args:
+            succeeded: Whether the call succeeded
+            duration: Call duration in seconds
+        """
+        bad = not succeeded or duration > self.slow_call_seconds
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._trial_in_flight = False
+                if bad:
+                    self._open()
+                else:
+                    self._state = STATE_CLOSED
+                    self._outcomes.clear()
+                return
+            if self._state == STATE_OPEN:
+                return  # A call that started before the circuit opened
+            self._outcomes.append(bad)
+            if len(self._outcomes) >= self.min_calls and \
+                    sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    def _open(self) -> None:
+        self._state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """State, recent bad-outcome count and rejection/open counters"""
+        with self._lock:
+            recent = sum(self._outcomes)
+            window = len(self._outcomes)
+        return {
+            "state": self.state,
+            "recent_bad": recent,
+            "recent_calls": window,
+            "rejected": self.rejected,
+            "opened": self.opened
+        }
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from ...core.config import settings
+
+class ExecutorSaturatedError(Exception):
+    """Raised instead of queueing work on a full executor; served as 503"""
+
+class BoundedExecutor:
+    """
+    Thread pool with a bounded queue that rejects work when full
+
+    At most max_workers jobs run and max_queue more wait; submitting beyond
+    that raises ExecutorSaturatedError right away, so overload turns into fast
+    503s instead of an ever-growing queue and timeouts. Async routes await jobs
+    with run(), keeping blocking work off the event loop.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        """
+        Initialize the pool
+        Args:
+            name: Name used for threads, errors and stats
+            max_workers: Concurrently running jobs
+            max_queue: Jobs allowed to wait for a worker
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Queue a job
+        Args:
+            fn: Function to run on a worker thread
+            *args, **kwargs: Its arguments
+        Returns:
+            Future of the result; cancelling it before it starts frees its slot
+        Raises:
+            ExecutorSaturatedError: If every worker is busy and the queue is full
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ExecutorSaturatedError(f"The {self.name} queue is full, retry shortly")
+
+        def job() -> Any:
+            with self._lock:
+                self.running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        try:
+            future = self._pool.submit(job)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.submitted += 1
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future: Future) -> None:
+        self._slots.release()
+        with self._lock:
+            self.completed += 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a job and await its result without blocking the event loop
+        Args:
+            fn: Function to run on a worker thread
+            *args, **kwargs: Its arguments
+        Returns:
+            The function's result
+        Raises:
+            ExecutorSaturatedError: If every worker is busy and the queue is full
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, int]:
+        """Worker and queue sizes, current running and queued jobs, and counters"""
+        with self._lock:
+            in_flight = self.submitted - self.completed
+            return {
+                "workers": self.max_workers,
+                "queue_size": self.max_queue,
+                "running": self.running,
+                "queued": max(in_flight - self.running, 0),
+                "completed": self.completed,
+                "rejected": self.rejected
+            }
+
+# CPU-bound model scoring (ranking, dashboard analytics)
+scoring_executor = BoundedExecutor("scoring", settings.SCORING_WORKERS, settings.SCORING_QUEUE_SIZE)
+
+# Blocking TMDB client calls, kept off the event loop
+io_executor = BoundedExecutor("io", settings.IO_WORKERS, settings.IO_QUEUE_SIZE)
+
+def executor_stats() -> Dict[str, Dict[str, int]]:
+    """Queue depth and counters of every executor"""
+    return {executor.name: executor.stats() for executor in (scoring_executor, io_executor)}
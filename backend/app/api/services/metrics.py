@@ -0,0 +1,44 @@
+import threading
+from typing import Dict
+
+class StageTimings:
+    """
+    Running count, mean and max duration of named pipeline stages
+
+    Cheap enough to record on every request: one lock and a few float updates.
+    """
+
+    def __init__(self):
+        """Initialize empty counters"""
+        self._lock = threading.Lock()
+        self._stages: Dict[str, list] = {}
+
+    def record(self, durations: Dict[str, float]) -> None:
+        """
+        Add one measurement per stage
+        Args:
+            durations: Stage name -> duration in seconds
+        """
+        with self._lock:
+            for stage, seconds in durations.items():
+                totals = self._stages.setdefault(stage, [0, 0.0, 0.0])
+                totals[0] += 1
+                totals[1] += seconds
+                totals[2] = max(totals[2], seconds)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per stage: count, mean_ms and max_ms"""
+        with self._lock:
+            return {
+                stage: {
+                    "count": count,
+                    "mean_ms": round(total / count * 1000, 3),
+                    "max_ms": round(longest * 1000, 3)
+                }
+                for stage, (count, total, longest) in self._stages.items()
+            }
+
+    def clear(self) -> None:
+        """Reset every counter"""
+        with self._lock:
+            self._stages.clear()
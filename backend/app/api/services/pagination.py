@@ -0,0 +1,48 @@
+import base64
+import hashlib
+import json
+from typing import Any, Tuple
+
+def query_fingerprint(*query: Any) -> str:
+    """
+    Short stable digest of the parameters that define a ranked list
+    Args:
+        *query: JSON-serializable query parameters (user, filters, ...)
+    Returns:
+        Hex digest
+    """
+    encoded = json.dumps(query, separators=(",", ":"), sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()[:16]
+
+def encode_cursor(version: str, offset: int, fingerprint: str) -> str:
+    """
+    Build an opaque cursor pointing into a ranked list
+    Args:
+        version: Model version that produced the list
+        offset: Position of the next item to return
+        fingerprint: query_fingerprint of the request the list belongs to
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps({"v": version, "o": offset, "q": fingerprint}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, int, str]:
+    """
+    Parse a cursor made by encode_cursor
+    Args:
+        cursor: Cursor string
+    Returns:
+        (model version, offset, query fingerprint)
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        version, offset, fingerprint = str(payload["v"]), int(payload["o"]), str(payload["q"])
+    except (ValueError, TypeError, KeyError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return version, offset, fingerprint
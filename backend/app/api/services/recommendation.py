@@ -1,15 +1,474 @@
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
 import joblib
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from app.core.config import settings
+from app.core.logging import logger
 from app.models.hybrid import HybridRecommender
+from .single_flight import SingleFlightCache
+from .metrics import StageTimings
 
-def get_recommender_model() -> HybridRecommender:
+MODEL_FILENAME = "hybrid_recommender.joblib"
+VERSIONS_DIRNAME = "versions"
+UNVERSIONED = "unversioned"
+
+def default_model_path() -> Path:
+    """Location of the serving model artifact"""
+    return settings.SAVED_MODELS_PATH / MODEL_FILENAME
+
+def versions_dir() -> Path:
+    """Directory holding every versioned model artifact"""
+    return settings.SAVED_MODELS_PATH / VERSIONS_DIRNAME
+
+def version_path(version: str) -> Path:
+    """
+    Location of a versioned model artifact
+    Args:
+        version: Model version
+    Returns:
+        Path of the artifact
+    Raises:
+        ValueError: If the version is not a plain name
+    """
+    if not version or Path(version).name != version or version.startswith("."):
+        raise ValueError(f"Invalid model version: {version}")
+    return versions_dir() / f"{version}.joblib"
+
+def model_version(recommender: Any) -> str:
+    """Version a model was saved with"""
+    return getattr(recommender, "version", None) or UNVERSIONED
+
+def _new_version() -> str:
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    suffix = 1
+    while version_path(version if suffix == 1 else f"{version}-{suffix}").exists():
+        suffix += 1
+    return version if suffix == 1 else f"{version}-{suffix}"
+
+def _version_key(version: str) -> Tuple[str, int]:
+    """Sort key of a version: its timestamp, then the suffix of versions saved in the same second"""
+    timestamp, _, suffix = version.partition("-")
+    return timestamp, int(suffix) if suffix.isdigit() else 1
+
+def serving_version(model_path: Optional[Path] = None) -> Optional[str]:
+    """
+    Saved version the serving artifact links to
+    Args:
+        model_path: Serving artifact (defaults to the serving model path)
+    Returns:
+        The version, or None if there is no serving artifact or it is a copy (no hard links)
+    """
+    model_path = Path(model_path or default_model_path())
+    if not model_path.exists():
+        return None
+    for path in versions_dir().glob("*.joblib"):
+        try:
+            if os.path.samefile(path, model_path):
+                return path.stem
+        except OSError:
+            continue
+    return None
+
+def prune_versions(keep: int, protected: Sequence[str] = ()) -> List[str]:
+    """
+    Delete all but the newest saved versions
+    Args:
+        keep: Number of newest versions kept
+        protected: Versions never deleted, e.g. the serving and previous ones
+    Returns:
+        Deleted versions
+    """
+    versions = sorted((path.stem for path in versions_dir().glob("*.joblib")), key=_version_key, reverse=True)
+    removed = []
+    for version in versions[keep:]:
+        if version in protected:
+            continue
+        path = version_path(version)
+        # Workers still mapping the artifact keep reading it until they unmap it
+        path.unlink(missing_ok=True)
+        path.with_suffix(".json").unlink(missing_ok=True)
+        removed.append(version)
+    if removed:
+        logger.info(f"Pruned {len(removed)} old model versions: {', '.join(removed)}")
+    return removed
+
+def _replace_with_link(source: Path, target: Path) -> None:
+    """Atomically point target at source's content, sharing the inode when possible"""
+    tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
+
+def save_model(recommender: HybridRecommender, model_path: Optional[Path] = None,
+               metadata: Optional[Dict[str, Any]] = None, promote: bool = True) -> Path:
+    """
+    Write a versioned model artifact that serving workers can memory-map
+    Args:
+        recommender: Fitted recommender
+        model_path: Serving artifact to point at the new version (defaults to the serving model path)
+        metadata: Training metadata stored next to the artifact
+        promote: Make the new version the serving model; older versions beyond
+            MODEL_KEEP_VERSIONS are then pruned, except the one it replaces
+    Returns:
+        Path of the versioned artifact
+    """
+    model_path = Path(model_path or default_model_path())
+    previous = serving_version(model_path)
+    replaces_unknown = previous is None and model_path.exists()
+    version = _new_version()
+    path = version_path(version)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    recommender.version = version
+
+    # Uncompressed so NumPy arrays are stored raw and can be mapped in place;
+    # write then rename so running workers never open a partial file
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    joblib.dump(recommender, tmp_path, compress=0)
+    os.replace(tmp_path, path)
+    metadata = {
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        **(metadata or {})
+    }
+    path.with_suffix(".json").write_text(json.dumps(metadata, indent=2, default=str))
+
+    if promote:
+        _replace_with_link(path, model_path)
+    logger.info(f"Saved model version {version} to {path}")
+    if promote and settings.MODEL_KEEP_VERSIONS > 0:
+        if replaces_unknown:
+            # A copied artifact can't be matched to its version, which rollback may still need
+            logger.warning("Serving artifact does not link to a saved version, not pruning old versions")
+        else:
+            prune_versions(settings.MODEL_KEEP_VERSIONS, protected=[version] + ([previous] if previous else []))
+    return path
+
+def load_model(model_path: Optional[Path] = None, mmap: Optional[bool] = None) -> HybridRecommender:
     """
-    Load and return the trained recommender model
+    Load a model artifact
+    Args:
+        model_path: Artifact file (defaults to the serving model path)
+        mmap: Memory-map NumPy arrays read-only (defaults to settings.MODEL_MMAP)
+    Returns:
+        Loaded recommender
     """
-    model_path = settings.SAVED_MODELS_PATH / "hybrid_recommender.joblib"
+    model_path = Path(model_path or default_model_path())
     if not model_path.exists():
         raise FileNotFoundError(f"Model file not found at {model_path}")
-    
-    recommender = joblib.load(model_path)
-    return recommender
+    mmap = settings.MODEL_MMAP if mmap is None else mmap
+    return joblib.load(model_path, mmap_mode="r" if mmap else None)
+
+def list_versions() -> List[Dict[str, Any]]:
+    """
+    Metadata of every saved model version, newest first
+    Returns:
+        List of metadata dicts
+    """
+    versions = []
+    for path in sorted(versions_dir().glob("*.joblib"), key=lambda path: _version_key(path.stem), reverse=True):
+        try:
+            metadata = json.loads(path.with_suffix(".json").read_text())
+        except (OSError, ValueError):
+            metadata = {}
+        versions.append({**metadata, "version": path.stem})
+    return versions
+
+# Shared results of identical recommendation calls, see get_cached_recommendations
+recommendation_cache = SingleFlightCache(
+    max_entries=settings.RECOMMENDATION_CACHE_SIZE,
+    ttl=settings.RECOMMENDATION_CACHE_TTL
+)
+
+# Full per-user ranked lists behind cursor pagination, see get_ranked_list. Entries are keyed
+# by model version and outlive model swaps, so open cursors keep paging through their list
+ranked_list_cache = SingleFlightCache(
+    max_entries=settings.RANKED_LIST_CACHE_SIZE,
+    ttl=settings.RANKED_LIST_CACHE_TTL
+)
+
+# Retrieval and re-ranking durations of computed (not cached) personalized recommendations
+pipeline_timings = StageTimings()
+
+def get_cached_recommendations(recommender: HybridRecommender, user_id: int, n_recommendations: int,
+                               genres: Optional[List[str]] = None,
+                               seed_movie_ids: Optional[List[int]] = None,
+                               year_from: Optional[int] = None, year_to: Optional[int] = None,
+                               match_all_genres: bool = False) -> List[Dict[str, Any]]:
+    """
+    HybridRecommender.get_recommendations behind the single-flight cache
+    Args:
+        recommender: Serving model
+        user_id: User ID
+        n_recommendations: Number of recommendations
+        genres, seed_movie_ids, year_from, year_to, match_all_genres: As in get_recommendations
+    Returns:
+        Shared recommendation list; callers must copy items before modifying them
+    """
+    key = (
+        user_id, n_recommendations,
+        recommender.content_weight, recommender.collab_weight, model_version(recommender),
+        tuple(sorted(g.lower() for g in genres)) if genres else None,
+        tuple(seed_movie_ids) if seed_movie_ids else None,
+        year_from, year_to, bool(match_all_genres)
+    )
+
+    def compute() -> List[Dict[str, Any]]:
+        timings: Dict[str, float] = {}
+        results = recommender.get_recommendations(
+            user_id, n_recommendations, genres=genres, seed_movie_ids=seed_movie_ids,
+            year_from=year_from, year_to=year_to, match_all_genres=match_all_genres, timings=timings
+        )
+        pipeline_timings.record(timings)
+        return results
+
+    return recommendation_cache.get(key, compute)
+
+def get_ranked_list(recommender: HybridRecommender, fingerprint: str, user_id: int,
+                    genres: Optional[List[str]] = None,
+                    seed_movie_ids: Optional[List[int]] = None,
+                    year_from: Optional[int] = None, year_to: Optional[int] = None,
+                    match_all_genres: bool = False,
+                    version: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Full ranked recommendation list (RANKED_LIST_SIZE items), computed once per query and model version
+    Args:
+        recommender: Serving model
+        fingerprint: query_fingerprint of the user and filters, part of the cache key
+        user_id: User ID
+        genres, seed_movie_ids, year_from, year_to, match_all_genres: As in get_recommendations
+        version: Model version a cursor was issued for; defaults to the serving model's
+    Returns:
+        Shared ranked list, or None if it was made by an older model and is no longer cached
+    """
+    key = (version or model_version(recommender), fingerprint)
+    if key[0] != model_version(recommender):
+        return ranked_list_cache.peek(key)
+
+    def compute() -> List[Dict[str, Any]]:
+        timings: Dict[str, float] = {}
+        results = recommender.get_recommendations(
+            user_id, settings.RANKED_LIST_SIZE, genres=genres, seed_movie_ids=seed_movie_ids,
+            year_from=year_from, year_to=year_to, match_all_genres=match_all_genres, timings=timings
+        )
+        pipeline_timings.record(timings)
+        return results
+
+    return ranked_list_cache.get(key, compute)
+
+def warm_up_model(recommender: HybridRecommender) -> None:
+    """
+    Run a few synthetic queries so first requests don't pay for cold pages and caches
+    Args:
+        recommender: Model to warm up
+    Raises:
+        Exception: If a query fails, so a broken model is never swapped in
+    """
+    user_ids = getattr(recommender.collab_model, "user_ids", None)
+    if user_ids is not None and len(user_ids):
+        recommender.get_recommendations(int(user_ids[0]), 10)
+        recommender.get_because_you_watched(int(user_ids[0]), 10)
+    # New-user tiers
+    recommender.get_recommendations(-1, 10)
+    filter_index = getattr(recommender, "filter_index", None)
+    if filter_index is not None and filter_index.genre_names:
+        recommender.get_recommendations(-1, 10, genres=filter_index.genre_names[:1])
+
+class ModelStore:
+    """
+    Process-wide holder of the serving model
+
+    With MODEL_MMAP the factor matrices, TF-IDF and neighbor CSR arrays and
+    filter indexes are read-only mappings of the artifact file, so every worker
+    on a host shares one copy through the page cache and an extra worker only
+    costs its Python objects. Workers coordinate swaps through the file itself:
+    promoting a version atomically repoints the serving file and each worker
+    reloads it in the background once it sees a new inode. New models are
+    warmed up before the swap, and the previous model stays loaded for an
+    instant rollback. Old mappings stay valid until the last request using them ends.
+    """
+
+    def __init__(self, model_path: Optional[Path] = None, check_interval: Optional[float] = None,
+                 warmup: Optional[Callable[[Any], None]] = warm_up_model):
+        """
+        Initialize the store
+        Args:
+            model_path: Serving artifact file (defaults to the serving model path)
+            check_interval: Seconds between checks for a replaced file; 0 disables
+            warmup: Called on each new model before it is swapped in
+        """
+        self.model_path = Path(model_path or default_model_path())
+        self.check_interval = settings.MODEL_CHECK_INTERVAL if check_interval is None else check_interval
+        self.warmup = warmup
+        self.model: Optional[HybridRecommender] = None
+        self.previous: Optional[HybridRecommender] = None
+        self.status: Dict[str, Any] = {"state": "idle", "error": None}
+        self._file_id: Optional[Tuple[int, int, int]] = None
+        self._failed_file_id: Optional[Tuple[int, int, int]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[str]:
+        """Version of the serving model"""
+        return model_version(self.model) if self.model is not None else None
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = self.model_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _swap(self, model: HybridRecommender, file_id: Optional[Tuple[int, int, int]]) -> None:
+        with self._lock:
+            if self.model is not None:
+                self.previous = self.model
+            self.model, self._file_id = model, file_id
+            self._checked_at = time.monotonic()
+        recommendation_cache.clear()
+
+    def load(self) -> HybridRecommender:
+        """
+        Load the serving artifact now and make it the serving model
+        Returns:
+            Loaded recommender
+        """
+        file_id = self._stat()
+        model = load_model(self.model_path)
+        self._swap(model, file_id)
+        logger.info(f"Loaded model {self.version} from {self.model_path} (mmap={settings.MODEL_MMAP})")
+        return model
+
+    def _reload(self, version: Optional[str]) -> HybridRecommender:
+        try:
+            self.status = {"state": "loading", "error": None, "version": version}
+            started = time.perf_counter()
+            path = version_path(version) if version else self.model_path
+            file_id = self._stat() if not version else None
+            model = load_model(path)
+            if self.warmup is not None:
+                self.warmup(model)
+            if version:
+                _replace_with_link(path, self.model_path)
+                file_id = self._stat()
+            self._swap(model, file_id)
+            elapsed = time.perf_counter() - started
+            self.status = {"state": "idle", "error": None, "version": model_version(model)}
+            logger.info(f"Swapped in model {model_version(model)} (loaded and warmed in {elapsed:.2f}s)")
+            return model
+        except Exception as e:
+            if not version:
+                # Don't retry a broken serving artifact on every check
+                self._failed_file_id = file_id
+            self.status = {"state": "failed", "error": str(e), "version": version}
+            logger.error(f"Model reload failed, still serving {self.version}: {str(e)}")
+            raise
+        finally:
+            self._reload_lock.release()
+
+    def reload(self, version: Optional[str] = None) -> HybridRecommender:
+        """
+        Load, warm up and swap in a model version
+        Args:
+            version: Version to serve; promoted on disk so other workers follow.
+                Reloads the serving artifact if omitted.
+        Returns:
+            The new serving recommender
+        Raises:
+            RuntimeError: If another reload is running
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            raise RuntimeError("A model reload is already in progress")
+        return self._reload(version)
+
+    def reload_in_background(self, version: Optional[str] = None) -> threading.Thread:
+        """
+        Start reload() on a background thread; requests keep using the current model
+        Args:
+            version: Version to serve (see reload)
+        Returns:
+            The started thread
+        Raises:
+            RuntimeError: If another reload is running
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            raise RuntimeError("A model reload is already in progress")
+
+        def run():
+            try:
+                self._reload(version)
+            except Exception:
+                pass  # Logged and recorded in status by _reload()
+
+        thread = threading.Thread(target=run, name="model-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def rollback(self) -> HybridRecommender:
+        """
+        Swap back to the previous model instantly and promote it on disk
+        Returns:
+            The restored recommender
+        Raises:
+            RuntimeError: If there is no previous model
+        """
+        with self._lock:
+            if self.previous is None:
+                raise RuntimeError("No previous model to roll back to")
+            self.model, self.previous = self.previous, self.model
+        recommendation_cache.clear()
+        version = model_version(self.model)
+        if version != UNVERSIONED and version_path(version).exists():
+            _replace_with_link(version_path(version), self.model_path)
+        with self._lock:
+            self._file_id = self._stat()
+        logger.info(f"Rolled back to model {version}")
+        return self.model
+
+    def check_for_update(self) -> bool:
+        """
+        Start a background reload if the serving artifact was replaced
+        Returns:
+            Whether a reload was started
+        """
+        self._checked_at = time.monotonic()
+        file_id = self._stat()
+        if file_id is None or file_id in (self._file_id, self._failed_file_id):
+            return False
+        try:
+            self.reload_in_background()
+        except RuntimeError:
+            return False
+        return True
+
+    def get(self) -> HybridRecommender:
+        """
+        Get the serving model, loading it on first use; a replaced artifact is
+        reloaded in the background while the current model keeps serving
+        Returns:
+            Serving recommender
+        """
+        if self.model is None:
+            with self._lock:
+                needs_load = self.model is None
+            if needs_load:
+                return self.load()
+        if self.check_interval > 0 and time.monotonic() - self._checked_at >= self.check_interval:
+            self.check_for_update()
+        return self.model
+
+model_store = ModelStore()
+
+def get_recommender_model() -> HybridRecommender:
+    """
+    Return the shared serving model
+    """
+    return model_store.get()
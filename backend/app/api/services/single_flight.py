@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class _Call:
+    """An in-flight computation that followers wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+class SingleFlightCache:
+    """
+    Single-flight computation with a short TTL result cache
+
+    Concurrent calls with the same key share one computation: the first caller
+    computes, the others block until it finishes and get the same result (or
+    exception). Successful results are then served from an LRU cache for `ttl`
+    seconds, so a burst of identical requests costs one computation. Results are
+    shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 30):
+        """
+        Initialize the cache
+        Args:
+            max_entries: Maximum number of cached results
+            ttl: Seconds a result stays cached; 0 only coalesces in-flight calls
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Get a cached or in-flight result, computing it if there is neither
+        Args:
+            key: Hashable key identifying the computation
+            compute: Produces the result on a miss
+        Returns:
+            The (shared) result
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and self.ttl > 0:
+                    self._entries[key] = (time.monotonic() + self.ttl, call.result)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            call.event.set()
+        return call.result
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached result without computing or waiting
+        Args:
+            key: Hashable key identifying the computation
+        Returns:
+            The (shared) result, or None if it is not cached or has expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def clear(self) -> None:
+        """Drop all cached results (in-flight calls still complete)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and coalesced-call counters and the current size"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "size": len(self._entries)
+        }
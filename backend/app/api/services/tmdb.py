@@ -1,82 +1,144 @@
+import random
+import time
 import requests
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from ...core.logging import logger
 from ...core.config import settings
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TMDBUnavailableError(Exception):
+    """TMDB could not answer in time: circuit open, timeouts or server errors after retries"""
+
+# One breaker per process: every TMDBService instance talks to the same upstream
+tmdb_breaker = CircuitBreaker(
+    window=settings.TMDB_BREAKER_WINDOW,
+    min_calls=settings.TMDB_BREAKER_MIN_CALLS,
+    failure_rate=settings.TMDB_BREAKER_FAILURE_RATE,
+    slow_call_seconds=settings.TMDB_BREAKER_SLOW_CALL,
+    reset_timeout=settings.TMDB_BREAKER_RESET_TIMEOUT
+)
 
 class TMDBService:
-    """Service for interacting with TheMovieDB API"""
+    """
+    Service for interacting with TheMovieDB API
+
+    Every request has connect/read timeouts and runs under a latency budget:
+    timeouts, connection errors, 429 and 5xx responses are retried with
+    exponential backoff and full jitter while the budget lasts. Attempts feed
+    a shared circuit breaker; while it is open, calls fail immediately with
+    TMDBUnavailableError so routes can answer from local data instead of waiting.
+    """
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, breaker: Optional[CircuitBreaker] = None):
         self.api_key = api_key
         self.base_url = settings.TMDB_API_BASE_URL
         self.image_base_url = settings.TMDB_IMAGE_BASE_URL
         self.params = {
             "api_key": api_key
         }
+        self.breaker = breaker or tmdb_breaker
+        # Pooled keep-alive connections instead of a new TLS handshake per call
+        self.session = requests.Session()
+    
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict:
+        """
+        GET a TMDB endpoint with timeouts, retries and the circuit breaker
+        Args:
+            path: Path below the API base URL
+            params: Query parameters besides the API key
+        Returns:
+            Decoded JSON response
+        Raises:
+            TMDBUnavailableError: If the circuit is open or retries are exhausted
+            requests.HTTPError: For non-retryable error statuses such as 404
+        """
+        deadline = time.monotonic() + settings.TMDB_LATENCY_BUDGET
+        for attempt in range(settings.TMDB_MAX_RETRIES + 1):
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError as e:
+                raise TMDBUnavailableError(str(e)) from e
+            started = time.monotonic()
+            succeeded = False
+            try:
+                response = self.session.get(
+                    f"{self.base_url}{path}", params={**self.params, **(params or {})},
+                    timeout=(settings.TMDB_CONNECT_TIMEOUT, settings.TMDB_READ_TIMEOUT)
+                )
+                retryable = response.status_code in RETRY_STATUSES
+                succeeded = not retryable
+                if not retryable:
+                    response.raise_for_status()
+                    return response.json()
+                error: Exception = requests.HTTPError(f"{response.status_code} from TMDB", response=response)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                error = e
+            finally:
+                self.breaker.record(succeeded, time.monotonic() - started)
+            
+            # Full jitter: sleep anywhere up to the exponential backoff, never past the budget
+            delay = random.uniform(0, settings.TMDB_RETRY_BACKOFF * 2 ** attempt)
+            if attempt == settings.TMDB_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                break
+            logger.warning(f"Retrying TMDB {path} after {str(error)}")
+            time.sleep(delay)
+        raise TMDBUnavailableError(f"TMDB {path} failed: {str(error)}") from error
     
     def get_movie_details(self, movie_id: int) -> Dict:
         """Get detailed information about a movie"""
-        url = f"{self.base_url}/movie/{movie_id}"
         try:
-            response = requests.get(url, params=self.params)
-            response.raise_for_status()
-            return response.json()
+            return self._get(f"/movie/{movie_id}")
         except Exception as e:
             logger.error(f"Error fetching movie details: {str(e)}")
             raise
     
+    def get_movie_full(self, movie_id: int) -> Dict:
+        """
+        Get movie details with credits and videos in one request
+        
+        Uses append_to_response, so the response is the details object with
+        "credits" and "videos" keys shaped like their own endpoints' responses.
+        """
+        try:
+            return self._get(f"/movie/{movie_id}", {"append_to_response": "credits,videos"})
+        except Exception as e:
+            logger.error(f"Error fetching full movie details: {str(e)}")
+            raise
+    
     def search_movies(self, query: str, page: int = 1) -> Dict:
         """Search for movies by title"""
-        url = f"{self.base_url}/search/movie"
-        params = {
-            **self.params,
-            "query": query,
-            "page": page
-        }
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._get("/search/movie", {"query": query, "page": page})
         except Exception as e:
             logger.error(f"Error searching movies: {str(e)}")
             raise
     
     def get_popular_movies(self, page: int = 1) -> Dict:
         """Get list of popular movies"""
-        url = f"{self.base_url}/movie/popular"
-        params = {
-            **self.params,
-            "page": page
-        }
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._get("/movie/popular", {"page": page})
         except Exception as e:
             logger.error(f"Error fetching popular movies: {str(e)}")
             raise
     
     def get_movie_credits(self, movie_id: int) -> Dict:
         """Get cast and crew information for a movie"""
-        url = f"{self.base_url}/movie/{movie_id}/credits"
         try:
-            response = requests.get(url, params=self.params)
-            response.raise_for_status()
-            return response.json()
+            return self._get(f"/movie/{movie_id}/credits")
         except Exception as e:
             logger.error(f"Error fetching movie credits: {str(e)}")
             raise
     
     def get_movie_videos(self, movie_id: int) -> Dict:
         """Get videos (trailers, teasers, etc.) for a movie"""
-        url = f"{self.base_url}/movie/{movie_id}/videos"
         try:
-            response = requests.get(url, params=self.params)
-            response.raise_for_status()
-            return response.json()
+            return self._get(f"/movie/{movie_id}/videos")
         except Exception as e:
             logger.error(f"Error fetching movie videos: {str(e)}")
             raise
+
     def get_poster_url(self, poster_path: str, size: str = "w500") -> str:
         """Get full poster URL"""
         if not poster_path:
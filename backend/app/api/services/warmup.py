@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional
+import numpy as np
+from scipy.sparse import issparse
+from app.core.config import settings
+from app.core.logging import logger
+from app.data.id_mapper import get_id_mapper
+from app.data.search_index import build_search_index
+from app.models.hybrid import HybridRecommender
+from .recommendation import ModelStore, warm_up_model
+
+PAGE_SIZE = 4096
+
+PHASE_STARTING = "starting"
+PHASE_WARMING = "warming"
+PHASE_READY = "ready"
+PHASE_FAILED = "failed"
+
+def _iter_arrays(obj: Any, seen: set, depth: int = 0) -> Iterator[np.ndarray]:
+    """Yield the NumPy arrays reachable from a model through attributes, containers and sparse matrices"""
+    if id(obj) in seen or depth > 4:
+        return
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        if obj.dtype != object:
+            yield obj
+    elif issparse(obj):
+        for name in ("data", "indices", "indptr"):
+            if hasattr(obj, name):
+                yield from _iter_arrays(getattr(obj, name), seen, depth + 1)
+    elif isinstance(obj, (list, tuple)):
+        for item in obj[:16]:  # Containers of arrays are short; skip big ID lists
+            yield from _iter_arrays(item, seen, depth + 1)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        for value in vars(obj).values():
+            yield from _iter_arrays(value, seen, depth + 1)
+
+def touch_model_arrays(recommender: HybridRecommender) -> int:
+    """
+    Read one byte per page of every model array so page faults happen now
+    Args:
+        recommender: Loaded model, typically memory-mapped
+    Returns:
+        Number of bytes covered
+    """
+    total = 0
+    for array in _iter_arrays(recommender, set()):
+        if not array.flags.c_contiguous or array.nbytes == 0:
+            continue
+        int(np.frombuffer(array, dtype=np.uint8)[::PAGE_SIZE].sum())
+        total += array.nbytes
+    return total
+
+class Warmup:
+    """
+    Startup warmup that gates readiness
+
+    Runs after the model is loaded, on a background thread so liveness checks
+    answer meanwhile: faults in the model's array pages, runs a sample of
+    recommendation queries (also spinning up the BLAS thread pool), builds the
+    title search index from the model's metadata and preloads TMDB metadata for
+    the movies those queries recommend most.
+    """
+
+    def __init__(self):
+        """Initialize the warmup state"""
+        self.phase = PHASE_STARTING
+        self.error: Optional[str] = None
+        self.durations: Dict[str, float] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether warmup has finished (a failed warmup still serves, just cold)"""
+        return self.phase in (PHASE_READY, PHASE_FAILED)
+
+    def report(self) -> Dict[str, Any]:
+        """Phase, error and per-step durations in seconds"""
+        return {"phase": self.phase, "error": self.error, "durations": dict(self.durations)}
+
+    def _timed(self, step: str, func: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        result = func()
+        self.durations[step] = round(time.perf_counter() - started, 3)
+        return result
+
+    def _run_queries(self, recommender: HybridRecommender) -> Counter:
+        counts: Counter = Counter()
+        warm_up_model(recommender)
+        user_ids = getattr(recommender.collab_model, "user_ids", None)
+        if user_ids is None or not len(user_ids) or settings.WARMUP_QUERIES <= 0:
+            return counts
+        # Evenly spaced users touch factor rows across the whole matrix
+        sample = np.linspace(0, len(user_ids) - 1, min(settings.WARMUP_QUERIES, len(user_ids))).astype(int)
+        for idx in sample:
+            for rec in recommender.get_recommendations(int(user_ids[idx]), 20):
+                counts[rec["movieId"]] += 1
+        for rec in recommender.get_recommendations(-1, settings.WARMUP_TMDB_PRELOAD):
+            counts[rec["movieId"]] += 1
+        return counts
+
+    def _preload_tmdb(self, counts: Counter, preload: Callable[[int], Any]) -> int:
+        movie_ids = [movie_id for movie_id, _ in counts.most_common(settings.WARMUP_TMDB_PRELOAD)]
+        tmdb_ids = [int(tmdb_id) for tmdb_id in get_id_mapper().get_tmdb_ids(movie_ids) if tmdb_id > 0]
+
+        def fetch(tmdb_id: int) -> bool:
+            try:
+                preload(tmdb_id)
+                return True
+            except Exception:
+                return False
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            return sum(pool.map(fetch, tmdb_ids))
+
+    def run(self, store: ModelStore, preload: Optional[Callable[[int], Any]] = None) -> None:
+        """
+        Run every warmup step
+        Args:
+            store: Store holding the loaded serving model
+            preload: Fetches and caches metadata for one TMDB ID
+        """
+        self.phase = PHASE_WARMING
+        started = time.perf_counter()
+        try:
+            recommender = store.get()
+            touched = self._timed("touch_arrays", lambda: touch_model_arrays(recommender))
+            counts = self._timed("queries", lambda: self._run_queries(recommender))
+            self._timed("search_index", lambda: build_search_index(recommender))
+            preloaded = 0
+            if preload is not None and settings.WARMUP_TMDB_PRELOAD > 0:
+                preloaded = self._timed("tmdb_preload", lambda: self._preload_tmdb(counts, preload))
+            self.phase = PHASE_READY
+            logger.info(
+                f"Warmup finished in {time.perf_counter() - started:.2f}s: touched {touched / 2**20:.0f} MB "
+                f"of model arrays, preloaded {preloaded} movies ({self.durations})"
+            )
+        except Exception as e:
+            self.error = str(e)
+            self.phase = PHASE_FAILED
+            logger.error(f"Warmup failed, serving without it: {str(e)}")
+        finally:
+            self.durations["total"] = round(time.perf_counter() - started, 3)
+
+    def start(self, store: ModelStore, preload: Optional[Callable[[int], Any]] = None) -> None:
+        """
+        Run warmup on a background thread, or mark ready at once if disabled
+        Args:
+            store: Store holding the loaded serving model
+            preload: Fetches and caches metadata for one TMDB ID
+        """
+        if not settings.WARMUP_ENABLED:
+            self.phase = PHASE_READY
+            return
+        self._thread = threading.Thread(target=self.run, args=(store, preload), name="warmup", daemon=True)
+        self._thread.start()
+
+warmup = Warmup()
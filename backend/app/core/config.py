@@ -1,6 +1,6 @@
 from pathlib import Path
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -10,6 +10,7 @@ class Settings(BaseSettings):
     DATASET_PATH: Path = BASE_DIR / "dataset"
     SAVED_MODELS_PATH: Path = PROJECT_ROOT / "saved_models"
     LOGS_PATH: Path = PROJECT_ROOT / "logs"
+    ID_MAPPER_CACHE_PATH: Optional[Path] = None  # Defaults to SAVED_MODELS_PATH / "id_mappings.npy"
     
     # API settings
     API_HOST: str = "0.0.0.0"
@@ -22,12 +23,67 @@ class Settings(BaseSettings):
     CONTENT_WEIGHT: float = 0.5
     COLLABORATIVE_WEIGHT: float = 0.5
     SVD_N_COMPONENTS: int = 100
+    COLLABORATIVE_ENGINE: str = "svd"  # "svd" or "als"
+    ALS_N_FACTORS: int = 64
+    ALS_REGULARIZATION: float = 0.1
+    ALS_ITERATIONS: int = 15
+    ALS_N_JOBS: Optional[int] = None  # None uses all available cores
+    ITEM_ITEM_ENABLED: bool = True
+    ITEM_ITEM_NEIGHBORS: int = 50
+    COLD_START_PRIOR_RATINGS: int = 10
+    COLD_START_LIST_SIZE: int = 200
+    CANDIDATE_COLLAB_BUDGET: int = 500  # Retrieval: collaborative top-k candidates
+    CANDIDATE_CONTENT_BUDGET: int = 200  # Retrieval: content neighbors of the user's top-rated movies
+    CANDIDATE_POPULAR_BUDGET: int = 100  # Retrieval: most popular movies
+    CANDIDATE_SEED_MOVIES: int = 20  # Highest-rated movies used as content seeds
+    QUANTIZED_FACTORS: bool = False  # Int8 movie factors for the retrieval scan, exact re-rank of candidates
     TFIDF_MAX_FEATURES: int = 5000
+    CONTENT_FEATURES: str = "hashing"  # "hashing" (titles, genres and tags, out-of-core) or "tfidf"
+    CONTENT_HASH_FEATURES: int = 2 ** 18
+    CONTENT_TAG_WEIGHT: float = 1.0
+    CONTENT_CHUNK_SIZE: int = 100000
+    CONTENT_N_JOBS: Optional[int] = None  # None uses all available cores
+    
+    # Model serving settings
+    MODEL_MMAP: bool = True  # Memory-map model arrays read-only so workers share their pages
+    MODEL_CHECK_INTERVAL: float = 30.0  # Seconds between checks for a replaced model file; 0 disables
+    MODEL_KEEP_VERSIONS: int = 5  # Newest saved versions kept after a promotion, plus the serving and previous ones; 0 keeps all
+    RECOMMENDATION_CACHE_TTL: float = 30.0  # Seconds identical recommendation calls share a result
+    RECOMMENDATION_CACHE_SIZE: int = 10000
+    SCORING_WORKERS: int = 4  # Threads scoring recommendations; NumPy/BLAS release the GIL
+    SCORING_QUEUE_SIZE: int = 32  # Scoring jobs waiting beyond the workers before requests get 503
+    IO_WORKERS: int = 16  # Threads running blocking TMDB calls off the event loop
+    IO_QUEUE_SIZE: int = 256  # TMDB jobs waiting beyond the workers before requests get 503
+    RATE_LIMIT_ENABLED: bool = True  # Per-client token buckets and the model concurrency limit
+    RATE_LIMIT_EXPENSIVE_RATE: float = 1.0  # Recommendation/dashboard requests per second per client
+    RATE_LIMIT_EXPENSIVE_BURST: int = 10  # Back-to-back recommendation/dashboard requests per client
+    RATE_LIMIT_CHEAP_RATE: float = 20.0  # Other requests per second per client
+    RATE_LIMIT_CHEAP_BURST: int = 60
+    RATE_LIMIT_MAX_CLIENTS: int = 10000  # Client buckets kept in memory (LRU)
+    RATE_LIMIT_API_KEYS: List[str] = []  # X-API-Key values with their own budget (JSON list); others share the IP's
+    MODEL_CONCURRENCY_LIMIT: int = 32  # Model-backed requests in flight before new ones get 503
+    RANKED_LIST_SIZE: int = 500  # Items ranked once per user for cursor pagination
+    RANKED_LIST_CACHE_TTL: float = 600.0  # Seconds a ranked list (and its cursors) stays valid
+    RANKED_LIST_CACHE_SIZE: int = 2000
+    WARMUP_ENABLED: bool = True  # Warm the model and caches before reporting ready
+    WARMUP_QUERIES: int = 5  # Sample recommendation queries run during warmup
+    WARMUP_TMDB_PRELOAD: int = 50  # Most-recommended movies whose TMDB metadata is preloaded
+    ADMIN_TOKEN: Optional[str] = None  # Required in X-Admin-Token for /admin routes; they answer 403 while unset
     
     # TMDB API settings
     TMDB_API_KEY: str
     TMDB_API_BASE_URL: str = "https://api.themoviedb.org/3"
     TMDB_IMAGE_BASE_URL: str = "https://image.tmdb.org/t/p"
+    TMDB_CONNECT_TIMEOUT: float = 2.0  # Seconds per attempt
+    TMDB_READ_TIMEOUT: float = 4.0
+    TMDB_MAX_RETRIES: int = 2  # Retries of timeouts, connection errors, 429 and 5xx
+    TMDB_RETRY_BACKOFF: float = 0.2  # Base seconds of exponential backoff with full jitter
+    TMDB_LATENCY_BUDGET: float = 6.0  # Seconds per call including retries; no retry starts past it
+    TMDB_BREAKER_WINDOW: int = 20  # Recent TMDB attempts the circuit breaker considers
+    TMDB_BREAKER_MIN_CALLS: int = 5
+    TMDB_BREAKER_FAILURE_RATE: float = 0.5  # Share of failed or slow attempts that opens the circuit
+    TMDB_BREAKER_SLOW_CALL: float = 2.0  # Attempts slower than this count as failed
+    TMDB_BREAKER_RESET_TIMEOUT: float = 30.0  # Seconds of local-only responses before a trial call
     
     # Logging settings
     LOG_LEVEL: str = "INFO"
@@ -1,3 +1,8 @@
-from .processor import DataProcessor
+def __getattr__(name):
+    # Imported lazily: DataProcessor needs pandas, which the serving process doesn't load
+    if name == "DataProcessor":
+        from .processor import DataProcessor
+        return DataProcessor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = ['DataProcessor'] 
\ No newline at end of file
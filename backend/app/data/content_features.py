@@ -0,0 +1,162 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.utils import murmurhash3_32
+from ..core.logging import logger
+
+def _build_vectorizer(n_features: int) -> HashingVectorizer:
+    # Raw counts: IDF weighting and normalization happen after all chunks are summed
+    return HashingVectorizer(
+        n_features=n_features, stop_words="english", alternate_sign=False, norm=None, dtype=np.float32
+    )
+
+def _hash_chunk(task: Tuple[List[str], np.ndarray, int, int]) -> Tuple[csr_matrix, Dict[int, str]]:
+    """
+    Hash one chunk of documents and sum them into their movie rows
+    Args:
+        task: (documents, movie row per document, number of movie rows, number of hash features)
+    Returns:
+        (movie rows x features) term counts and a bucket -> token sample for naming features
+    """
+    documents, rows, n_rows, n_features = task
+    vectorizer = _build_vectorizer(n_features)
+    hashed = vectorizer.transform(documents)
+    # Indicator matrix sums every document into its movie's row
+    owners = csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, np.arange(len(rows)))), shape=(n_rows, len(rows))
+    )
+    counts = (owners @ hashed).tocsr()
+
+    analyzer = vectorizer.build_analyzer()
+    names: Dict[int, str] = {}
+    for token in {token for document in documents for token in analyzer(document)}:
+        names.setdefault(abs(murmurhash3_32(token, seed=0)) % n_features, token)
+    return counts, names
+
+def _sublinear_tf(counts: csr_matrix) -> csr_matrix:
+    """1 + log(count), so a tag applied by many users doesn't swamp the title"""
+    counts = csr_matrix(counts, dtype=np.float32)
+    counts.sum_duplicates()
+    counts.eliminate_zeros()
+    counts.data = 1.0 + np.log(counts.data)
+    return counts
+
+class ContentFeaturePipeline:
+    """
+    Out-of-core TF-IDF features from movie metadata and user tags.
+
+    Titles, genres and tag applications are streamed in chunks and hashed into a
+    fixed feature space, so no vocabulary is built and memory is bounded by the
+    number of movies and hash features rather than the number of distinct tags.
+    Chunks are tokenized in parallel worker processes and summed per movie with
+    sparse products; an IDF pass over the summed counts then produces an
+    L2-normalized float32 CSR matrix aligned with the movies.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, tag_weight: float = 1.0,
+                 chunk_size: int = 100000, n_jobs: Optional[int] = None):
+        """
+        Initialize the pipeline
+        Args:
+            n_features: Number of hash buckets (feature columns)
+            tag_weight: Weight of tag terms relative to title/genre terms
+            chunk_size: Rows per chunk of metadata or tags.csv
+            n_jobs: Worker processes for tokenization (None uses all cores)
+        """
+        self.n_features = n_features
+        self.tag_weight = tag_weight
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+
+    def _metadata_chunks(self, movies_df: pd.DataFrame) -> Iterator[Tuple[List[str], np.ndarray]]:
+        for start in range(0, len(movies_df), self.chunk_size):
+            chunk = movies_df.iloc[start:start + self.chunk_size]
+            # Genres like "Sci-Fi|Film-Noir" tokenize into their words
+            documents = (chunk["title"] + " " + chunk["genres"].str.replace("|", " ", regex=False)).tolist()
+            yield documents, np.arange(start, start + len(chunk))
+
+    def _tag_chunks(self, tags_path: Path, movie_ids: np.ndarray,
+                    order: np.ndarray) -> Iterator[Tuple[List[str], np.ndarray]]:
+        reader = pd.read_csv(tags_path, usecols=["movieId", "tag"], chunksize=self.chunk_size,
+                             dtype={"movieId": np.int64, "tag": str})
+        for chunk in reader:
+            chunk = chunk.dropna(subset=["tag"])
+            # Map movie IDs to rows with a binary search; drop tags of movies not in the catalog
+            positions = np.minimum(np.searchsorted(movie_ids, chunk["movieId"].to_numpy(), sorter=order),
+                                   len(order) - 1)
+            rows = order[positions]
+            known = movie_ids[rows] == chunk["movieId"].to_numpy()
+            if known.any():
+                yield chunk["tag"].to_numpy()[known].tolist(), rows[known]
+
+    def _sum_chunks(self, chunks: Iterator[Tuple[List[str], np.ndarray]], n_rows: int,
+                    names: np.ndarray) -> csr_matrix:
+        total = csr_matrix((n_rows, self.n_features), dtype=np.float32)
+        tasks = ((documents, rows, n_rows, self.n_features) for documents, rows in chunks)
+        for counts, chunk_names in self._map_bounded(tasks):
+            total = total + counts
+            for bucket, token in chunk_names.items():
+                if not names[bucket]:
+                    names[bucket] = token
+        return total
+
+    def _map_bounded(self, tasks: Iterator[tuple]) -> Iterator[Tuple[csr_matrix, Dict[int, str]]]:
+        """Run _hash_chunk over tasks, keeping at most two chunks per worker in flight"""
+        if self.n_jobs <= 1:
+            yield from map(_hash_chunk, tasks)
+            return
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as pool:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(_hash_chunk, task))
+                if len(pending) >= 2 * self.n_jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def transform(self, movies_df: pd.DataFrame,
+                  tags_path: Optional[Path] = None) -> Tuple[csr_matrix, np.ndarray]:
+        """
+        Build content features for every movie
+        Args:
+            movies_df: Movies with movieId, title and genres columns
+            tags_path: Optional tags.csv with movieId and tag columns
+        Returns:
+            (movies x n_features) float32 CSR aligned with movies_df rows, and a
+            name per feature column (empty for unused buckets)
+        """
+        n_rows = len(movies_df)
+        names = np.full(self.n_features, "", dtype=object)
+        features = _sublinear_tf(self._sum_chunks(self._metadata_chunks(movies_df), n_rows, names))
+
+        if tags_path is not None and Path(tags_path).exists():
+            movie_ids = movies_df["movieId"].to_numpy(dtype=np.int64)
+            order = np.argsort(movie_ids, kind="stable")
+            tag_counts = self._sum_chunks(self._tag_chunks(Path(tags_path), movie_ids, order), n_rows, names)
+            features = features + self.tag_weight * _sublinear_tf(tag_counts)
+            logger.info(f"Hashed tags for {int((np.diff(tag_counts.indptr) > 0).sum())} movies")
+
+        features = csr_matrix(features, dtype=np.float32)
+        features.sum_duplicates()
+        features.eliminate_zeros()
+        # Smoothed IDF, as TfidfTransformer computes it
+        document_frequency = np.bincount(features.indices, minlength=self.n_features)
+        idf = np.log((1.0 + n_rows) / (1.0 + document_frequency)) + 1.0
+        features.data *= idf[features.indices].astype(np.float32)
+        lengths = np.diff(features.indptr)
+        row_of_entry = np.repeat(np.arange(n_rows), lengths)
+        row_norms = np.sqrt(np.bincount(row_of_entry, weights=features.data ** 2, minlength=n_rows))
+        row_norms[row_norms == 0] = 1.0
+        features.data /= row_norms[row_of_entry].astype(np.float32)
+
+        logger.info(
+            f"Built hashed content features: {features.shape}, nnz: {features.nnz}, "
+            f"{int((document_frequency > 0).sum())} active buckets"
+        )
+        return features, names
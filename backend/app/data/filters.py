@@ -0,0 +1,123 @@
+import re
+import numpy as np
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+from ..core.logging import logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# MovieLens titles end with the release year, e.g. "Toy Story (1995)" or "Babylon 5 (1994-1998)"
+_YEAR_PATTERN = re.compile(r"\((\d{4})(?:[-–]\d{0,4})?\)\s*$")
+
+NO_GENRES = "(no genres listed)"
+
+def parse_release_year(title: str) -> int:
+    """
+    Extract the release year from a MovieLens title
+    Args:
+        title: Movie title
+    Returns:
+        Release year, or 0 if the title has none
+    """
+    match = _YEAR_PATTERN.search(title or "")
+    return int(match.group(1)) if match else 0
+
+class MovieFilterIndex:
+    """Genre bitmasks and release years for boolean filtering of the catalog"""
+
+    def __init__(self):
+        """Initialize the index"""
+        self.movie_ids: Optional[np.ndarray] = None
+        self.genre_names: List[str] = []
+        self.genre_bits: Dict[str, int] = {}
+        self.genre_masks: Optional[np.ndarray] = None
+        self.years: Optional[np.ndarray] = None
+        self.id_order: Optional[np.ndarray] = None
+
+    def fit(self, movies_df: "pd.DataFrame") -> "MovieFilterIndex":
+        """
+        Build bitmasks and years aligned with the rows of movies_df
+        Args:
+            movies_df: Movies with movieId, title and genres columns
+        Returns:
+            The fitted index
+        """
+        split_genres = [genres.split('|') for genres in movies_df['genres']]
+        self.genre_names = sorted({g for genres in split_genres for g in genres if g != NO_GENRES})
+        if len(self.genre_names) > 64:
+            raise ValueError(f"Too many genres for a 64-bit mask: {len(self.genre_names)}")
+        self.genre_bits = {name.lower(): 1 << bit for bit, name in enumerate(self.genre_names)}
+
+        self.movie_ids = movies_df['movieId'].to_numpy(dtype=np.int64)
+        self.id_order = np.argsort(self.movie_ids, kind='stable')
+        self.genre_masks = np.array(
+            [sum(self.genre_bits.get(g.lower(), 0) for g in genres) for genres in split_genres],
+            dtype=np.uint64
+        )
+        self.years = np.array([parse_release_year(title) for title in movies_df['title']], dtype=np.int16)
+
+        logger.info(
+            f"Built filter index: {len(self.genre_names)} genres, "
+            f"{int((self.years > 0).sum())}/{len(self.years)} movies with a release year"
+        )
+        return self
+
+    def genre_bitmask(self, genres: Sequence[str]) -> int:
+        """
+        Combine genre names into one bitmask
+        Args:
+            genres: Genre names (case-insensitive)
+        Returns:
+            Bitmask with one bit per known genre
+        Raises:
+            ValueError: If a genre is unknown
+        """
+        bitmask = 0
+        for genre in genres:
+            bit = self.genre_bits.get(genre.lower())
+            if bit is None:
+                raise ValueError(f"Unknown genre: {genre}")
+            bitmask |= bit
+        return bitmask
+
+    def mask(self, genres: Optional[Sequence[str]] = None, year_from: Optional[int] = None,
+             year_to: Optional[int] = None, match_all_genres: bool = False) -> Optional[np.ndarray]:
+        """
+        Boolean mask over catalog rows matching all given filters
+        Args:
+            genres: Genres to keep; a movie matches if it has any (or all) of them
+            year_from: Earliest release year, inclusive
+            year_to: Latest release year, inclusive
+            match_all_genres: Require every genre instead of any
+        Returns:
+            Boolean array aligned with movies_df rows, or None if no filter is set
+        """
+        if not genres and year_from is None and year_to is None:
+            return None
+        mask = np.ones(len(self.movie_ids), dtype=bool)
+        if genres:
+            bitmask = np.uint64(self.genre_bitmask(genres))
+            matched = self.genre_masks & bitmask
+            mask &= (matched == bitmask) if match_all_genres else (matched != 0)
+        if year_from is not None:
+            mask &= self.years >= year_from
+        if year_to is not None:
+            mask &= (self.years <= year_to) & (self.years > 0)
+        return mask
+
+    def positions(self, movie_ids: Sequence[int]) -> np.ndarray:
+        """
+        Map MovieLens IDs to catalog rows
+        Args:
+            movie_ids: MovieLens movie IDs
+        Returns:
+            Row index per ID, -1 for IDs not in the catalog
+        """
+        movie_ids = np.asarray(movie_ids, dtype=np.int64)
+        order = getattr(self, 'id_order', None)
+        if order is None:
+            order = np.argsort(self.movie_ids, kind='stable')
+        found = np.searchsorted(self.movie_ids, movie_ids, sorter=order)
+        found = np.minimum(found, len(order) - 1)
+        rows = order[found]
+        return np.where(self.movie_ids[rows] == movie_ids, rows, -1)
@@ -1,42 +1,161 @@
-import pandas as pd
+import os
+import threading
 import numpy as np
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Optional
 from ..core.logging import logger
 from ..core.config import settings
 
+MISSING_ID = -1
+
 class MovieIdMapper:
-    """Handles mapping between MovieLens and TMDB movie IDs"""
-    
+    """
+    Handles mapping between MovieLens and TMDB movie IDs
+
+    Both directions are stored as sorted int32 key arrays with aligned value
+    arrays, so single and batch lookups are a binary search. The four arrays are
+    cached in one .npy file that is memory-mapped read-only, letting every worker
+    on a host share the same pages.
+    """
+
     def __init__(self):
         """Initialize the mapper"""
-        self.movielens_to_tmdb: Dict[int, int] = {}
-        self.tmdb_to_movielens: Dict[int, int] = {}
-        
-    def load_mappings(self) -> None:
-        """Load ID mappings from links.csv file"""
+        self.movielens_ids: np.ndarray = np.empty(0, dtype=np.int32)
+        self.tmdb_ids: np.ndarray = np.empty(0, dtype=np.int32)
+        self.tmdb_keys: np.ndarray = np.empty(0, dtype=np.int32)
+        self.tmdb_movielens_ids: np.ndarray = np.empty(0, dtype=np.int32)
+
+    @classmethod
+    def from_arrays(cls, movielens_ids, tmdb_ids) -> "MovieIdMapper":
+        """
+        Build a mapper from aligned ID arrays
+        Args:
+            movielens_ids: MovieLens movie IDs
+            tmdb_ids: TMDB movie ID for each MovieLens ID
+        Returns:
+            MovieIdMapper instance
+        """
+        mapper = cls()
+        mapper._build(np.asarray(movielens_ids), np.asarray(tmdb_ids))
+        return mapper
+
+    def _build(self, movielens_ids: np.ndarray, tmdb_ids: np.ndarray) -> None:
+        order = np.argsort(movielens_ids, kind="stable")
+        self.movielens_ids = movielens_ids[order].astype(np.int32)
+        self.tmdb_ids = tmdb_ids[order].astype(np.int32)
+
+        # Several MovieLens IDs can share a TMDB ID: keep the last, as links.csv order implies
+        order = np.argsort(tmdb_ids, kind="stable")
+        keys = tmdb_ids[order]
+        last = np.append(keys[1:] != keys[:-1], True) if len(keys) else np.empty(0, dtype=bool)
+        self.tmdb_keys = keys[last].astype(np.int32)
+        self.tmdb_movielens_ids = movielens_ids[order][last].astype(np.int32)
+
+    def load_mappings(self, cache_path: Optional[Path] = None) -> None:
+        """
+        Load ID mappings from the binary cache, or from links.csv if the cache is stale
+        Args:
+            cache_path: Cache file location (defaults to settings.ID_MAPPER_CACHE_PATH)
+        """
+        cache_path = Path(
+            cache_path or settings.ID_MAPPER_CACHE_PATH or settings.SAVED_MODELS_PATH / "id_mappings.npy"
+        )
+        links_path = settings.DATASET_PATH / "links.csv"
         try:
+            if cache_path.exists() and (
+                not links_path.exists() or cache_path.stat().st_mtime >= links_path.stat().st_mtime
+            ):
+                self.load_cache(cache_path)
+                return
+
+            import pandas as pd  # Only needed to rebuild the cache
+
             logger.info("Loading movie ID mappings...")
-            links_df = pd.read_csv(settings.DATASET_PATH / "links.csv")
-            
+            links_df = pd.read_csv(links_path)
+
             # Convert IDs to appropriate types and handle NA values
             links_df["movieId"] = links_df["movieId"].astype(int)
-            
+
             # Handle NA values in tmdbId before converting to int
             links_df["tmdbId"] = pd.to_numeric(links_df["tmdbId"], errors='coerce').fillna(-1).astype(int)
             # Filter out rows where tmdbId is -1 (previously NA)
             valid_tmdb_links = links_df[links_df["tmdbId"] != -1]
-            
+
             # Create bidirectional mappings only for valid entries
-            self.movielens_to_tmdb = dict(zip(valid_tmdb_links["movieId"], valid_tmdb_links["tmdbId"]))
-            self.tmdb_to_movielens = dict(zip(valid_tmdb_links["tmdbId"], valid_tmdb_links["movieId"]))
-            
-            logger.info(f"Loaded mappings for {len(self.movielens_to_tmdb)} TMDB movies")
-            
+            self._build(valid_tmdb_links["movieId"].to_numpy(), valid_tmdb_links["tmdbId"].to_numpy())
+            logger.info(f"Loaded mappings for {len(self.movielens_ids)} TMDB movies")
+
+            try:
+                self.save_cache(cache_path)
+            except OSError as e:
+                logger.warning(f"Could not write ID mapping cache: {str(e)}")
+
         except Exception as e:
             logger.error(f"Error loading ID mappings: {str(e)}")
             raise
-    
+
+    def save_cache(self, cache_path: Path) -> None:
+        """
+        Write the lookup arrays to a binary cache file
+        Args:
+            cache_path: Destination .npy file
+        """
+        cache_path = Path(cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        n, m = len(self.movielens_ids), len(self.tmdb_keys)
+        # One int32 table: column 0 holds each row's length, the rest the padded arrays
+        table = np.full((4, max(n, m) + 1), MISSING_ID, dtype=np.int32)
+        table[:, 0] = [n, n, m, m]
+        table[0, 1:n + 1], table[1, 1:n + 1] = self.movielens_ids, self.tmdb_ids
+        table[2, 1:m + 1], table[3, 1:m + 1] = self.tmdb_keys, self.tmdb_movielens_ids
+
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, table)
+        os.replace(tmp_path, cache_path)
+        logger.info(f"Saved ID mapping cache to {cache_path}")
+
+    def load_cache(self, cache_path: Path) -> None:
+        """
+        Memory-map the lookup arrays from a binary cache file
+        Args:
+            cache_path: .npy file written by save_cache
+        """
+        table = np.load(cache_path, mmap_mode="r")
+        n, m = int(table[0, 0]), int(table[2, 0])
+        self.movielens_ids, self.tmdb_ids = table[0, 1:n + 1], table[1, 1:n + 1]
+        self.tmdb_keys, self.tmdb_movielens_ids = table[2, 1:m + 1], table[3, 1:m + 1]
+        logger.info(f"Memory-mapped ID mappings for {n} TMDB movies from {cache_path}")
+
+    @staticmethod
+    def _lookup(keys: np.ndarray, values: np.ndarray, ids) -> np.ndarray:
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(keys) == 0:
+            return np.full(ids.shape, MISSING_ID, dtype=np.int32)
+        positions = np.minimum(np.searchsorted(keys, ids), len(keys) - 1)
+        return np.where(keys[positions] == ids, values[positions], MISSING_ID).astype(np.int32)
+
+    def get_tmdb_ids(self, movielens_ids) -> np.ndarray:
+        """
+        Get TMDB IDs for many MovieLens IDs at once
+        Args:
+            movielens_ids: Array-like of MovieLens movie IDs
+        Returns:
+            int32 array of TMDB IDs, -1 where no mapping exists
+        """
+        return self._lookup(self.movielens_ids, self.tmdb_ids, movielens_ids)
+
+    def get_movielens_ids(self, tmdb_ids) -> np.ndarray:
+        """
+        Get MovieLens IDs for many TMDB IDs at once
+        Args:
+            tmdb_ids: Array-like of TMDB movie IDs
+        Returns:
+            int32 array of MovieLens IDs, -1 where no mapping exists
+        """
+        return self._lookup(self.tmdb_keys, self.tmdb_movielens_ids, tmdb_ids)
+
     def get_tmdb_id(self, movielens_id: int) -> Optional[int]:
         """
         Get TMDB ID from MovieLens ID
@@ -45,8 +164,9 @@ class MovieIdMapper:
         Returns:
             TMDB movie ID or None if not found
         """
-        return self.movielens_to_tmdb.get(movielens_id)
-    
+        tmdb_id = int(self.get_tmdb_ids([movielens_id])[0])
+        return None if tmdb_id == MISSING_ID else tmdb_id
+
     def get_movielens_id_from_tmdb(self, tmdb_id: int) -> Optional[int]:
         """
         Get MovieLens ID from TMDB ID
@@ -55,4 +175,23 @@ class MovieIdMapper:
         Returns:
             MovieLens movie ID or None if not found
         """
-        return self.tmdb_to_movielens.get(tmdb_id) 
\ No newline at end of file
+        movielens_id = int(self.get_movielens_ids([tmdb_id])[0])
+        return None if movielens_id == MISSING_ID else movielens_id
+
+_id_mapper: Optional[MovieIdMapper] = None
+_id_mapper_lock = threading.Lock()
+
+def get_id_mapper() -> MovieIdMapper:
+    """
+    Get the process-wide ID mapper, loading it on first use
+    Returns:
+        Shared MovieIdMapper
+    """
+    global _id_mapper
+    if _id_mapper is None:
+        with _id_mapper_lock:
+            if _id_mapper is None:
+                mapper = MovieIdMapper()
+                mapper.load_mappings()
+                _id_mapper = mapper
+    return _id_mapper
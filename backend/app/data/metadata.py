@@ -0,0 +1,136 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+from ..core.logging import logger
+from .filters import NO_GENRES, parse_release_year
+from .search_index import display_title
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+class MovieMetadataStore:
+    """
+    Columnar title, genre, year and rating metadata aligned with the catalog rows
+
+    Built once at train time from movies.csv and saved with the model, so
+    serving needs neither pandas nor TMDB for the basic fields. Titles live in
+    one UTF-8 buffer with offsets, genres are interned into small integer IDs
+    stored CSR-style, and every array memory-maps with the rest of the model.
+    """
+
+    def __init__(self):
+        """Initialize an empty store"""
+        self.movie_ids: Optional[np.ndarray] = None
+        self.title_buffer: Optional[np.ndarray] = None
+        self.title_offsets: Optional[np.ndarray] = None
+        self.genre_names: List[str] = []
+        self.genre_indptr: Optional[np.ndarray] = None
+        self.genre_ids: Optional[np.ndarray] = None
+        self.years: Optional[np.ndarray] = None
+        self.ml_ratings: Optional[np.ndarray] = None  # MovieLens mean rating x2, a local 0-10 estimate
+
+    def fit(self, movies_df: "pd.DataFrame", ratings=None,
+            rated_movie_ids: Optional[Sequence[int]] = None) -> "MovieMetadataStore":
+        """
+        Build the columns from the rows of movies_df
+        Args:
+            movies_df: Movies with movieId, title and genres columns
+            ratings: Optional sparse ratings matrix (users x rated movies) for mean ratings
+            rated_movie_ids: Movie ID of each ratings column
+        Returns:
+            The fitted store
+        """
+        self.movie_ids = movies_df['movieId'].to_numpy(dtype=np.int64)
+        titles = list(movies_df['title'])
+
+        encoded = [title.encode('utf-8') for title in titles]
+        self.title_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(title) for title in encoded], out=self.title_offsets[1:])
+        self.title_buffer = np.frombuffer(b''.join(encoded), dtype=np.uint8).copy()
+
+        split_genres = [[g for g in genres.split('|') if g != NO_GENRES] for genres in movies_df['genres']]
+        self.genre_names = sorted({g for genres in split_genres for g in genres})
+        genre_index = {name: i for i, name in enumerate(self.genre_names)}
+        self.genre_indptr = np.zeros(len(split_genres) + 1, dtype=np.int32)
+        np.cumsum([len(genres) for genres in split_genres], out=self.genre_indptr[1:])
+        self.genre_ids = np.array([genre_index[g] for genres in split_genres for g in genres], dtype=np.int16)
+
+        self.years = np.array([parse_release_year(title) for title in titles], dtype=np.int16)
+
+        # MovieLens mean rating doubled to a 0-10 scale, 0 for unrated movies; not TMDB's vote average
+        self.ml_ratings = np.zeros(len(self.movie_ids), dtype=np.float32)
+        if ratings is not None and rated_movie_ids is not None and ratings.nnz:
+            order = np.argsort(self.movie_ids, kind='stable')
+            rated_movie_ids = np.asarray(rated_movie_ids, dtype=np.int64)
+            pos = np.minimum(np.searchsorted(self.movie_ids, rated_movie_ids, sorter=order), len(order) - 1)
+            rows = order[pos]
+            known = self.movie_ids[rows] == rated_movie_ids
+            ratings = ratings.tocsc()
+            counts = np.diff(ratings.indptr)
+            sums = np.asarray(ratings.sum(axis=0)).ravel()
+            rated = known & (counts > 0)
+            self.ml_ratings[rows[rated]] = np.round(sums[rated] / counts[rated] * 2, 1)
+
+        logger.info(
+            f"Built metadata store: {len(self.movie_ids)} movies, {len(self.genre_names)} genres, "
+            f"{len(self.title_buffer) / 2**20:.1f} MiB of titles"
+        )
+        return self
+
+    def title(self, row: int) -> str:
+        """Display title of a catalog row, leading article restored ("The Firm (1993)")"""
+        return display_title(
+            str(memoryview(self.title_buffer)[self.title_offsets[row]:self.title_offsets[row + 1]], 'utf-8')
+        )
+
+    def genres(self, row: int) -> List[str]:
+        """Genre names of a catalog row"""
+        return [self.genre_names[g] for g in self.genre_ids[self.genre_indptr[row]:self.genre_indptr[row + 1]]]
+
+    def genre_matrix(self, rows: Sequence[int]) -> csr_matrix:
+        """
+        One-hot genre matrix for a list of catalog rows
+        Args:
+            rows: Catalog rows; negative rows get empty rows
+        Returns:
+            CSR matrix (len(rows) x genres) with a 1 per genre of each movie
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        known = rows >= 0
+        starts = np.where(known, self.genre_indptr[np.maximum(rows, 0)], 0)
+        lengths = np.where(known, self.genre_indptr[np.maximum(rows, 0) + 1] - starts, 0)
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        positions = np.arange(indptr[-1]) + np.repeat(starts - indptr[:-1], lengths)
+        return csr_matrix(
+            (np.ones(len(positions), dtype=np.float32), np.asarray(self.genre_ids)[positions], indptr),
+            shape=(len(rows), len(self.genre_names))
+        )
+
+    def records(self, rows: Sequence[int]) -> List[Dict]:
+        """
+        Response fields for many catalog rows at once
+        Args:
+            rows: Catalog rows
+        Returns:
+            One dict per row with movieId, title (as in title()), genres, year (None
+            if unknown) and ml_rating_10, the MovieLens mean rating on a 0-10 scale
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        movie_ids = self.movie_ids[rows].tolist()
+        years = self.years[rows].tolist()
+        ml_ratings = self.ml_ratings[rows].tolist()
+        starts, stops = self.title_offsets[rows].tolist(), self.title_offsets[rows + 1].tolist()
+        genre_starts, genre_stops = self.genre_indptr[rows].tolist(), self.genre_indptr[rows + 1].tolist()
+        # Slicing plain memoryviews avoids creating a (memory-mapped) array per row
+        titles, genre_ids = memoryview(self.title_buffer), memoryview(self.genre_ids)
+        return [
+            {
+                'movieId': movie_ids[i],
+                'title': display_title(str(titles[starts[i]:stops[i]], 'utf-8')),
+                'genres': [self.genre_names[g] for g in genre_ids[genre_starts[i]:genre_stops[i]].tolist()],
+                'year': years[i] or None,
+                'ml_rating_10': round(ml_ratings[i], 1)
+            }
+            for i in range(len(rows))
+        ]
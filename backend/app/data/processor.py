@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from typing import Dict, Tuple, Optional
+from scipy.sparse import csr_matrix
 from ..core.logging import logger
 from ..core.config import settings
 
@@ -16,8 +17,12 @@ class DataProcessor:
         self.movie_to_idx: Dict[int, int] = {}
         self.idx_to_movie: Dict[int, int] = {}
         
-    def load_data(self) -> None:
-        """Load and preprocess the dataset"""
+    def load_data(self, load_tags: bool = True) -> None:
+        """
+        Load and preprocess the dataset
+        Args:
+            load_tags: Also load tags.csv into memory (ContentFeaturePipeline streams it instead)
+        """
         try:
             # Load movies
             logger.info("Loading movies dataset...")
@@ -31,14 +36,16 @@ class DataProcessor:
             self.ratings_df["userId"] = self.ratings_df["userId"].astype(int)
             
             # Load tags if available
-            try:
-                logger.info("Loading tags dataset...")
-                self.tags_df = pd.read_csv(settings.DATASET_PATH / "tags.csv")
-                self.tags_df["movieId"] = self.tags_df["movieId"].astype(int)
-                self.tags_df["userId"] = self.tags_df["userId"].astype(int)
-            except FileNotFoundError:
-                logger.warning("Tags file not found, continuing without tags")
-                self.tags_df = None
+            self.tags_df = None
+            if load_tags:
+                try:
+                    logger.info("Loading tags dataset...")
+                    self.tags_df = pd.read_csv(settings.DATASET_PATH / "tags.csv")
+                    self.tags_df["movieId"] = self.tags_df["movieId"].astype(int)
+                    self.tags_df["userId"] = self.tags_df["userId"].astype(int)
+                except FileNotFoundError:
+                    logger.warning("Tags file not found, continuing without tags")
+                    self.tags_df = None
             
             # Create movie mappings
             self._create_movie_mappings()
@@ -89,6 +96,28 @@ class DataProcessor:
         logger.info(f"Created user-movie matrix with shape: {user_movie_matrix.shape}")
         return user_movie_matrix
     
+    def get_sparse_user_movie_matrix(self) -> Tuple[csr_matrix, np.ndarray, np.ndarray]:
+        """
+        Create user-movie rating matrix in CSR format without a dense pivot
+        Returns:
+            Tuple of (ratings matrix, user IDs for rows, movie IDs for columns)
+        """
+        if self.ratings_df is None:
+            raise ValueError("Ratings data not loaded")
+
+        # Factorize IDs in sorted order so rows/columns match the dense pivot layout
+        user_codes, user_ids = pd.factorize(self.ratings_df["userId"], sort=True)
+        movie_codes, movie_ids = pd.factorize(self.ratings_df["movieId"], sort=True)
+
+        matrix = csr_matrix(
+            (self.ratings_df["rating"].to_numpy(dtype=np.float32), (user_codes, movie_codes)),
+            shape=(len(user_ids), len(movie_ids))
+        )
+        matrix.sum_duplicates()
+
+        logger.info(f"Created sparse user-movie matrix with shape: {matrix.shape}, nnz: {matrix.nnz}")
+        return matrix, np.asarray(user_ids), np.asarray(movie_ids)
+
     def get_movie_index(self, movie_id: int) -> int:
         """
         Get movie index from movie ID
@@ -0,0 +1,391 @@
+import csv
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+import numpy as np
+from ..core.logging import logger
+from ..core.config import settings
+from .filters import NO_GENRES, parse_release_year
+from .id_mapper import MovieIdMapper, get_id_mapper
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# MovieLens moves leading articles to the end: "Matrix, The (1999)"
+_ARTICLE_PATTERN = re.compile(r"^(.*), (The|A|An|Les|La|Le|L'|Il|Das|Der|Die|El|Los|Las)( \(.*)?$")
+_TOKEN_PATTERN = re.compile(r"[^0-9a-z]+")
+
+def normalize_tokens(text: str) -> List[str]:
+    """
+    Lowercase, strip accents and punctuation, and split into tokens
+    Args:
+        text: Raw text
+    Returns:
+        List of normalized tokens
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return [token for token in _TOKEN_PATTERN.split(text) if token]
+
+def display_title(title: str) -> str:
+    """
+    Restore the leading article of a MovieLens title
+    Args:
+        title: MovieLens title, e.g. "Matrix, The (1999)"
+    Returns:
+        Title in natural order, e.g. "The Matrix (1999)"
+    """
+    match = _ARTICLE_PATTERN.match(title)
+    if not match:
+        return title
+    name, article, rest = match.groups()
+    separator = "" if article.endswith("'") else " "
+    return f"{article}{separator}{name}{rest or ''}"
+
+def _trigrams(token: str) -> List[str]:
+    padded = f"${token}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+class TitleSearchIndex:
+    """
+    In-process prefix and fuzzy title search over movies.csv.
+
+    Titles are normalized into tokens and stored in a sorted vocabulary with
+    CSR-style postings (token -> movie rows), so every completion of a prefix is
+    one contiguous slice. Misspelled tokens fall back to a trigram index over the
+    vocabulary. Matches are ranked by text score weighted by rating popularity.
+    """
+
+    FUZZY_THRESHOLD = 0.3
+    FUZZY_MAX_TOKENS = 20
+    PREFIX_WEIGHT = 0.9
+    POPULARITY_WEIGHT = 0.5
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self.movie_ids: Optional[np.ndarray] = None
+        self.tmdb_ids: Optional[np.ndarray] = None
+        self.titles: List[str] = []
+        self.genres: List[List[str]] = []
+        self.years: Optional[np.ndarray] = None
+        self.ml_ratings: Optional[np.ndarray] = None
+        self.popularity: Optional[np.ndarray] = None
+        self.vocabulary: List[str] = []
+        self.postings_indptr: Optional[np.ndarray] = None
+        self.postings: Optional[np.ndarray] = None
+        self.trigram_index: Dict[str, np.ndarray] = {}
+        self.trigram_counts: Optional[np.ndarray] = None
+        self.tmdb_order: Optional[np.ndarray] = None
+        self.popularity_order: Optional[np.ndarray] = None
+
+    def build(self, movies_df: "pd.DataFrame", id_mapper: MovieIdMapper,
+              ratings_df: Optional["pd.DataFrame"] = None) -> "TitleSearchIndex":
+        """
+        Build the index for movies that have a TMDB ID
+        Args:
+            movies_df: Movies with movieId, title and genres columns
+            id_mapper: Loaded MovieLens -> TMDB mapper
+            ratings_df: Optional ratings with movieId and rating columns, used for popularity
+        Returns:
+            The built index
+        """
+        return self.build_from_arrays(
+            movies_df["movieId"].to_numpy(), list(movies_df["title"]), list(movies_df["genres"]), id_mapper,
+            ratings_df["movieId"].to_numpy() if ratings_df is not None else None,
+            ratings_df["rating"].to_numpy() if ratings_df is not None else None
+        )
+
+    def build_from_arrays(self, movie_ids: Sequence[int], titles: Sequence[str], genres: Sequence[str],
+                          id_mapper: MovieIdMapper, rating_movie_ids: Optional[np.ndarray] = None,
+                          ratings: Optional[np.ndarray] = None) -> "TitleSearchIndex":
+        """
+        Build the index for movies that have a TMDB ID
+        Args:
+            movie_ids: MovieLens movie IDs
+            titles: MovieLens title per movie
+            genres: Pipe-separated genres per movie
+            id_mapper: Loaded MovieLens -> TMDB mapper
+            rating_movie_ids: Optional movie ID of each rating, used for popularity
+            ratings: Optional rating values aligned with rating_movie_ids
+        Returns:
+            The built index
+        """
+        movie_ids = np.asarray(movie_ids, dtype=np.int64)
+        counts = np.zeros(len(movie_ids))
+        means = np.zeros(len(movie_ids))
+        if rating_movie_ids is not None and len(rating_movie_ids):
+            # Per-movie rating counts and means via one sort of the rated IDs
+            rated, inverse = np.unique(np.asarray(rating_movie_ids, dtype=np.int64), return_inverse=True)
+            rated_counts = np.bincount(inverse)
+            rated_means = np.bincount(inverse, weights=np.asarray(ratings, dtype=np.float64)) / rated_counts
+            pos = np.minimum(np.searchsorted(rated, movie_ids), len(rated) - 1)
+            found = rated[pos] == movie_ids
+            counts[found] = rated_counts[pos[found]]
+            means[found] = rated_means[pos[found]]
+        split_genres = [[g for g in row.split("|") if g != NO_GENRES] for row in genres]
+        return self._build(movie_ids, titles, split_genres, id_mapper, counts, np.round(means * 2, 1))
+
+    def build_from_model(self, recommender, id_mapper: MovieIdMapper) -> Optional["TitleSearchIndex"]:
+        """
+        Build the index from a loaded model's metadata store and ratings
+        Args:
+            recommender: Fitted HybridRecommender
+            id_mapper: Loaded MovieLens -> TMDB mapper
+        Returns:
+            The built index, or None if the model predates the metadata store or stored ratings
+        """
+        metadata = getattr(recommender, "metadata", None)
+        ratings = getattr(recommender, "ratings", None)
+        if metadata is None or ratings is None:
+            return None
+        buffer, offsets = memoryview(metadata.title_buffer), metadata.title_offsets.tolist()
+        titles = [str(buffer[offsets[row]:offsets[row + 1]], "utf-8") for row in range(len(metadata.movie_ids))]
+        genres = [metadata.genres(row) for row in range(len(metadata.movie_ids))]
+        # Ratings per column of the model's ratings matrix, moved to catalog rows
+        counts = np.zeros(len(metadata.movie_ids))
+        columns = recommender.rating_catalog_rows
+        known = columns >= 0
+        counts[columns[known]] = np.bincount(ratings.indices, minlength=len(columns))[known]
+        return self._build(metadata.movie_ids, titles, genres, id_mapper, counts, metadata.ml_ratings)
+
+    def _build(self, movie_ids: Sequence[int], titles: Sequence[str], genres: Sequence[List[str]],
+               id_mapper: MovieIdMapper, counts: np.ndarray, ml_ratings: np.ndarray) -> "TitleSearchIndex":
+        """Build the index from per-movie titles, genre lists, rating counts and 0-10 MovieLens ratings"""
+        movie_ids = np.asarray(movie_ids, dtype=np.int64)
+        tmdb_ids = id_mapper.get_tmdb_ids(movie_ids)
+        keep = tmdb_ids > 0
+        self.movie_ids = movie_ids[keep]
+        self.tmdb_ids = tmdb_ids[keep].astype(np.int64)
+        kept_titles = [title for title, k in zip(titles, keep) if k]
+        self.titles = [display_title(title) for title in kept_titles]
+        self.genres = [list(row) for row, k in zip(genres, keep) if k]
+        self.years = np.array([parse_release_year(title) for title in kept_titles], dtype=np.int16)
+
+        counts = np.asarray(counts, dtype=np.float64)[keep]
+        self.popularity = (np.log1p(counts) / max(np.log1p(counts).max(initial=0.0), 1.0)).astype(np.float32)
+        self.ml_ratings = np.asarray(ml_ratings, dtype=np.float32)[keep]  # MovieLens mean doubled to 0-10
+        # Lookup orders for serving local metadata when TMDB is unavailable
+        self.tmdb_order = np.argsort(self.tmdb_ids, kind="stable")
+        self.popularity_order = np.argsort(-self.popularity, kind="stable")
+
+        # Token -> rows postings in sorted vocabulary order
+        postings: Dict[str, set] = {}
+        for row, title in enumerate(self.titles):
+            for token in normalize_tokens(title):
+                postings.setdefault(token, set()).add(row)
+        self.vocabulary = sorted(postings)
+        lengths = [len(postings[token]) for token in self.vocabulary]
+        self.postings_indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.postings = np.array(
+            [row for token in self.vocabulary for row in sorted(postings[token])], dtype=np.int32
+        )
+
+        # Trigram -> token ids for fuzzy matching
+        trigram_tokens: Dict[str, List[int]] = {}
+        self.trigram_counts = np.zeros(len(self.vocabulary), dtype=np.int32)
+        for token_id, token in enumerate(self.vocabulary):
+            grams = set(_trigrams(token))
+            self.trigram_counts[token_id] = len(grams)
+            for gram in grams:
+                trigram_tokens.setdefault(gram, []).append(token_id)
+        self.trigram_index = {gram: np.array(ids, dtype=np.int32) for gram, ids in trigram_tokens.items()}
+
+        logger.info(
+            f"Built title search index: {len(self.titles)} movies, "
+            f"{len(self.vocabulary)} tokens, {len(self.trigram_index)} trigrams"
+        )
+        return self
+
+    def load_index(self, id_mapper: MovieIdMapper) -> "TitleSearchIndex":
+        """
+        Build the index from the dataset files
+        Args:
+            id_mapper: Loaded MovieLens -> TMDB mapper
+        Returns:
+            The built index
+        """
+        # Plain csv/NumPy readers keep pandas out of the serving process
+        with open(settings.DATASET_PATH / "movies.csv", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        try:
+            ratings = np.loadtxt(settings.DATASET_PATH / "ratings.csv", delimiter=",", skiprows=1,
+                                 usecols=(1, 2), ndmin=2)
+        except FileNotFoundError:
+            logger.warning("Ratings file not found, search ranking ignores popularity")
+            ratings = np.empty((0, 2))
+        return self.build_from_arrays(
+            [int(row["movieId"]) for row in rows], [row["title"] for row in rows],
+            [row["genres"] for row in rows], id_mapper, ratings[:, 0], ratings[:, 1]
+        )
+
+    def _token_matches(self, token: str, is_prefix: bool):
+        """Rows matching one query token, their match weights, and whether they are fuzzy matches"""
+        if is_prefix:
+            lo = bisect_left(self.vocabulary, token)
+            hi = bisect_left(self.vocabulary, token + "\uffff")
+        else:
+            lo = bisect_left(self.vocabulary, token)
+            hi = lo + 1 if lo < len(self.vocabulary) and self.vocabulary[lo] == token else lo
+        if hi > lo:
+            # Contiguous vocabulary range -> one contiguous postings slice
+            start, stop = self.postings_indptr[lo], self.postings_indptr[hi]
+            rows = self.postings[start:stop]
+            weights = np.full(len(rows), self.PREFIX_WEIGHT, dtype=np.float32)
+            if self.vocabulary[lo] == token:
+                weights[:self.postings_indptr[lo + 1] - start] = 1.0
+            return rows, weights, False
+        return (*self._fuzzy_matches(token), True)
+
+    def _fuzzy_matches(self, token: str):
+        grams = [self.trigram_index[g] for g in set(_trigrams(token)) if g in self.trigram_index]
+        if not grams:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        token_ids = np.concatenate(grams)
+        shared = np.bincount(token_ids)
+        candidates = np.flatnonzero(shared)
+        # Dice coefficient over trigram sets
+        dice = 2.0 * shared[candidates] / (len(set(_trigrams(token))) + self.trigram_counts[candidates])
+        keep = dice >= self.FUZZY_THRESHOLD
+        candidates, dice = candidates[keep], dice[keep]
+        best = np.argsort(-dice)[:self.FUZZY_MAX_TOKENS]
+        rows, weights = [], []
+        for token_id, score in zip(candidates[best], dice[best]):
+            token_rows = self.postings[self.postings_indptr[token_id]:self.postings_indptr[token_id + 1]]
+            rows.append(token_rows)
+            weights.append(np.full(len(token_rows), score * self.PREFIX_WEIGHT, dtype=np.float32))
+        if not rows:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        return np.concatenate(rows), np.concatenate(weights)
+
+    @staticmethod
+    def _best_per_row(rows: np.ndarray, weights: np.ndarray):
+        order = np.argsort(-weights, kind="stable")
+        unique_rows, first = np.unique(rows[order], return_index=True)
+        return unique_rows, weights[order][first]
+
+    def search(self, query: str, limit: int = 20, complete_only: bool = False) -> List[Dict]:
+        """
+        Search titles by prefix with typo tolerance
+        Args:
+            query: Search text; the last token is matched as a prefix
+            limit: Maximum number of results
+            complete_only: Only return titles containing every query token, exactly or as a
+                prefix; typo and partial matches are left out
+        Returns:
+            List of result dicts ranked by text match and popularity
+        """
+        tokens = normalize_tokens(query)
+        if not tokens or self.postings is None:
+            return []
+
+        matched_rows, matched_scores = None, None
+        any_rows, any_scores = [], []
+        any_fuzzy = False
+        for i, token in enumerate(tokens):
+            rows, weights, fuzzy = self._token_matches(token, is_prefix=i == len(tokens) - 1)
+            rows, weights = self._best_per_row(rows, weights)
+            any_fuzzy = any_fuzzy or fuzzy
+            any_rows.append(rows)
+            any_scores.append(weights)
+            if matched_rows is None:
+                matched_rows, matched_scores = rows, weights
+            else:
+                matched_rows, left, right = np.intersect1d(matched_rows, rows, assume_unique=True,
+                                                           return_indices=True)
+                matched_scores = matched_scores[left] + weights[right]
+
+        if complete_only and (any_fuzzy or len(matched_rows) == 0):
+            return []
+        if len(matched_rows) == 0:
+            # No title contains every token: rank partial matches instead
+            rows = np.concatenate(any_rows)
+            if len(rows) == 0:
+                return []
+            matched_rows, inverse = np.unique(rows, return_inverse=True)
+            matched_scores = np.bincount(inverse, weights=np.concatenate(any_scores))
+
+        scores = matched_scores / len(tokens) * (1.0 + self.POPULARITY_WEIGHT * self.popularity[matched_rows])
+        n = min(limit, len(matched_rows))
+        if n <= 0:
+            return []
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [self._result(matched_rows[i], scores[i]) for i in top]
+
+    def get_movie(self, tmdb_id: int) -> Optional[Dict]:
+        """
+        Local metadata for a movie
+        Args:
+            tmdb_id: TMDB movie ID
+        Returns:
+            Result dict (without a meaningful score), or None if the movie is not in movies.csv
+        """
+        if self.tmdb_order is None or not len(self.tmdb_order):
+            return None
+        pos = min(np.searchsorted(self.tmdb_ids, tmdb_id, sorter=self.tmdb_order), len(self.tmdb_order) - 1)
+        row = self.tmdb_order[pos]
+        if self.tmdb_ids[row] != tmdb_id:
+            return None
+        return self._result(row, 0.0)
+
+    def most_popular(self, offset: int = 0, limit: int = 20) -> List[Dict]:
+        """
+        Movies ranked by rating popularity
+        Args:
+            offset: Number of movies to skip
+            limit: Maximum number of results
+        Returns:
+            List of result dicts, most popular first
+        """
+        if self.popularity_order is None:
+            return []
+        return [self._result(row, self.popularity[row]) for row in self.popularity_order[offset:offset + limit]]
+
+    def _result(self, row: int, score: float) -> Dict:
+        return {
+            "id": int(self.tmdb_ids[row]),
+            "movieId": int(self.movie_ids[row]),
+            "title": self.titles[row],
+            "genres": self.genres[row],
+            "year": int(self.years[row]) or None,
+            "ml_rating_10": round(float(self.ml_ratings[row]), 1),
+            "score": float(score),
+        }
+
+_search_index: Optional[TitleSearchIndex] = None
+_search_index_lock = threading.Lock()
+
+def build_search_index(recommender) -> TitleSearchIndex:
+    """
+    Build the process-wide title search index from the serving model, e.g. during warmup
+    Args:
+        recommender: Loaded HybridRecommender; models without a metadata store and
+            stored ratings fall back to the dataset files
+    Returns:
+        The new shared TitleSearchIndex
+    """
+    global _search_index
+    # Held while building, so searches arriving meanwhile wait instead of reading the files
+    with _search_index_lock:
+        index = TitleSearchIndex().build_from_model(recommender, get_id_mapper())
+        if index is None:
+            logger.warning("Model has no metadata store or ratings, building the search index from the dataset files")
+            index = TitleSearchIndex().load_index(get_id_mapper())
+        _search_index = index
+    return index
+
+def get_search_index() -> TitleSearchIndex:
+    """
+    Get the process-wide title search index, reading the dataset files on first
+    use if warmup has not built it from the model
+    Returns:
+        Shared TitleSearchIndex
+    """
+    global _search_index
+    if _search_index is None:
+        with _search_index_lock:
+            if _search_index is None:
+                _search_index = TitleSearchIndex().load_index(get_id_mapper())
+    return _search_index
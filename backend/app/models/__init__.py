@@ -1,11 +1,23 @@
 from .base import BaseRecommender
 from .content import ContentBasedRecommender
 from .collaborative import CollaborativeRecommender
+from .als import ALSRecommender
+from .item_item import ItemItemRecommender
+from .fallback import ColdStartRecommender
+from .candidates import CandidateGenerator
+from .genre_profiles import UserGenreProfiles
+from .quantized import QuantizedFactors
 from .hybrid import HybridRecommender
 
 __all__ = [
     'BaseRecommender',
     'ContentBasedRecommender',
     'CollaborativeRecommender',
+    'ALSRecommender',
+    'ItemItemRecommender',
+    'ColdStartRecommender',
+    'CandidateGenerator',
+    'UserGenreProfiles',
+    'QuantizedFactors',
     'HybridRecommender'
 ] 
\ No newline at end of file
@@ -0,0 +1,141 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence
+import numpy as np
+from scipy.sparse import csr_matrix
+from .base import BaseRecommender, as_sparse_ratings
+from ..core.logging import logger
+
+class ALSRecommender(BaseRecommender):
+    """
+    Collaborative filtering with regularized alternating least squares.
+
+    Works directly on the sparse ratings matrix: only observed ratings enter the
+    normal equations, so memory and fit time grow with the number of ratings
+    rather than users x movies. Exposes the same attributes as
+    CollaborativeRecommender (user_factors, movie_factors, user_idx_map, ...).
+    """
+
+    def __init__(self, n_factors: int = 64, regularization: float = 0.1,
+                 iterations: int = 15, n_jobs: Optional[int] = None,
+                 block_size: int = 1024, random_state: int = 42):
+        super().__init__()
+        self.n_factors = n_factors
+        self.regularization = regularization
+        self.iterations = iterations
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.block_size = block_size
+        self.random_state = random_state
+        self.user_factors = None
+        self.movie_factors = None
+        self.user_ids = None
+        self.movie_ids = None
+        self.user_idx_map = None
+        self.movie_idx_map = None
+        self.ratings = None
+
+    def fit(self, user_movie_matrix, user_ids: Optional[Sequence[int]] = None,
+            movie_ids: Optional[Sequence[int]] = None, warm_start: bool = False):
+        """
+        Fit user and movie factors
+        Args:
+            user_movie_matrix: Sparse ratings matrix (users x movies) or a dense pivot DataFrame
+            user_ids: User ID for each row (required for sparse input)
+            movie_ids: Movie ID for each column (required for sparse input)
+            warm_start: Initialize from the current factors for users/movies seen in a previous fit
+        """
+        ratings, user_ids, movie_ids = as_sparse_ratings(user_movie_matrix, user_ids, movie_ids)
+        user_factors, movie_factors = self._init_factors(user_ids, movie_ids, warm_start)
+
+        self.user_ids = user_ids
+        self.movie_ids = movie_ids
+        self.user_idx_map = {uid: idx for idx, uid in enumerate(user_ids)}
+        self.movie_idx_map = {mid: idx for idx, mid in enumerate(movie_ids)}
+        self.ratings = ratings
+
+        ratings_by_movie = ratings.T.tocsr()
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
+            for iteration in range(self.iterations):
+                self._solve(ratings, movie_factors, user_factors, executor)
+                self._solve(ratings_by_movie, user_factors, movie_factors, executor)
+                logger.debug(f"ALS iteration {iteration + 1}/{self.iterations} done")
+
+        self.user_factors = user_factors
+        self.movie_factors = movie_factors
+        self.is_fitted = True
+        logger.info(
+            f"Fitted ALS with {self.n_factors} factors on {ratings.nnz} ratings "
+            f"({len(user_ids)} users x {len(movie_ids)} movies)"
+        )
+
+    def _init_factors(self, user_ids, movie_ids, warm_start):
+        """Random initialization, optionally seeded with factors from the previous fit"""
+        rng = np.random.default_rng(self.random_state)
+        scale = 1.0 / np.sqrt(self.n_factors)
+        user_factors = (rng.standard_normal((len(user_ids), self.n_factors)) * scale).astype(np.float32)
+        movie_factors = (rng.standard_normal((len(movie_ids), self.n_factors)) * scale).astype(np.float32)
+
+        if warm_start and self.is_fitted and self.user_factors.shape[1] == self.n_factors:
+            self._copy_previous(user_ids, self.user_idx_map, self.user_factors, user_factors)
+            self._copy_previous(movie_ids, self.movie_idx_map, self.movie_factors, movie_factors)
+            logger.info("Warm-starting ALS from previous factors")
+        return user_factors, movie_factors
+
+    @staticmethod
+    def _copy_previous(ids, previous_idx_map, previous_factors, factors):
+        rows = np.array([previous_idx_map.get(i, -1) for i in ids], dtype=np.int64)
+        known = rows >= 0
+        factors[known] = previous_factors[rows[known]]
+
+    def _solve(self, ratings: csr_matrix, fixed: np.ndarray, target: np.ndarray,
+               executor: ThreadPoolExecutor) -> None:
+        """Solve every row of `target` against the `fixed` factors, in parallel blocks"""
+        n_rows = ratings.shape[0]
+        fixed = fixed.astype(np.float64)
+        blocks = range(0, n_rows, self.block_size)
+        list(executor.map(
+            lambda start: self._solve_block(ratings, fixed, target, start,
+                                            min(start + self.block_size, n_rows)),
+            blocks
+        ))
+
+    def _solve_block(self, ratings, fixed, target, start, stop):
+        indptr, indices, data = ratings.indptr, ratings.indices, ratings.data
+        k = self.n_factors
+        eye = np.eye(k)
+        lhs = np.empty((stop - start, k, k))
+        rhs = np.zeros((stop - start, k))
+        for row in range(start, stop):
+            lo, hi = indptr[row], indptr[row + 1]
+            n_ratings = hi - lo
+            # Weighted-lambda regularization scales with the number of ratings
+            reg = self.regularization * max(n_ratings, 1)
+            if n_ratings == 0:
+                lhs[row - start] = eye * reg
+                continue
+            factors = fixed[indices[lo:hi]]
+            lhs[row - start] = factors.T @ factors + eye * reg
+            rhs[row - start] = factors.T @ data[lo:hi]
+        # Batched solve releases the GIL, so blocks run concurrently across threads
+        target[start:stop] = np.linalg.solve(lhs, rhs[..., None])[..., 0]
+
+    def get_recommendations(self, user_id: int, n_recommendations: int = 10, mask: np.ndarray = None):
+        self._check_is_fitted()
+        if user_id not in self.user_idx_map:
+            raise ValueError(f"User ID {user_id} not found.")
+        user_idx = self.user_idx_map[user_id]
+        scores = self.movie_factors @ self.user_factors[user_idx]
+        rated = self.ratings.indices[self.ratings.indptr[user_idx]:self.ratings.indptr[user_idx + 1]]
+        scores[rated] = -np.inf
+        if mask is not None:
+            scores[~mask] = -np.inf
+
+        n = min(n_recommendations, int(np.isfinite(scores).sum()))
+        if n <= 0:
+            return []
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {'movieId': int(self.movie_ids[idx]), 'score': float(scores[idx])}
+            for idx in top
+        ]
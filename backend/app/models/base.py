@@ -1,5 +1,33 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+
+def as_sparse_ratings(user_movie_matrix, user_ids: Optional[Sequence[int]] = None,
+                      movie_ids: Optional[Sequence[int]] = None) -> Tuple[csr_matrix, List[int], List[int]]:
+    """
+    Normalize rating input to (CSR matrix, user IDs, movie IDs)
+    Args:
+        user_movie_matrix: Sparse ratings matrix (users x movies) or a dense pivot DataFrame
+        user_ids: User ID for each row (required for sparse input)
+        movie_ids: Movie ID for each column (required for sparse input)
+    Returns:
+        Tuple of float32 CSR ratings without explicit zeros, user IDs and movie IDs
+    """
+    if issparse(user_movie_matrix):
+        if user_ids is None or movie_ids is None:
+            raise ValueError("user_ids and movie_ids are required for sparse input")
+        ratings = csr_matrix(user_movie_matrix, dtype=np.float32)
+    else:
+        import pandas as pd  # Only dense pivots need pandas
+
+        if not isinstance(user_movie_matrix, pd.DataFrame):
+            raise TypeError("user_movie_matrix must be a scipy sparse matrix or DataFrame")
+        user_ids = user_movie_matrix.index.tolist()
+        movie_ids = user_movie_matrix.columns.tolist()
+        ratings = csr_matrix(user_movie_matrix.values, dtype=np.float32)
+    ratings.eliminate_zeros()
+    return ratings, [int(uid) for uid in user_ids], [int(mid) for mid in movie_ids]
 
 class BaseRecommender(ABC):
     """Base class for recommendation models"""
@@ -0,0 +1,104 @@
+from typing import Dict, Optional, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix
+
+SOURCE_COLLABORATIVE = 0
+SOURCE_CONTENT = 1
+SOURCE_POPULAR = 2
+SOURCE_NAMES = ("collaborative", "content", "popular")
+
+class CandidateGenerator:
+    """
+    Retrieval stage of the hybrid pipeline.
+
+    Merges candidates from several sources into one deduplicated array of
+    catalog rows, each source under its own budget: the collaborative top-k,
+    content neighbors of the user's highest-rated movies and the global
+    popularity ranking. Everything is array operations over catalog rows, so
+    the cost is set by the budgets; raising a budget buys recall with
+    re-ranking time.
+    """
+
+    def __init__(self, collab_budget: int = 500, content_budget: int = 200,
+                 popular_budget: int = 100, n_seed_movies: int = 20):
+        """
+        Initialize the generator
+        Args:
+            collab_budget: Candidates taken from the collaborative scores
+            content_budget: Candidates taken from content neighbors of the seed movies
+            popular_budget: Candidates taken from the popularity ranking
+            n_seed_movies: Highest-rated movies of the user used as content seeds
+        """
+        self.collab_budget = collab_budget
+        self.content_budget = content_budget
+        self.popular_budget = popular_budget
+        self.n_seed_movies = n_seed_movies
+
+    def select_seeds(self, rated_rows: np.ndarray, ratings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pick the user's highest-rated movies
+        Args:
+            rated_rows: Catalog rows the user rated
+            ratings: Rating of each row
+        Returns:
+            (seed rows, their ratings), at most n_seed_movies of each
+        """
+        order = np.argsort(-ratings, kind='stable')[:self.n_seed_movies]
+        return rated_rows[order], ratings[order]
+
+    @staticmethod
+    def _top(rows: np.ndarray, scores: np.ndarray, budget: int) -> np.ndarray:
+        """Rows of the `budget` highest finite scores, best first"""
+        n = min(budget, int(np.isfinite(scores).sum()))
+        if n <= 0:
+            return np.empty(0, dtype=np.int64)
+        top = np.argpartition(-scores, n - 1)[:n]
+        return rows[top[np.argsort(-scores[top], kind='stable')]]
+
+    def generate(self, allowed: np.ndarray, collab_scores: Optional[np.ndarray] = None,
+                 seed_rows: Optional[np.ndarray] = None, seed_weights: Optional[np.ndarray] = None,
+                 content_neighbors: Optional[csr_matrix] = None,
+                 popularity_ranking: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retrieve candidates from every available source
+        Args:
+            allowed: Boolean mask over catalog rows; False for filtered-out or already rated movies
+            collab_scores: Collaborative score per catalog row, -inf for movies the model lacks
+            seed_rows: Catalog rows of the seed movies
+            seed_weights: Weight of each seed, e.g. its rating
+            content_neighbors: Top-K content similarity CSR over catalog rows
+            popularity_ranking: Catalog rows from most to least popular
+        Returns:
+            (candidate catalog rows, source of each), deduplicated keeping the first
+            source in collaborative, content, popular order
+        """
+        parts, sources = [], []
+        if collab_scores is not None and self.collab_budget > 0:
+            scores = np.where(allowed, collab_scores, -np.inf)
+            parts.append(self._top(np.arange(len(scores)), scores, self.collab_budget))
+            sources.append(SOURCE_COLLABORATIVE)
+        if content_neighbors is not None and seed_rows is not None and len(seed_rows) and self.content_budget > 0:
+            # Sparse weighted sum over the seeds' neighbor rows, independent of catalog size
+            weights = csr_matrix(np.asarray(seed_weights, dtype=np.float32).reshape(1, -1))
+            summed = weights @ content_neighbors[seed_rows]
+            keep = allowed[summed.indices]
+            parts.append(self._top(summed.indices[keep], summed.data[keep], self.content_budget))
+            sources.append(SOURCE_CONTENT)
+        if popularity_ranking is not None and self.popular_budget > 0:
+            parts.append(popularity_ranking[allowed[popularity_ranking]][:self.popular_budget].astype(np.int64))
+            sources.append(SOURCE_POPULAR)
+
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int8)
+        rows = np.concatenate(parts)
+        labels = np.repeat(np.array(sources, dtype=np.int8), [len(part) for part in parts])
+        # np.unique returns the first occurrence, so earlier sources win ties
+        _, first = np.unique(rows, return_index=True)
+        first.sort()
+        return rows[first], labels[first]
+
+    @staticmethod
+    def count_sources(labels: np.ndarray) -> Dict[str, int]:
+        """Number of candidates contributed by each source"""
+        counts = np.bincount(labels, minlength=len(SOURCE_NAMES))
+        return {name: int(count) for name, count in zip(SOURCE_NAMES, counts)}
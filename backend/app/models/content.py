@@ -1,42 +1,146 @@
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, Optional, Sequence
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy.sparse import csr_matrix
 from .base import BaseRecommender
 from ..core.logging import logger
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 class ContentBasedRecommender(BaseRecommender):
-    def __init__(self, max_features: int = 5000):
+    """
+    TF-IDF content similarity over titles and genres, or over precomputed
+    features such as ContentFeaturePipeline's hashed title/genre/tag TF-IDF.
+
+    The vectorizer only exists during fit: the model keeps the L2-normalized
+    TF-IDF CSR matrix, its feature names and plain movie arrays, so serving needs
+    no scikit-learn or pandas. Each movie's strongest word-like features are also
+    kept as a small keyword CSR matrix for explaining recommendations.
+    """
+
+    def __init__(self, max_features: int = 5000, keywords_per_movie: int = 20):
         super().__init__()
-        self.vectorizer = TfidfVectorizer(stop_words='english', max_features=max_features)
+        self.max_features = max_features
+        self.keywords_per_movie = keywords_per_movie
         self.tfidf_matrix = None
-        self.movies_df = None
+        self.feature_names = None
+        self.keyword_matrix = None
+        self.keyword_names = None
+        self.movie_ids = None
+        self.titles = None
+        self.genres = None
         self.movie_to_idx = None
         self.idx_to_movie = None
 
-    def fit(self, movies_df: pd.DataFrame, movie_to_idx: dict, idx_to_movie: dict):
-        self.movies_df = movies_df.copy()
+    def fit(self, movies_df: "pd.DataFrame", movie_to_idx: dict, idx_to_movie: dict,
+            features: Optional["csr_matrix"] = None, feature_names=None):
+        """
+        Fit the model
+        Args:
+            movies_df: Movies with movieId, title and genres columns
+            movie_to_idx: Movie ID -> row mapping
+            idx_to_movie: Row -> movie ID mapping
+            features: Optional L2-normalized feature matrix aligned with movies_df rows;
+                built from titles and genres with TfidfVectorizer if omitted
+            feature_names: Name of each feature column
+        """
         self.movie_to_idx = movie_to_idx
         self.idx_to_movie = idx_to_movie
-        # Combine title and genres for content
-        self.movies_df['content'] = self.movies_df['title'] + ' ' + self.movies_df['genres']
-        self.tfidf_matrix = self.vectorizer.fit_transform(self.movies_df['content'])
+        self.movie_ids = movies_df['movieId'].to_numpy(dtype=np.int64)
+        self.titles = movies_df['title'].to_numpy(dtype=object)
+        self.genres = movies_df['genres'].to_numpy(dtype=object)
+        if features is not None:
+            self.tfidf_matrix = features.astype(np.float32).tocsr()
+            self.feature_names = np.asarray(feature_names, dtype=object) if feature_names is not None else None
+        else:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+
+            # Combine title and genres for content
+            content = movies_df['title'] + ' ' + movies_df['genres']
+            vectorizer = TfidfVectorizer(stop_words='english', max_features=self.max_features)
+            self.tfidf_matrix = vectorizer.fit_transform(content).astype(np.float32).tocsr()
+            self.feature_names = np.asarray(vectorizer.get_feature_names_out(), dtype=object)
+        self._build_keywords()
         self.is_fitted = True
         logger.info(f"Created TF-IDF matrix with shape: {self.tfidf_matrix.shape}")
 
+    def _build_keywords(self) -> None:
+        """
+        Keep the top keywords_per_movie word-like features of every movie
+        
+        Features whose name isn't alphabetic or is shorter than three characters
+        (years, hashed buckets without a name) are dropped first. Columns are
+        renumbered over the keywords that remain, so keyword_names stays small.
+        """
+        if self.feature_names is None:
+            return
+        tfidf = self.tfidf_matrix
+        is_word = np.array([name.isalpha() and len(name) > 2 for name in self.feature_names], dtype=bool)
+        top_k = getattr(self, 'keywords_per_movie', 20)
+        indptr = np.zeros(tfidf.shape[0] + 1, dtype=np.int64)
+        columns, values = [], []
+        for row in range(tfidf.shape[0]):
+            start, stop = tfidf.indptr[row], tfidf.indptr[row + 1]
+            row_columns, row_values = tfidf.indices[start:stop], tfidf.data[start:stop]
+            keep = is_word[row_columns] & (row_values > 0)
+            row_columns, row_values = row_columns[keep], row_values[keep]
+            top = np.argsort(-row_values, kind='stable')[:top_k]
+            columns.append(row_columns[top])
+            values.append(row_values[top])
+            indptr[row + 1] = indptr[row] + len(top)
+        columns = np.concatenate(columns) if columns else np.empty(0, dtype=np.int64)
+        used, remapped = np.unique(columns, return_inverse=True)
+        self.keyword_names = np.asarray(self.feature_names, dtype=object)[used]
+        self.keyword_matrix = csr_matrix(
+            (np.concatenate(values).astype(np.float32) if values else np.empty(0, dtype=np.float32),
+             remapped.astype(np.int32), indptr),
+            shape=(tfidf.shape[0], len(used))
+        )
+
+    def keyword_profile(self, rows: Sequence[int], n_keywords: int = 15) -> Dict[str, float]:
+        """
+        Strongest keywords across a set of movies
+        Args:
+            rows: Catalog rows of the movies; negative rows are ignored
+            n_keywords: Number of keywords to return
+        Returns:
+            Keyword -> share of the total weight of the returned keywords, strongest first
+        """
+        self._check_is_fitted()
+        if getattr(self, 'keyword_matrix', None) is None:
+            # Models saved before keywords were precomputed build them once on first use
+            self._build_keywords()
+            if self.keyword_matrix is None:
+                return {}
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = rows[rows >= 0]
+        if not len(rows):
+            return {}
+        # Sparse row-sum over the movies' keyword rows, gathered straight from the CSR arrays
+        keywords = self.keyword_matrix
+        starts, lengths = keywords.indptr[rows], keywords.indptr[rows + 1] - keywords.indptr[rows]
+        positions = np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        columns, inverse = np.unique(keywords.indices[positions], return_inverse=True)
+        totals = np.bincount(inverse, weights=keywords.data[positions], minlength=len(columns))
+        top = np.argsort(-totals, kind='stable')[:n_keywords]
+        top = top[totals[top] > 0]
+        total = totals[top].sum()
+        return {self.keyword_names[columns[i]]: float(totals[i] / total) for i in top}
+
     def get_recommendations(self, movie_id: int, n_recommendations: int = 10):
         self._check_is_fitted()
         if movie_id not in self.movie_to_idx:
             raise ValueError(f"Movie ID {movie_id} not found in mapping.")
         idx = self.movie_to_idx[movie_id]
-        cosine_sim = cosine_similarity(self.tfidf_matrix[idx], self.tfidf_matrix).flatten()
+        # Rows are L2-normalized, so cosine similarity is a sparse dot product
+        cosine_sim = (self.tfidf_matrix @ self.tfidf_matrix[idx].T).toarray().ravel()
         similar_indices = cosine_sim.argsort()[-n_recommendations-1:-1][::-1]
         results = []
         for i in similar_indices:
             results.append({
-                'movieId': int(self.movies_df.iloc[i]['movieId']),
-                'title': self.movies_df.iloc[i]['title'],
-                'genres': self.movies_df.iloc[i]['genres'],
+                'movieId': int(self.movie_ids[i]),
+                'title': self.titles[i],
+                'genres': self.genres[i],
                 'score': float(cosine_sim[i])
             })
-        return results 
\ No newline at end of file
+        return results
@@ -0,0 +1,191 @@
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+import numpy as np
+from scipy.sparse import csr_matrix
+from .base import BaseRecommender, as_sparse_ratings
+from .neighbors import top_k_similarities
+from ..core.logging import logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+TIER_POPULAR = "popular"
+TIER_GENRE = "genre"
+TIER_CONTENT_SEEDED = "content_seeded"
+
+class ColdStartRecommender(BaseRecommender):
+    """
+    Precomputed fallback rankings for users without rating history.
+
+    Three tiers are built at fit time and stored as flat arrays:
+    a global Bayesian-average ranking, per-genre top lists and per-movie
+    content neighbor lists for seeding from movies the user picked. Serving
+    any tier is an array slice, with no model scoring involved.
+    """
+
+    def __init__(self, prior_ratings: int = 10, list_size: int = 200, n_content_neighbors: int = 30):
+        super().__init__()
+        self.prior_ratings = prior_ratings
+        self.list_size = list_size
+        self.n_content_neighbors = n_content_neighbors
+        self.movie_ids = None
+        self.titles = None
+        self.genres = None
+        self.movie_idx_map = None
+        self.scores = None
+        self.popular = None
+        self.ranking = None
+        self.genre_names = None
+        self.genre_offsets = None
+        self.genre_lists = None
+        self.content_neighbors = None
+
+    def fit(self, movies_df: "pd.DataFrame", user_movie_matrix, tfidf_matrix=None,
+            user_ids: Optional[Sequence[int]] = None, movie_ids: Optional[Sequence[int]] = None):
+        """
+        Build fallback rankings
+        Args:
+            movies_df: Movies with movieId, title and genres columns
+            user_movie_matrix: Sparse ratings matrix (users x movies) or a dense pivot DataFrame
+            tfidf_matrix: Optional content features aligned with movies_df rows
+            user_ids: User ID for each row (required for sparse input)
+            movie_ids: Movie ID for each column (required for sparse input)
+        """
+        ratings, _, rated_movie_ids = as_sparse_ratings(user_movie_matrix, user_ids, movie_ids)
+
+        self.movie_ids = movies_df['movieId'].to_numpy(dtype=np.int64)
+        self.titles = movies_df['title'].to_numpy(dtype=object)
+        self.genres = movies_df['genres'].to_numpy(dtype=object)
+        self.movie_idx_map = {int(mid): idx for idx, mid in enumerate(self.movie_ids)}
+
+        # Per-movie rating counts and sums, aligned with movies_df rows
+        columns = np.array([self.movie_idx_map.get(mid, -1) for mid in rated_movie_ids])
+        known = columns >= 0
+        counts = np.zeros(len(self.movie_ids))
+        sums = np.zeros(len(self.movie_ids))
+        counts[columns[known]] = np.diff(ratings.tocsc().indptr)[known]
+        sums[columns[known]] = np.asarray(ratings.sum(axis=0)).ravel()[known]
+
+        # Bayesian average shrinks movies with few ratings towards the global mean
+        global_mean = sums.sum() / max(counts.sum(), 1)
+        self.scores = ((sums + self.prior_ratings * global_mean) / (counts + self.prior_ratings)).astype(np.float32)
+        self.scores[counts == 0] = 0.0
+        ranked = np.argsort(-self.scores, kind='stable')
+        self.ranking = ranked.astype(np.int32)
+        self.popular = self.ranking[:self.list_size]
+
+        self._build_genre_lists(ranked)
+        if tfidf_matrix is not None:
+            self.content_neighbors = top_k_similarities(tfidf_matrix, self.n_content_neighbors)
+        self.is_fitted = True
+        logger.info(
+            f"Built cold-start fallback: {len(self.popular)} popular, "
+            f"{len(self.genre_names)} genre lists, content seeds: {tfidf_matrix is not None}"
+        )
+
+    def _build_genre_lists(self, ranked: np.ndarray) -> None:
+        """Per-genre top lists as one concatenated array with offsets"""
+        genre_members: Dict[str, List[int]] = {}
+        for idx in ranked:
+            if self.scores[idx] <= 0:
+                break
+            for genre in self.genres[idx].split('|'):
+                members = genre_members.setdefault(genre.lower(), [])
+                if len(members) < self.list_size:
+                    members.append(idx)
+        genre_members.pop('(no genres listed)', None)
+
+        self.genre_names = sorted(genre_members)
+        lengths = [len(genre_members[name]) for name in self.genre_names]
+        self.genre_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.genre_lists = np.array(
+            [idx for name in self.genre_names for idx in genre_members[name]], dtype=np.int32
+        )
+
+    def _genre_candidates(self, genres: Sequence[str]) -> np.ndarray:
+        lists = []
+        for genre in genres:
+            pos = np.searchsorted(self.genre_names, genre.lower())
+            if pos < len(self.genre_names) and self.genre_names[pos] == genre.lower():
+                lists.append(self.genre_lists[self.genre_offsets[pos]:self.genre_offsets[pos + 1]])
+        if not lists:
+            return np.empty(0, dtype=np.int32)
+        candidates = np.unique(np.concatenate(lists))
+        return candidates[np.argsort(-self.scores[candidates], kind='stable')]
+
+    def _seeded_candidates(self, seeds: np.ndarray):
+        if self.content_neighbors is None or len(seeds) == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        # Sparse sum over the seeds' neighbor rows, independent of catalog size
+        summed = csr_matrix(np.ones((1, len(seeds)), dtype=np.float32)) @ self.content_neighbors[seeds]
+        keep = ~np.isin(summed.indices, seeds)
+        candidates, similarity = summed.indices[keep], summed.data[keep]
+        # Rank by similarity to the seeds, breaking ties by popularity
+        order = np.lexsort((-self.scores[candidates], -similarity))
+        return candidates[order], similarity[order]
+
+    def get_recommendations(self, user_id: Optional[int] = None, n_recommendations: int = 10,
+                            genres: Optional[Sequence[str]] = None,
+                            seed_movie_ids: Optional[Sequence[int]] = None,
+                            mask: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        Get fallback recommendations, most specific tier first
+
+        Content neighbors of the seed movies come first; when they run out the
+        genre ranking (or the popular one without genres) fills the list up to
+        n_recommendations, skipping the seeds and movies already listed.
+        Args:
+            user_id: Unused, kept for interface compatibility
+            n_recommendations: Number of recommendations to return
+            genres: Optional genre names the user is interested in
+            seed_movie_ids: Optional MovieLens IDs the user liked
+            mask: Optional boolean filter over movies_df rows
+        Returns:
+            List of recommendations, each labelled with the tier that produced it
+        """
+        self._check_is_fitted()
+        seeds = np.array([self.movie_idx_map[mid] for mid in seed_movie_ids or () if mid in self.movie_idx_map],
+                         dtype=np.int64)
+        seeded, similarity = self._seeded_candidates(seeds)
+        if mask is not None:
+            keep = mask[seeded]
+            seeded, similarity = seeded[keep], similarity[keep]
+        seeded, similarity = seeded[:n_recommendations], similarity[:n_recommendations]
+
+        tier, candidates = TIER_POPULAR, self.popular
+        if genres:
+            by_genre = self._genre_candidates(genres)
+            if len(by_genre):
+                tier, candidates = TIER_GENRE, by_genre
+        n_backfill = n_recommendations - len(seeded)
+        backfill = np.empty(0, dtype=np.int32)
+        if n_backfill > 0:
+            excluded = np.concatenate([seeds, seeded])
+            backfill = self._unlisted(candidates, excluded, mask)
+            if mask is not None and len(backfill) < n_backfill:
+                # Truncated lists can underfill a narrow filter; the full ranking cannot
+                backfill = self._unlisted(self.ranking, excluded, mask)
+            backfill = backfill[:n_backfill]
+
+        backfill_scores = self.scores[backfill]
+        if len(seeded):
+            # Scaled below the weakest seeded similarity so scores stay in list order
+            backfill_scores = backfill_scores * (similarity[-1] / (2 * max(float(self.scores.max()), 1e-6)))
+        recs = [(idx, score, TIER_CONTENT_SEEDED) for idx, score in zip(seeded, similarity)]
+        recs += [(idx, score, tier) for idx, score in zip(backfill, backfill_scores)]
+        return [
+            {
+                'movieId': int(self.movie_ids[idx]),
+                'title': self.titles[idx],
+                'genres': self.genres[idx],
+                'score': float(score),
+                'tier': rec_tier
+            }
+            for idx, score, rec_tier in recs
+        ]
+
+    @staticmethod
+    def _unlisted(candidates: np.ndarray, excluded: np.ndarray, mask: Optional[np.ndarray]) -> np.ndarray:
+        """Candidates passing the mask that are not excluded, in order"""
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+        return candidates[~np.isin(candidates, excluded)]
@@ -0,0 +1,107 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix
+from ..core.logging import logger
+
+WEIGHTING_RATING = "rating"
+WEIGHTING_COUNT = "count"
+
+class UserGenreProfiles:
+    """
+    Per-user genre profiles computed from the ratings at train time
+
+    Both variants are sparse products of the ratings CSR (users x rated movies)
+    with a movie x genre one-hot matrix: the rating-weighted profile sums each
+    user's ratings per genre, the count profile counts rated movies per genre.
+    The results are small dense matrices (users x genres) saved with the model,
+    so a profile is one row read and many users are one fancy index.
+    """
+
+    def __init__(self):
+        """Initialize empty profiles"""
+        self.genre_names: List[str] = []
+        self.user_ids: Optional[np.ndarray] = None
+        self.user_order: Optional[np.ndarray] = None
+        self.rating_sums: Optional[np.ndarray] = None
+        self.counts: Optional[np.ndarray] = None
+
+    def fit(self, ratings: csr_matrix, user_ids: Sequence[int], movie_genres: csr_matrix,
+            genre_names: Sequence[str]) -> "UserGenreProfiles":
+        """
+        Compute both profile variants
+        Args:
+            ratings: Ratings CSR (users x rated movies) without explicit zeros
+            user_ids: User ID of each ratings row
+            movie_genres: One-hot genre CSR (rated movies x genres) aligned with the ratings columns
+            genre_names: Name of each genre column
+        Returns:
+            The fitted profiles
+        """
+        self.genre_names = list(genre_names)
+        self.user_ids = np.asarray(user_ids, dtype=np.int64)
+        self.user_order = np.argsort(self.user_ids, kind='stable')
+        movie_genres = csr_matrix(movie_genres, dtype=np.float32)
+        self.rating_sums = np.asarray((ratings @ movie_genres).todense(), dtype=np.float32)
+        rated = csr_matrix((np.ones_like(ratings.data), ratings.indices, ratings.indptr), shape=ratings.shape)
+        self.counts = np.asarray((rated @ movie_genres).todense(), dtype=np.float32)
+        logger.info(f"Built genre profiles for {len(self.user_ids)} users over {len(self.genre_names)} genres")
+        return self
+
+    def _weights(self, weighting: str) -> np.ndarray:
+        if weighting == WEIGHTING_RATING:
+            return self.rating_sums
+        if weighting == WEIGHTING_COUNT:
+            return self.counts
+        raise ValueError(f"Unknown weighting: {weighting}")
+
+    def rows(self, user_ids: Sequence[int]) -> np.ndarray:
+        """
+        Map user IDs to profile rows
+        Args:
+            user_ids: User IDs
+        Returns:
+            Row index per ID, -1 for users without ratings
+        """
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        if not len(self.user_ids):
+            return np.full(len(user_ids), -1, dtype=np.int64)
+        found = np.searchsorted(self.user_ids, user_ids, sorter=self.user_order)
+        rows = self.user_order[np.minimum(found, len(self.user_order) - 1)]
+        return np.where(self.user_ids[rows] == user_ids, rows, -1)
+
+    def profiles(self, user_ids: Sequence[int],
+                 weighting: str = WEIGHTING_RATING) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Profiles of many users at once, for batch analytics
+        Args:
+            user_ids: User IDs
+            weighting: "rating" for summed ratings or "count" for rated-movie counts
+        Returns:
+            (users x genres matrix with zero rows for unknown users, boolean mask of known users)
+        """
+        weights = self._weights(weighting)
+        rows = self.rows(user_ids)
+        known = rows >= 0
+        matrix = np.zeros((len(rows), len(self.genre_names)), dtype=np.float32)
+        matrix[known] = weights[rows[known]]
+        return matrix, known
+
+    def preferences(self, user_id: int, weighting: str = WEIGHTING_RATING) -> Dict[str, float]:
+        """
+        One user's genre shares
+        Args:
+            user_id: User ID
+            weighting: "rating" or "count", as in profiles
+        Returns:
+            Genre -> share of the user's profile total, largest first; empty for unknown users
+        """
+        weights = self._weights(weighting)
+        row = self.rows([user_id])[0]
+        if row < 0:
+            return {}
+        profile = np.asarray(weights[row], dtype=np.float64)
+        total = profile.sum()
+        if total <= 0:
+            return {}
+        order = np.argsort(-profile, kind='stable')
+        return {self.genre_names[g]: float(profile[g] / total) for g in order if profile[g] > 0}
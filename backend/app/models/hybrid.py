@@ -1,75 +1,363 @@
-from .base import BaseRecommender
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from scipy.sparse import csr_matrix
+from .base import BaseRecommender, as_sparse_ratings
 from .content import ContentBasedRecommender
 from .collaborative import CollaborativeRecommender
+from .item_item import ItemItemRecommender
+from .fallback import ColdStartRecommender
+from .candidates import CandidateGenerator
+from .genre_profiles import UserGenreProfiles, WEIGHTING_RATING
+from .quantized import quantize_and_evaluate
+from ..data.filters import MovieFilterIndex
+from ..data.metadata import MovieMetadataStore
+from ..data.search_index import display_title
 from ..core.logging import logger
 
 class HybridRecommender(BaseRecommender):
-    def __init__(self, content_weight: float = 0.5, collab_weight: float = 0.5):
+    def __init__(self, content_weight: float = 0.5, collab_weight: float = 0.5,
+                 collab_model: Optional[BaseRecommender] = None,
+                 item_model: Optional[ItemItemRecommender] = None,
+                 fallback_model: Optional[ColdStartRecommender] = None,
+                 candidate_generator: Optional[CandidateGenerator] = None,
+                 quantize_factors: bool = False):
         super().__init__()
         self.content_weight = content_weight
         self.collab_weight = collab_weight
         self.content_model = ContentBasedRecommender()
-        self.collab_model = CollaborativeRecommender()
-        self.movies_df = None
+        self.collab_model = collab_model or CollaborativeRecommender()
+        self.item_model = item_model
+        self.fallback_model = fallback_model or ColdStartRecommender()
+        self.candidate_generator = candidate_generator or CandidateGenerator()
         self.movie_to_idx = None
         self.idx_to_movie = None
+        self.filter_index = None
+        self.collab_catalog_rows = None
+        self.metadata = None
+        self.genre_profiles = None
+        # Ratings CSR (users x rated movies) kept for rated-movie exclusion and content seeds
+        self.ratings = None
+        self.rating_user_idx = None
+        self.rating_catalog_rows = None
+        # Int8 movie factors for the retrieval scan; candidates are re-scored with the float factors
+        self.quantize_factors = quantize_factors
+        self.quantized_factors = None
+        self.catalog_collab_cols = None
 
-    def fit(self, movies_df, user_movie_matrix, movie_to_idx, idx_to_movie):
-        self.movies_df = movies_df
+    def fit(self, movies_df, user_movie_matrix, movie_to_idx, idx_to_movie, content_features=None):
+        # movies_df is only used here; the fitted model keeps plain arrays so serving needs no pandas
         self.movie_to_idx = movie_to_idx
         self.idx_to_movie = idx_to_movie
-        self.content_model.fit(movies_df, movie_to_idx, idx_to_movie)
-        self.collab_model.fit(user_movie_matrix)
+        # content_features: optional (feature matrix, feature names) aligned with movies_df rows
+        features, feature_names = content_features if content_features is not None else (None, None)
+        self.content_model.fit(movies_df, movie_to_idx, idx_to_movie, features, feature_names)
+        self._fit_on_ratings(self.collab_model, user_movie_matrix)
+        if self.item_model is not None:
+            self._fit_on_ratings(self.item_model, user_movie_matrix)
+        ratings, user_ids, movie_ids = (
+            user_movie_matrix if isinstance(user_movie_matrix, tuple) else (user_movie_matrix, None, None)
+        )
+        self.fallback_model.fit(movies_df, ratings, self.content_model.tfidf_matrix, user_ids, movie_ids)
+        # Genre bitmasks/years over movies_df rows, plus the row of each collaborative column
+        self.filter_index = MovieFilterIndex().fit(movies_df)
+        self.collab_catalog_rows = self.filter_index.positions(self.collab_model.movie_ids)
+        if self.quantize_factors:
+            self.quantized_factors = quantize_and_evaluate(
+                self.collab_model.movie_factors, self.collab_model.user_factors,
+                rerank=self.candidate_generator.collab_budget
+            )
+            # Collaborative column of each catalog row, for exact re-scoring of candidates
+            self.catalog_collab_cols = np.full(len(self.filter_index.movie_ids), -1, dtype=np.int64)
+            valid = self.collab_catalog_rows >= 0
+            self.catalog_collab_cols[self.collab_catalog_rows[valid]] = np.flatnonzero(valid)
+        # Titles, genres, years and vote averages over movies_df rows for building responses
+        sparse_ratings, rated_user_ids, rated_movie_ids = as_sparse_ratings(ratings, user_ids, movie_ids)
+        self.ratings = sparse_ratings
+        self.rating_user_idx = {uid: idx for idx, uid in enumerate(rated_user_ids)}
+        self.rating_catalog_rows = self.filter_index.positions(rated_movie_ids)
+        self.metadata = MovieMetadataStore().fit(movies_df, sparse_ratings, rated_movie_ids)
+        # User x genre profiles: the ratings CSR times the rated movies' genre one-hot matrix
+        self.genre_profiles = UserGenreProfiles().fit(
+            sparse_ratings, rated_user_ids,
+            self.metadata.genre_matrix(self.filter_index.positions(rated_movie_ids)), self.metadata.genre_names
+        )
         self.is_fitted = True
         logger.info("Hybrid model training completed")
 
-    def get_recommendations(self, user_id: int, n_recommendations: int = 24):
+    @staticmethod
+    def _fit_on_ratings(model, user_movie_matrix):
+        # Sparse input is (ratings CSR, user IDs, movie IDs); SVD takes the dense pivot
+        if isinstance(user_movie_matrix, tuple):
+            model.fit(*user_movie_matrix)
+        else:
+            model.fit(user_movie_matrix)
+
+    def get_because_you_watched(self, user_id: int, n_recommendations: int = 10):
+        """
+        Get item-item recommendations annotated with the rated movie behind each
+        Args:
+            user_id: User ID
+            n_recommendations: Number of recommendations to return
+        Returns:
+            List of recommendations, empty if no item-item model was trained
+        """
+        self._check_is_fitted()
+        if getattr(self, 'item_model', None) is None:
+            return []
+        return self.item_model.get_recommendations(user_id, n_recommendations)
+
+    def get_movie_titles(self, movie_ids) -> Dict[int, str]:
+        """
+        Look up catalog titles
+        Args:
+            movie_ids: MovieLens movie IDs
+        Returns:
+            Dict of movie ID to title for the IDs in the catalog
+        """
+        self._check_is_fitted()
+        rows = self.filter_index.positions(movie_ids)
+        return {int(mid): title for mid, row, (title, _) in zip(movie_ids, rows, self._describe(rows)) if row >= 0}
+
+    def get_genre_preferences(self, user_id: int, weighting: str = WEIGHTING_RATING) -> Optional[Dict[str, float]]:
+        """
+        Genre shares of a user's own ratings, from the profiles computed at train time
+        Args:
+            user_id: User ID
+            weighting: "rating" for rating-weighted shares or "count" for shares of rated movies
+        Returns:
+            Genre -> share, largest first (empty for users without ratings),
+            or None if the model predates genre profiles
+        """
+        self._check_is_fitted()
+        profiles = getattr(self, 'genre_profiles', None)
+        if profiles is None:
+            return None
+        return profiles.preferences(user_id, weighting)
+
+    def get_movie_records(self, movie_ids) -> List[Optional[Dict]]:
+        """
+        Look up response metadata for many movies at once
+        Args:
+            movie_ids: MovieLens movie IDs
+        Returns:
+            Per movie a dict with movieId, title, genres, year and ml_rating_10,
+            or None if it is not in the catalog or the model predates the metadata store
+        """
         self._check_is_fitted()
-        # Get collaborative recommendations (fetch a large number to ensure enough candidates)
-        collab_recs = self.collab_model.get_recommendations(user_id, 500)
-        # For each recommended movie, get content score
+        metadata = getattr(self, 'metadata', None)
+        if metadata is None:
+            return [None] * len(movie_ids)
+        rows = self.filter_index.positions(movie_ids)
+        known = rows >= 0
+        records = iter(metadata.records(rows[known]))
+        return [next(records) if k else None for k in known]
+
+    def _describe(self, rows) -> List[tuple]:
+        """Display title and pipe-separated genres of each catalog row (rows < 0 give empty strings)"""
+        metadata = getattr(self, 'metadata', None)
+        if metadata is None:  # Models saved before the metadata store
+            titles, genres = self.content_model.titles, self.content_model.genres
+            return [(display_title(titles[row]), genres[row]) if row >= 0 else ('', '') for row in rows]
+        return [(metadata.title(row), '|'.join(metadata.genres(row))) if row >= 0 else ('', '') for row in rows]
+
+    def is_known_user(self, user_id: int) -> bool:
+        """Whether the user has rating history in the collaborative model"""
+        return user_id in self.collab_model.user_idx_map
+
+    def build_filter_mask(self, genres=None, year_from=None, year_to=None, match_all_genres=False):
+        """
+        Boolean mask over movies_df rows for the given filters
+        Args:
+            genres: Genres to keep
+            year_from: Earliest release year, inclusive
+            year_to: Latest release year, inclusive
+            match_all_genres: Require every genre instead of any
+        Returns:
+            Boolean array, or None if no filter is set
+        Raises:
+            ValueError: If a genre is unknown
+        """
+        self._check_is_fitted()
+        if getattr(self, 'filter_index', None) is None:
+            if genres or year_from is not None or year_to is not None:
+                raise ValueError("Model was trained without filter indexes")
+            return None
+        return self.filter_index.mask(genres, year_from, year_to, match_all_genres)
+
+    def _collab_mask(self, catalog_mask):
+        """Project a catalog mask onto the collaborative model's movie columns"""
+        rows = self.collab_catalog_rows
+        collab_mask = np.zeros(len(rows), dtype=bool)
+        valid = rows >= 0
+        collab_mask[valid] = catalog_mask[rows[valid]]
+        return collab_mask
+
+    def _get_fallback_recommendations(self, user_id, n_recommendations, genres, seed_movie_ids, mask):
+        fallback_model = getattr(self, 'fallback_model', None)
+        if fallback_model is None or not fallback_model.is_fitted:
+            raise ValueError(f"User ID {user_id} not found.")
+        recs = fallback_model.get_recommendations(
+            user_id, n_recommendations, genres=genres, seed_movie_ids=seed_movie_ids, mask=mask
+        )
+        scores = [rec['score'] for rec in recs]
+        low, high = (min(scores), max(scores)) if scores else (0.0, 0.0)
+        rows = self.filter_index.positions([rec['movieId'] for rec in recs])
         results = []
-        for rec in collab_recs:
-            movie_id = rec['movieId']
-            collab_score = rec['score']
-            try:
-                content_score = self.content_model.get_recommendations(movie_id, 1)[0]['score']
-            except Exception:
-                content_score = 0.0
-            final_score = self.content_weight * content_score + self.collab_weight * collab_score
-            movie_row = self.movies_df[self.movies_df['movieId'] == movie_id].iloc[0]
+        for rec, (title, genres) in zip(recs, self._describe(rows)):
+            final_score = (rec['score'] - low) / (high - low) if high > low else 0.0
             results.append({
-                'movieId': int(movie_id),
-                'title': movie_row['title'],
-                'genres': movie_row['genres'],
+                'movieId': rec['movieId'],
+                'title': title,
+                'genres': genres,
                 'final_score': final_score,
-                'content_score': content_score,
-                'collab_score': collab_score
+                'content_score': final_score if rec['tier'] == 'content_seeded' else 0.0,
+                'collab_score': 0.0,
+                'tier': rec['tier']
             })
-        # Sort by final score (always sort full list)
-        results = sorted(results, key=lambda x: x['final_score'], reverse=True)
-        # Normalize content_score and collab_score
-        if results:
-            content_scores = [r['content_score'] for r in results]
-            collab_scores = [r['collab_score'] for r in results]
-            min_content, max_content = min(content_scores), max(content_scores)
-            min_collab, max_collab = min(collab_scores), max(collab_scores)
-            for r in results:
-                if max_content > min_content:
-                    r['content_score'] = (r['content_score'] - min_content) / (max_content - min_content)
-                else:
-                    r['content_score'] = 0.0
-                if max_collab > min_collab:
-                    r['collab_score'] = (r['collab_score'] - min_collab) / (max_collab - min_collab)
-                else:
-                    r['collab_score'] = 0.0
-            # Normalize final_score
-            final_scores = [r['final_score'] for r in results]
-            min_final, max_final = min(final_scores), max(final_scores)
-            for r in results:
-                if max_final > min_final:
-                    r['final_score'] = (r['final_score'] - min_final) / (max_final - min_final)
-                else:
-                    r['final_score'] = 0.0
-        # Only apply limit at the end
-        return results[:n_recommendations] 
\ No newline at end of file
+        return results
+
+    def _user_ratings(self, user_id: int):
+        """
+        Catalog rows and ratings of a known user's rated movies
+        Args:
+            user_id: User ID
+        Returns:
+            (catalog rows, ratings), empty if the user has no ratings
+        """
+        if getattr(self, 'ratings', None) is not None:
+            sources = [(self.ratings, self.rating_user_idx, self.rating_catalog_rows)]
+        else:
+            # Models saved before the hybrid kept the ratings: ALS or the item-item model has a
+            # copy fit on the same matrix, so columns line up with collab_catalog_rows
+            sources = [
+                (model.ratings, model.user_idx_map, self.collab_catalog_rows)
+                for model in (self.collab_model, getattr(self, 'item_model', None))
+                if getattr(model, 'ratings', None) is not None
+            ]
+        for ratings, user_idx_map, catalog_rows in sources:
+            if user_id not in user_idx_map:
+                continue
+            user_idx = user_idx_map[user_id]
+            lo, hi = ratings.indptr[user_idx], ratings.indptr[user_idx + 1]
+            rows = catalog_rows[ratings.indices[lo:hi]]
+            known = rows >= 0
+            return rows[known], np.asarray(ratings.data[lo:hi], dtype=np.float32)[known]
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    def _catalog_collab_scores(self, user_id: int) -> np.ndarray:
+        """
+        Collaborative score per catalog row, -inf for movies without factors
+
+        With quantized factors the scores are approximate and only good for
+        retrieval; _exact_collab_scores re-scores the candidates.
+        """
+        user_vector = self.collab_model.user_factors[self.collab_model.user_idx_map[user_id]]
+        quantized = getattr(self, 'quantized_factors', None)
+        if quantized is not None:
+            scores = quantized.scores(user_vector)
+        else:
+            scores = self.collab_model.movie_factors @ user_vector
+        catalog_scores = np.full(len(self.filter_index.movie_ids), -np.inf, dtype=np.float64)
+        valid = self.collab_catalog_rows >= 0
+        catalog_scores[self.collab_catalog_rows[valid]] = scores[valid]
+        return catalog_scores
+
+    def _exact_collab_scores(self, user_id: int, rows: np.ndarray) -> np.ndarray:
+        """Float-factor collaborative score of each catalog row, -inf for movies without factors"""
+        user_vector = self.collab_model.user_factors[self.collab_model.user_idx_map[user_id]]
+        cols = self.catalog_collab_cols[rows]
+        known = cols >= 0
+        scores = np.full(len(rows), -np.inf, dtype=np.float64)
+        scores[known] = self.collab_model.movie_factors[cols[known]] @ user_vector
+        return scores
+
+    def _content_scores(self, rows: np.ndarray, seed_rows: np.ndarray, seed_weights: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each candidate to the rating-weighted profile of the seed movies"""
+        if not len(seed_rows) or not len(rows):
+            return np.zeros(len(rows))
+        tfidf = self.content_model.tfidf_matrix
+        profile = csr_matrix(seed_weights.reshape(1, -1)) @ tfidf[seed_rows]
+        norm = np.sqrt(profile.multiply(profile).sum())
+        if norm == 0:
+            return np.zeros(len(rows))
+        return (tfidf[rows] @ profile.T).toarray().ravel() / norm
+
+    def get_recommendations(self, user_id: int, n_recommendations: int = 24,
+                            genres=None, seed_movie_ids=None, year_from=None, year_to=None,
+                            match_all_genres: bool = False, timings: Optional[Dict[str, float]] = None):
+        """
+        Get recommendations: candidate retrieval followed by a vectorized re-rank
+        Args:
+            user_id: User ID
+            n_recommendations: Number of recommendations to return
+            genres, year_from, year_to, match_all_genres: Optional filters
+            seed_movie_ids: MovieLens IDs a new user picked
+            timings: Optional dict that receives the duration of each stage in seconds
+        Returns:
+            List of recommendations with final, content and collaborative scores
+        """
+        self._check_is_fitted()
+        # Filters are boolean masks applied before top-k, so filtered requests still fill the limit
+        mask = self.build_filter_mask(genres, year_from, year_to, match_all_genres)
+        # Users without rating history get the precomputed cold-start tiers
+        if not self.is_known_user(user_id):
+            return self._get_fallback_recommendations(user_id, n_recommendations, genres, seed_movie_ids, mask)
+
+        started = time.perf_counter()
+        generator = getattr(self, 'candidate_generator', None) or CandidateGenerator()
+        collab_scores = self._catalog_collab_scores(user_id)
+        rated_rows, ratings = self._user_ratings(user_id)
+        allowed = mask.copy() if mask is not None else np.ones(len(collab_scores), dtype=bool)
+        allowed[rated_rows] = False
+        seed_rows, seed_weights = generator.select_seeds(rated_rows, ratings)
+        fallback_model = getattr(self, 'fallback_model', None)
+        rows, sources = generator.generate(
+            allowed, collab_scores, seed_rows, seed_weights,
+            content_neighbors=getattr(fallback_model, 'content_neighbors', None),
+            popularity_ranking=getattr(fallback_model, 'ranking', None)
+        )
+        retrieved = time.perf_counter()
+
+        # Re-rank every candidate at once, on exact scores if retrieval used quantized factors
+        if getattr(self, 'quantized_factors', None) is not None:
+            collab = self._exact_collab_scores(user_id, rows)
+        else:
+            collab = collab_scores[rows]
+        finite = np.isfinite(collab)
+        # Movies without factors (content or popular candidates) get the weakest collaborative score
+        collab[~finite] = collab[finite].min() if finite.any() else 0.0
+        content = self._content_scores(rows, seed_rows, seed_weights)
+        final = self.content_weight * content + self.collab_weight * collab
+        order = np.argsort(-final, kind='stable')[:n_recommendations]
+        finished = time.perf_counter()
+
+        if timings is not None:
+            timings['retrieval'] = retrieved - started
+            timings['rerank'] = finished - retrieved
+        logger.debug(
+            f"Retrieved {len(rows)} candidates {generator.count_sources(sources)} in "
+            f"{(retrieved - started) * 1000:.1f} ms, re-ranked in {(finished - retrieved) * 1000:.1f} ms"
+        )
+        # Scores are min-max normalized over all candidates
+        content, collab, final = (_min_max(content), _min_max(collab), _min_max(final))
+        top_rows = rows[order]
+        described = zip(order, self.filter_index.movie_ids[top_rows], self._describe(top_rows))
+        return [
+            {
+                'movieId': int(movie_id),
+                'title': title,
+                'genres': genres,
+                'final_score': float(final[i]),
+                'content_score': float(content[i]),
+                'collab_score': float(collab[i]),
+                'tier': 'personalized'
+            }
+            for i, movie_id, (title, genres) in described
+        ]
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    low, high = (values.min(), values.max()) if len(values) else (0.0, 0.0)
+    if high > low:
+        return (values - low) / (high - low)
+    return np.zeros(len(values))
@@ -0,0 +1,124 @@
+from typing import Optional, Sequence
+import numpy as np
+from scipy.sparse import csr_matrix
+from .base import BaseRecommender, as_sparse_ratings
+from .neighbors import top_k_similarities
+from ..core.logging import logger
+
+class ItemItemRecommender(BaseRecommender):
+    """
+    Item-item collaborative filtering over precomputed top-K neighbors.
+
+    Cosine similarities between movie rating vectors are computed block by block
+    with sparse matrix products and truncated to the top K per movie, then stored
+    as a CSR matrix. Scoring a user is a sparse lookup over the rows of the movies
+    they rated, so its cost depends on history length rather than catalog size.
+    """
+
+    def __init__(self, n_neighbors: int = 50, block_size: int = 1024, min_support: int = 2):
+        super().__init__()
+        self.n_neighbors = n_neighbors
+        self.block_size = block_size
+        self.min_support = min_support
+        self.similarities = None
+        self.ratings = None
+        self.user_ids = None
+        self.movie_ids = None
+        self.user_idx_map = None
+        self.movie_idx_map = None
+
+    def fit(self, user_movie_matrix, user_ids: Optional[Sequence[int]] = None,
+            movie_ids: Optional[Sequence[int]] = None):
+        """
+        Compute truncated item-item similarities
+        Args:
+            user_movie_matrix: Sparse ratings matrix (users x movies) or a dense pivot DataFrame
+            user_ids: User ID for each row (required for sparse input)
+            movie_ids: Movie ID for each column (required for sparse input)
+        """
+        ratings, self.user_ids, self.movie_ids = as_sparse_ratings(user_movie_matrix, user_ids, movie_ids)
+        self.user_idx_map = {uid: idx for idx, uid in enumerate(self.user_ids)}
+        self.movie_idx_map = {mid: idx for idx, mid in enumerate(self.movie_ids)}
+        self.ratings = ratings
+        self.similarities = self._compute_similarities(ratings)
+        self.is_fitted = True
+        logger.info(
+            f"Computed item-item neighbors for {len(self.movie_ids)} movies "
+            f"(k={self.n_neighbors}, nnz={self.similarities.nnz})"
+        )
+
+    def _compute_similarities(self, ratings: csr_matrix) -> csr_matrix:
+        """Blockwise cosine similarity between movies, keeping the top K per row"""
+        items = ratings.T.tocsr()
+        norms = np.sqrt(np.asarray(items.multiply(items).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        normalized = csr_matrix(items.multiply(1.0 / norms[:, None]))
+        binary = items.copy()
+        binary.data[:] = 1.0
+        return top_k_similarities(normalized, self.n_neighbors, self.block_size,
+                                  support=binary, min_support=self.min_support)
+
+    def _score(self, user_idx: int):
+        """Sparse neighbor scores for a user's unrated movies"""
+        lo, hi = self.ratings.indptr[user_idx], self.ratings.indptr[user_idx + 1]
+        rated = self.ratings.indices[lo:hi]
+        user_ratings = self.ratings.data[lo:hi]
+        # Center on the user's mean so disliked movies push neighbors down
+        weights = user_ratings - user_ratings.mean() if len(user_ratings) > 1 else user_ratings
+        neighbors = self.similarities[rated]
+        # Sparse row-vector product: touches only the K neighbors of each rated movie
+        scores = csr_matrix(weights.reshape(1, -1)) @ neighbors
+        unrated = ~np.isin(scores.indices, rated)
+        return rated, weights, neighbors, scores.indices[unrated], scores.data[unrated]
+
+    def get_recommendations(self, user_id: int, n_recommendations: int = 10):
+        """
+        Get recommendations with the rated movie that contributed most to each
+        Args:
+            user_id: User ID
+            n_recommendations: Number of recommendations to return
+        Returns:
+            List of {'movieId', 'score', 'because_of'} dicts
+        """
+        self._check_is_fitted()
+        if user_id not in self.user_idx_map:
+            raise ValueError(f"User ID {user_id} not found.")
+        rated, weights, neighbors, candidates, scores = self._score(self.user_idx_map[user_id])
+        if len(candidates) == 0:
+            return []
+
+        n = min(n_recommendations, len(candidates))
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top])]
+        top_movies = candidates[top]
+
+        # Contribution of each rated movie to each recommended movie: history x n
+        contributions = neighbors[:, top_movies].toarray() * weights[:, None]
+        because_of = rated[np.argmax(contributions, axis=0)]
+        return [
+            {
+                'movieId': self.movie_ids[movie_idx],
+                'score': float(score),
+                'because_of': self.movie_ids[source_idx]
+            }
+            for movie_idx, score, source_idx in zip(top_movies, scores[top], because_of)
+        ]
+
+    def get_similar_movies(self, movie_id: int, n_recommendations: int = 10):
+        """
+        Get the precomputed nearest neighbors of a movie
+        Args:
+            movie_id: MovieLens movie ID
+            n_recommendations: Number of neighbors to return
+        Returns:
+            List of {'movieId', 'score'} dicts
+        """
+        self._check_is_fitted()
+        if movie_id not in self.movie_idx_map:
+            raise ValueError(f"Movie ID {movie_id} not found.")
+        row = self.similarities[self.movie_idx_map[movie_id]]
+        order = np.argsort(-row.data)[:n_recommendations]
+        return [
+            {'movieId': self.movie_ids[row.indices[i]], 'score': float(row.data[i])}
+            for i in order
+        ]
@@ -0,0 +1,47 @@
+from typing import Optional
+import numpy as np
+from scipy.sparse import csr_matrix
+
+def top_k_similarities(features: csr_matrix, k: int, block_size: int = 1024,
+                       support: Optional[csr_matrix] = None, min_support: int = 1) -> csr_matrix:
+    """
+    Compute features @ features.T block by block, keeping only the top K per row
+    Args:
+        features: Row-normalized feature matrix (n x d); dot products are cosine similarities
+        k: Number of neighbors to keep per row
+        block_size: Rows per block; peak memory is about block_size x n floats
+        support: Optional binary matrix with the same shape; pairs co-occurring in
+            fewer than min_support columns are dropped
+        min_support: Minimum co-occurrence count when support is given
+    Returns:
+        CSR matrix (n x n) with at most k positive entries per row and no self-similarity
+    """
+    n_rows = features.shape[0]
+    features = csr_matrix(features, dtype=np.float32)
+    features_t = features.T.tocsr()
+    support_t = support.T.tocsr() if support is not None else None
+    k = min(k, max(n_rows - 1, 0))
+
+    rows, cols, vals = [], [], []
+    for start in range(0, n_rows, block_size):
+        stop = min(start + block_size, n_rows)
+        block = (features[start:stop] @ features_t).toarray()
+        if support_t is not None and min_support > 1:
+            counts = (support[start:stop] @ support_t).toarray()
+            block[counts < min_support] = 0.0
+        block[np.arange(stop - start), np.arange(start, stop)] = 0.0
+        if k == 0:
+            continue
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_vals = np.take_along_axis(block, top, axis=1)
+        keep = top_vals > 0
+        rows.append(np.nonzero(keep)[0] + start)
+        cols.append(top[keep])
+        vals.append(top_vals[keep])
+
+    if not rows:
+        return csr_matrix((n_rows, n_rows), dtype=np.float32)
+    return csr_matrix(
+        (np.concatenate(vals).astype(np.float32), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(n_rows, n_rows)
+    )
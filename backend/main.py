@@ -5,22 +5,39 @@ from pathlib import Path
 # Add the current directory to Python path
 sys.path.append(str(Path(__file__).parent))
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+from concurrent.futures import Future
+import numpy as np
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List
-import joblib
+from pydantic import BaseModel, Field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from app.core.config import settings
 from app.core.logging import logger
-from app.models.hybrid import HybridRecommender
-from app.api.routes.movies import router as movie_router
+from app.api.services.admission import AdmissionMiddleware, cheap_limiter, expensive_limiter, model_concurrency
+from app.api.services.executor import ExecutorSaturatedError, executor_stats, io_executor, scoring_executor
+from app.api.services.recommendation import get_ranked_list, model_store, model_version
+from app.api.services.pagination import decode_cursor, encode_cursor, query_fingerprint
+from app.api.services.warmup import warmup
+from app.api.routes.movies import router as movie_router, movie_fragment_by_id, movie_media
 from app.api.routes.dashboard import router as dashboard_router
-from app.api.services.tmdb import TMDBService
-from app.data.id_mapper import MovieIdMapper
+from app.api.routes.admin import router as admin_router
+from app.data.id_mapper import get_id_mapper
+from app.api.serialization import (
+    FastJSONResponse, RawJSONResponse, dumps, encode_array, encode_event, extend_fragment, stream_media_type
+)
 
 class RecommendationRequest(BaseModel):
     user_id: int
-    limit: int = 10  # Renamed for consistency with other API endpoints
+    limit: int = Field(10, ge=1, le=settings.RANKED_LIST_SIZE)  # Renamed for consistency with other API endpoints
+    genres: Optional[List[str]] = None  # Genre filter; also the genre tier for new users
+    year_from: Optional[int] = None  # Release year filter, inclusive
+    year_to: Optional[int] = None
+    match_all_genres: bool = False  # Require every genre instead of any
+    seed_movie_ids: Optional[List[int]] = None  # MovieLens IDs a new user picked
+    cursor: Optional[str] = None  # X-Next-Cursor of the previous page
+    details: bool = True  # False answers from local metadata only, without overviews or posters
 
 class MovieRecommendation(BaseModel):
     movieId: int
@@ -29,8 +46,26 @@ class MovieRecommendation(BaseModel):
     final_score: float
     content_score: float
     collab_score: float
+    tier: str = "personalized"
+
+app = FastAPI(
+    title=settings.API_TITLE,
+    version=settings.API_VERSION,
+    default_response_class=FastJSONResponse
+)
 
-app = FastAPI(title=settings.API_TITLE, version=settings.API_VERSION)
+# Admit requests by per-client rate and model concurrency; added first so CORS
+# headers are set on its 429/503 responses too
+app.add_middleware(
+    AdmissionMiddleware,
+    cheap=cheap_limiter,
+    expensive=expensive_limiter,
+    concurrency=model_concurrency,
+    expensive_prefixes=["/api/v1/recommendations", "/api/v1/dashboard"],
+    exempt_prefixes=["/health"],
+    api_keys=settings.RATE_LIMIT_API_KEYS,
+    enabled=settings.RATE_LIMIT_ENABLED
+)
 
 # Configure CORS
 app.add_middleware(
@@ -39,111 +74,354 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Next-Cursor", "X-Recommendation-Tier", "X-Model-Version", "Retry-After"],  # Readable by the frontend
 )
 
 # Include API routes
 app.include_router(movie_router, prefix="/api/v1", tags=["movies"])
 app.include_router(dashboard_router, prefix="/api/v1", tags=["dashboard"])
-
-recommender = None
-tmdb_service = TMDBService(api_key=settings.TMDB_API_KEY)
-id_mapper = MovieIdMapper()
+app.include_router(admin_router)
 
 @app.on_event("startup")
 def load_model():
-    global recommender
-    model_path = settings.SAVED_MODELS_PATH / "hybrid_recommender.joblib"
-    if not model_path.exists():
-        logger.error(f"Model file not found at {model_path}")
-        raise RuntimeError(f"Model file not found at {model_path}")
-    recommender = joblib.load(model_path)
+    # Model arrays are memory-mapped read-only, so workers share one copy
+    try:
+        model_store.load()
+    except FileNotFoundError as e:
+        logger.error(str(e))
+        raise RuntimeError(str(e))
     logger.info("Model loaded successfully")
     
-    # Load ID mappings
-    id_mapper.load_mappings()
+    # Load the shared ID mappings (memory-mapped from the binary cache when present)
+    get_id_mapper()
     logger.info("ID mappings loaded successfully")
+    
+    # Warm up in the background; /health/ready reports 503 until it finishes
+    warmup.start(model_store, preload=movie_fragment_by_id)
 
 @app.get("/")
 def root():
     return {"message": "Movie Recommendation API"}
 
+@app.exception_handler(ExecutorSaturatedError)
+async def executor_saturated(request: Request, exc: ExecutorSaturatedError):
+    """Shed load while a worker queue is full instead of queueing without bound"""
+    return FastJSONResponse({"detail": str(exc)}, status_code=503, headers={"Retry-After": "1"})
+
 @app.post("/api/v1/recommendations")
-def get_recommendations(request: RecommendationRequest):
+async def get_recommendations(request: RecommendationRequest, accept: Optional[str] = Header(None)):
     """
     Get personalized movie recommendations for a user
     
+    Ranking runs on the scoring executor and TMDB lookups on the I/O executor,
+    so the event loop never blocks; either queue being full answers 503.
+    
     Args:
-        request: RecommendationRequest with user_id and limit
+        request: RecommendationRequest with user_id, limit and an optional cursor
+        accept: application/x-ndjson or text/event-stream streams each movie as
+            soon as its details are available (see _stream_page)
         
     Returns:
-        List of recommended movies with details
+        One page of recommended movies with details; each item and the
+        X-Recommendation-Tier header name the tier that produced them, and
+        X-Next-Cursor (absent on the last page) continues the list
     """
-    if recommender is None:
+    if model_store.model is None:
         raise HTTPException(status_code=500, detail="Model not loaded")
+    recommender = model_store.get()
     
     try:
-        needed_count = request.limit
-        fetch_count = needed_count * 2  # Fetch more to allow for missing/invalid movies
-        
-        # Get recommendations from the model
-        results = recommender.get_recommendations(
-            user_id=request.user_id,
-            n_recommendations=fetch_count
+        recommender.build_filter_mask(request.genres, request.year_from, request.year_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # The cursor pins the ranked list: same query, same model version, next offset
+    fingerprint = query_fingerprint(
+        request.user_id,
+        sorted(g.lower() for g in request.genres) if request.genres else None,
+        request.seed_movie_ids, request.year_from, request.year_to, request.match_all_genres
+    )
+    version, offset = model_version(recommender), 0
+    if request.cursor:
+        try:
+            version, offset, cursor_fingerprint = decode_cursor(request.cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if cursor_fingerprint != fingerprint:
+            raise HTTPException(status_code=400, detail="Cursor does not match this request")
+    
+    try:
+        ranked = await scoring_executor.run(_rank_page, recommender, request, fingerprint, version, offset)
+    except ExecutorSaturatedError:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting recommendations: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if ranked is None:
+        raise HTTPException(status_code=410, detail="Cursor expired; request the first page again")
+    
+    results, page, tmdb_ids, records = ranked
+    needed_count = request.limit
+    tier = page[0].get("tier", "personalized") if page else "personalized"
+    headers = {"X-Recommendation-Tier": tier, "X-Model-Version": version}
+    
+    media_type = stream_media_type(accept)
+    if media_type is not None:
+        stream = _stream_page(
+            page, records, tmdb_ids, offset, needed_count, recommender, tier, request.details, media_type,
+            lambda consumed: encode_cursor(version, consumed, fingerprint) if offset < consumed < len(results) else None
+        )
+        return StreamingResponse(stream, media_type=media_type, headers={
+            **headers, "Cache-Control": "no-cache", "X-Accel-Buffering": "no"
+        })
+    
+    try:
+        enriched_results, consumed = await io_executor.run(
+            _enrich_page, page, records, tmdb_ids, offset, needed_count, recommender, tier, request.details
         )
+    except ExecutorSaturatedError:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting recommendations: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    # A cursor always moves forward, so clients can't loop on the same page
+    next_offset = offset + consumed
+    if offset < next_offset < len(results):
+        headers["X-Next-Cursor"] = encode_cursor(version, next_offset, fingerprint)
+    return RawJSONResponse(encode_array(enriched_results), headers=headers)
+
+def _rank_page(recommender, request: RecommendationRequest, fingerprint: str, version: str,
+               offset: int) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Any, List[Any]]]:
+    """
+    Ranked list and the page's IDs and local metadata; CPU-bound, run on the scoring executor
+    
+    Args:
+        recommender: Serving model
+        request: The recommendation request
+        fingerprint: query_fingerprint of the request
+        version: Model version of the ranked list
+        offset: Position of the page in the ranked list
+        
+    Returns:
+        (full ranked list, ranked list from offset on, TMDB IDs and local metadata
+        of that page), or None if the list for an older model version expired
+    """
+    # The full ranking is computed once per user and model version; pages slice it
+    results = get_ranked_list(
+        recommender,
+        fingerprint,
+        user_id=request.user_id,
+        genres=request.genres,
+        seed_movie_ids=request.seed_movie_ids,
+        year_from=request.year_from,
+        year_to=request.year_to,
+        match_all_genres=request.match_all_genres,
+        version=version
+    )
+    if results is None:
+        return None
+    page = results[offset:]
+    
+    # Convert MovieLens IDs to TMDB IDs in one vectorized lookup
+    movie_ids = [rec["movieId"] for rec in page]
+    tmdb_ids = get_id_mapper().get_tmdb_ids(movie_ids)
+    # Local metadata in bulk for the movies this page can use: twice the page of mapped
+    # movies leaves room for streamed replacements; later ones fall back to TMDB details
+    needed_count = request.limit
+    mapped = np.flatnonzero(tmdb_ids > 0)
+    window = int(mapped[2 * needed_count - 1]) + 1 if len(mapped) >= 2 * needed_count else len(page)
+    records = recommender.get_movie_records(movie_ids[:window]) + [None] * (len(page) - window)
+    return results, page, tmdb_ids, records
+
+def _enrich_page(page: List[Dict[str, Any]], records: List[Optional[Dict[str, Any]]], tmdb_ids, offset: int,
+                 needed_count: int, recommender, tier: str, details: bool) -> Tuple[List[bytes], int]:
+    """
+    Enrich one page in ranked order; may call TMDB, so it runs on the I/O executor
+    
+    Args:
+        page: Ranked recommendations from the cursor offset on
+        records: Local metadata of each (see HybridRecommender.get_movie_records)
+        tmdb_ids: TMDB ID of each, 0 if unmapped
+        offset: Position of page[0] in the ranked list
+        needed_count: Page size
+        recommender: Model that produced the recommendations
+        tier: Tier of the page
+        details: Whether to add TMDB overviews and posters
+        
+    Returns:
+        (encoded movies, number of ranked items consumed including skipped ones)
+    """
+    # Only this page's movies are enriched; skipped ones still advance the cursor
+    enriched_results = []
+    consumed = 0
+    
+    for position, (rec, record, tmdb_id) in enumerate(zip(page, records, tmdb_ids)):
+        # Stop once the page is full
+        if len(enriched_results) >= needed_count:
+            break
+        consumed = position + 1
+        
+        movielens_id = rec["movieId"]
+        tmdb_id = int(tmdb_id)
+        if tmdb_id <= 0:
+            logger.warning(f"No TMDB ID mapping found for MovieLens ID {movielens_id}")
+            continue
         
-        # Process results and get movie details
-        enriched_results = []
-        tried_movie_ids = set()
+        try:
+            enriched_results.append(_enrich(rec, record, tmdb_id, recommender, tier, offset + position, details))
+        except Exception as e:
+            logger.error(f"Error fetching details for movie {movielens_id}: {str(e)}")
+            continue
+    return enriched_results, consumed
+
+def _enrich(rec: Dict[str, Any], record: Optional[Dict[str, Any]], tmdb_id: int, recommender, tier: str,
+            rank: int, details: bool = True) -> bytes:
+    """
+    Encoded movie with the recommendation scores appended
+    
+    Title, genres, year and the MovieLens rating (ml_rating_10) come from the
+    model's metadata store; TMDB only adds the overview, poster, release date
+    and its own vote_average, and only if details are requested. A TMDB failure
+    leaves those fields empty instead of dropping the movie.
+    
+    Args:
+        rec: Ranked recommendation
+        record: Local metadata from get_movie_records, None for models without a metadata store
+        tmdb_id: TMDB ID of the movie
+        recommender: Model that produced the recommendation
+        tier: Tier of the page
+        rank: Position in the full ranked list
+        details: Whether to add the TMDB fields
+        
+    Returns:
+        Encoded JSON object
+    """
+    if record is None:
+        # Cached, pre-encoded Movie JSON (same shape as the movies API, keyed by TMDB ID);
+        # TMDB is only called on a cache miss
+        fragment = movie_fragment_by_id(tmdb_id)
+    else:
+        movie = {
+            "id": tmdb_id, **record, "overview": "", "poster_path": None, "release_date": None, "vote_average": None
+        }
+        if details:
+            movie.update(movie_media(tmdb_id))
+        fragment = dumps(movie)
+    
+    # Append recommendation scores to the encoded movie object
+    return extend_fragment(fragment, {
+        # Include recommendation scores
+        "final_score": rec.get("final_score"),
+        "content_score": rec.get("content_score"),
+        "collab_score": rec.get("collab_score"),
+        "tier": rec.get("tier", tier),
+        "rank": rank,
+        # Add weights for frontend display
+        "content_weight": getattr(recommender, "content_weight", 0.5),
+        "collab_weight": getattr(recommender, "collab_weight", 0.5),
+    })
+
+async def _stream_page(page: List[Dict[str, Any]], records: List[Optional[Dict[str, Any]]], tmdb_ids,
+                       offset: int, needed_count: int, recommender, tier: str, details: bool, media_type: str,
+                       next_cursor) -> AsyncIterator[bytes]:
+    """
+    Enrich a page concurrently and emit each movie as soon as its details arrive
+    
+    Movies arrive in completion order with their "rank" in the ranked list. At
+    most needed_count enrichments are in flight on the I/O executor; a failed
+    one is replaced by the next ranked movie, so the page still fills. While the
+    I/O queue is full, movies with local metadata are sent without TMDB details.
+    A final "end" event carries the number of movies sent and the cursor of the
+    next page.
+    
+    Args:
+        page: Ranked recommendations from the cursor offset on
+        records: Local metadata of each (see HybridRecommender.get_movie_records)
+        tmdb_ids: TMDB ID of each, 0 if unmapped
+        offset: Position of page[0] in the ranked list
+        needed_count: Page size
+        recommender: Model that produced the recommendations
+        tier: Tier of the page
+        details: Whether to add TMDB overviews and posters
+        media_type: NDJSON_MEDIA_TYPE or SSE_MEDIA_TYPE
+        next_cursor: Builds the next cursor from the ranked-list offset, None when exhausted
         
-        for rec in results:
-            # Skip if we already have enough recommendations
-            if len(enriched_results) >= needed_count:
-                break
-                
-            movielens_id = rec["movieId"]
-            if movielens_id in tried_movie_ids:
+    Yields:
+        Encoded events
+    """
+    pending = {}
+    position = 0
+    sent = 0
+    
+    def submit_next() -> None:
+        nonlocal position
+        while position < len(page):
+            rec, record, tmdb_id = page[position], records[position], int(tmdb_ids[position])
+            rank = offset + position
+            position += 1
+            if tmdb_id <= 0:
+                logger.warning(f"No TMDB ID mapping found for MovieLens ID {rec['movieId']}")
                 continue
-                
-            tried_movie_ids.add(movielens_id)
-            
             try:
-                # Convert MovieLens ID to TMDB ID
-                tmdb_id = id_mapper.get_tmdb_id(movielens_id)
-                if tmdb_id is None:
-                    logger.warning(f"No TMDB ID mapping found for MovieLens ID {movielens_id}")
+                future = io_executor.submit(_enrich, rec, record, tmdb_id, recommender, tier, rank, details)
+            except ExecutorSaturatedError:
+                if record is None:
                     continue
-                
-                # Get movie details from TMDB
-                movie = tmdb_service.get_movie_details(tmdb_id)
-                
-                # Create standardized movie object with recommendation scores
-                enriched_results.append({
-                    "id": tmdb_id,  # Use TMDB ID for consistency with Movie object from movies API
-                    "title": movie["title"],
-                    "genres": [genre["name"] for genre in movie["genres"]],
-                    "poster_path": tmdb_service.get_poster_url(movie["poster_path"]),
-                    "vote_average": movie["vote_average"],
-                    "release_date": movie["release_date"],
-                    "overview": movie["overview"],
-                    # Include recommendation scores
-                    "final_score": rec.get("final_score"),
-                    "content_score": rec.get("content_score"),
-                    "collab_score": rec.get("collab_score"),
-                    # Add weights for frontend display
-                    "content_weight": getattr(recommender, "content_weight", 0.5),
-                    "collab_weight": getattr(recommender, "collab_weight", 0.5),
-                })
-            except Exception as e:
-                logger.error(f"Error fetching details for movie {movielens_id}: {str(e)}")
-                continue
-                
-        # Return exactly the requested number of recommendations
-        return enriched_results[:needed_count]
-        
+                # Local metadata only; encoding it is cheap enough for the event loop
+                future = Future()
+                future.set_result(_enrich(rec, record, tmdb_id, recommender, tier, rank, details=False))
+            pending[asyncio.wrap_future(future)] = rec["movieId"]
+            return
+    
+    try:
+        for _ in range(needed_count):
+            submit_next()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                movielens_id = pending.pop(future)
+                try:
+                    fragment = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching details for movie {movielens_id}: {str(e)}")
+                    submit_next()
+                    continue
+                sent += 1
+                yield encode_event("recommendation", fragment, media_type)
+        yield encode_event("end", dumps({"count": sent, "next_cursor": next_cursor(offset + position)}), media_type)
     except Exception as e:
-        logger.error(f"Error getting recommendations: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error streaming recommendations: {str(e)}")
+        yield encode_event("error", dumps({"detail": str(e)}), media_type)
+    finally:
+        # The client went away or the stream failed: drop enrichments that haven't started
+        for future in pending:
+            future.cancel()
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "model_loaded": recommender is not None} 
\ No newline at end of file
+    return {
+        "status": "ok",
+        "model_loaded": model_store.model is not None,
+        "model_version": model_store.version,
+        "ready": model_store.model is not None and warmup.is_ready,
+        "warmup": warmup.report(),
+        "executors": executor_stats()
+    }
+
+@app.get("/health/live")
+def liveness():
+    """Process is up and serving HTTP"""
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+def readiness(response: Response):
+    """Model is loaded and warmup has finished; 503 until then"""
+    ready = model_store.model is not None and warmup.is_ready
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else "not_ready",
+        "model_version": model_store.version,
+        "warmup": warmup.report()
+    }
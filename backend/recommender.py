@@ -1,22 +1,41 @@
 import numpy as np
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from scipy.sparse import csr_matrix, save_npz, load_npz
 from sklearn.decomposition import TruncatedSVD
 import pickle
 import os
 from typing import List, Dict, Optional, Tuple
 import logging
+from app.models.neighbors import top_k_similarities
+
+def top_k_cosine_similarities(features: csr_matrix, k: int, memory_budget_mb: float = 256) -> csr_matrix:
+    """
+    Cosine similarities between rows truncated to the top K per row, in blocks sized to a memory budget
+    Args:
+        features: L2-normalized feature matrix (n x d), e.g. TF-IDF
+        k: Number of most similar rows to keep per row
+        memory_budget_mb: Upper bound for the dense working block
+    Returns:
+        Sparse (n x n) similarity matrix with at most k positive entries per row, excluding the row itself
+    """
+    n_rows = features.shape[0]
+    # Each block holds block_rows x n float32 similarities plus int64 argpartition indices
+    block_rows = max(1, int(memory_budget_mb * 2**20 // (max(n_rows, 1) * 12)))
+    return top_k_similarities(features, k, block_size=block_rows)
 
 class HybridRecommender:
-    def __init__(self, dataset_path: str):
+    def __init__(self, dataset_path: str, similarity_top_k: int = 100, similarity_memory_mb: float = 256):
         """
         Initialize the Hybrid Recommender System
         Args:
             dataset_path: Path to the dataset directory
+            similarity_top_k: Most similar movies kept per movie for content-based lookups
+            similarity_memory_mb: Memory budget for computing content similarities
         """
         self.dataset_path = dataset_path
+        self.similarity_top_k = similarity_top_k
+        self.similarity_memory_mb = similarity_memory_mb
         self.ratings_df = None
         self.movies_df = None
         self.tags_df = None
@@ -72,8 +91,10 @@ class HybridRecommender:
         )
         self.tfidf_matrix = self.vectorizer.fit_transform(self.movies_df['content'])
         
-        # Calculate content similarity matrix
-        self.content_similarity_matrix = cosine_similarity(self.tfidf_matrix)
+        # Keep only the top-K similar movies per movie; a dense n x n matrix does not fit at catalog scale
+        self.content_similarity_matrix = top_k_cosine_similarities(
+            self.tfidf_matrix, self.similarity_top_k, self.similarity_memory_mb
+        )
         
     def train_collaborative_model(self, n_components: int = 100):
         """Train the collaborative filtering model using SVD"""
@@ -94,14 +115,16 @@ class HybridRecommender:
             # Get the index of the movie
             movie_idx = self.movie_to_idx[movie_id]
             
-            # Get similarity scores
-            similarity_scores = list(enumerate(self.content_similarity_matrix[movie_idx]))
-            similarity_scores = sorted(similarity_scores, key=lambda x: x[1], reverse=True)
-            similarity_scores = similarity_scores[1:n_recommendations+1]
+            # Get the stored neighbors (at most similarity_top_k, the movie itself excluded)
+            start, stop = self.content_similarity_matrix.indptr[movie_idx:movie_idx + 2]
+            neighbors = self.content_similarity_matrix.indices[start:stop]
+            similarities = self.content_similarity_matrix.data[start:stop]
+            neighbors, similarities = neighbors[neighbors != movie_idx], similarities[neighbors != movie_idx]
+            order = np.argsort(-similarities, kind='stable')[:n_recommendations]
             
             # Get movie indices and scores
-            movie_indices = [i[0] for i in similarity_scores]
-            scores = [i[1] for i in similarity_scores]
+            movie_indices = neighbors[order]
+            scores = similarities[order].astype(float)
             
             # Get movie details
             recommendations = self.movies_df.iloc[movie_indices][['movieId', 'title', 'genres']].copy()
@@ -219,9 +242,9 @@ class HybridRecommender:
         
         # Save sparse matrices separately
         if self.tfidf_matrix is not None:
-            save_npz(f"{model_path}.tfidf", self.tfidf_matrix)
+            save_npz(f"{model_path}.tfidf.npz", self.tfidf_matrix)
         if self.content_similarity_matrix is not None:
-            save_npz(f"{model_path}.similarity", csr_matrix(self.content_similarity_matrix))
+            save_npz(f"{model_path}.similarity.npz", self.content_similarity_matrix.tocsr())
         
         # Save other model components
         model_data = {
@@ -238,11 +261,12 @@ class HybridRecommender:
     
     def load_model(self, model_path: str):
         """Load the trained models"""
-        # Load sparse matrices
-        if os.path.exists(f"{model_path}.tfidf"):
-            self.tfidf_matrix = load_npz(f"{model_path}.tfidf")
-        if os.path.exists(f"{model_path}.similarity"):
-            self.content_similarity_matrix = load_npz(f"{model_path}.similarity").toarray()
+        # Load sparse matrices (save_npz always writes a .npz suffix)
+        if os.path.exists(f"{model_path}.tfidf.npz"):
+            self.tfidf_matrix = load_npz(f"{model_path}.tfidf.npz")
+        if os.path.exists(f"{model_path}.similarity.npz"):
+            # Served straight from the sparse top-K matrix, never densified
+            self.content_similarity_matrix = load_npz(f"{model_path}.similarity.npz").tocsr()
         
         # Load other model components
         with open(model_path, 'rb') as f:
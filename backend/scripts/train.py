@@ -6,31 +6,101 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from app.data.processor import DataProcessor
+from app.data.id_mapper import MovieIdMapper
 from app.models.hybrid import HybridRecommender
+from app.models.collaborative import CollaborativeRecommender
+from app.models.als import ALSRecommender
+from app.models.item_item import ItemItemRecommender
+from app.models.fallback import ColdStartRecommender
+from app.models.candidates import CandidateGenerator
+from app.data.content_features import ContentFeaturePipeline
 from app.core.logging import logger
 from app.core.config import settings
-import joblib
+from app.api.services.recommendation import save_model
+
+def build_collaborative_model():
+    """Create the collaborative engine selected by COLLABORATIVE_ENGINE"""
+    engine = settings.COLLABORATIVE_ENGINE.lower()
+    if engine == "als":
+        return ALSRecommender(
+            n_factors=settings.ALS_N_FACTORS,
+            regularization=settings.ALS_REGULARIZATION,
+            iterations=settings.ALS_ITERATIONS,
+            n_jobs=settings.ALS_N_JOBS
+        )
+    if engine == "svd":
+        return CollaborativeRecommender(n_components=settings.SVD_N_COMPONENTS)
+    raise ValueError(f"Unknown collaborative engine: {settings.COLLABORATIVE_ENGINE}")
+
+def build_content_features(movies_df):
+    """Hashed title/genre/tag features when CONTENT_FEATURES is "hashing", else None (in-memory TF-IDF)"""
+    mode = settings.CONTENT_FEATURES.lower()
+    if mode == "tfidf":
+        return None
+    if mode != "hashing":
+        raise ValueError(f"Unknown content features: {settings.CONTENT_FEATURES}")
+    pipeline = ContentFeaturePipeline(
+        n_features=settings.CONTENT_HASH_FEATURES,
+        tag_weight=settings.CONTENT_TAG_WEIGHT,
+        chunk_size=settings.CONTENT_CHUNK_SIZE,
+        n_jobs=settings.CONTENT_N_JOBS
+    )
+    return pipeline.transform(movies_df, settings.DATASET_PATH / "tags.csv")
 
 def main():
     logger.info("Loading and preprocessing data...")
     processor = DataProcessor()
-    processor.load_data()
-    user_movie_matrix = processor.get_user_movie_matrix()
+    # Tags are streamed by the content feature pipeline rather than loaded whole
+    processor.load_data(load_tags=settings.CONTENT_FEATURES.lower() != "hashing")
+    collab_model = build_collaborative_model()
+    item_model = ItemItemRecommender(n_neighbors=settings.ITEM_ITEM_NEIGHBORS) if settings.ITEM_ITEM_ENABLED else None
+    # All collaborative engines train on the sparse ratings directly, no dense pivot needed
+    user_movie_matrix = processor.get_sparse_user_movie_matrix()
 
-    logger.info("Training hybrid recommender...")
-    recommender = HybridRecommender(content_weight=settings.CONTENT_WEIGHT, collab_weight=settings.COLLABORATIVE_WEIGHT)
+    logger.info(f"Training hybrid recommender ({settings.COLLABORATIVE_ENGINE} collaborative engine)...")
+    recommender = HybridRecommender(
+        content_weight=settings.CONTENT_WEIGHT,
+        collab_weight=settings.COLLABORATIVE_WEIGHT,
+        collab_model=collab_model,
+        item_model=item_model,
+        fallback_model=ColdStartRecommender(
+            prior_ratings=settings.COLD_START_PRIOR_RATINGS,
+            list_size=settings.COLD_START_LIST_SIZE
+        ),
+        candidate_generator=CandidateGenerator(
+            collab_budget=settings.CANDIDATE_COLLAB_BUDGET,
+            content_budget=settings.CANDIDATE_CONTENT_BUDGET,
+            popular_budget=settings.CANDIDATE_POPULAR_BUDGET,
+            n_seed_movies=settings.CANDIDATE_SEED_MOVIES
+        ),
+        quantize_factors=settings.QUANTIZED_FACTORS
+    )
     recommender.fit(
         movies_df=processor.movies_df,
         user_movie_matrix=user_movie_matrix,
         movie_to_idx=processor.movie_to_idx,
-        idx_to_movie=processor.idx_to_movie
+        idx_to_movie=processor.idx_to_movie,
+        content_features=build_content_features(processor.movies_df)
     )
 
-    # Save model
-    settings.SAVED_MODELS_PATH.mkdir(parents=True, exist_ok=True)
-    model_path = settings.SAVED_MODELS_PATH / "hybrid_recommender.joblib"
-    joblib.dump(recommender, model_path)
+    # Save a new model version and promote it; running workers memory-map it and pick it up
+    ratings, user_ids, movie_ids = user_movie_matrix
+    model_path = save_model(recommender, metadata={
+        "collaborative_engine": settings.COLLABORATIVE_ENGINE,
+        "content_features": settings.CONTENT_FEATURES,
+        "content_weight": settings.CONTENT_WEIGHT,
+        "collab_weight": settings.COLLABORATIVE_WEIGHT,
+        "item_item": item_model is not None,
+        "n_users": len(user_ids),
+        "n_movies": len(processor.movies_df),
+        "n_rated_movies": len(movie_ids),
+        "n_ratings": int(ratings.nnz),
+        "quantized_factors": recommender.quantized_factors.report if recommender.quantized_factors else None,
+    })
     logger.info(f"Model saved to {model_path}")
 
+    # Refresh the binary ID mapping cache that serving workers memory-map
+    MovieIdMapper().load_mappings()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
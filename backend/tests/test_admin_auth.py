@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+import pytest
+from fastapi import HTTPException
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.api.routes import admin
+from app.core.config import settings
+
+def test_admin_routes_fail_closed_without_a_configured_token(monkeypatch):
+    """No ADMIN_TOKEN disables the admin API; with one set only the exact token is accepted"""
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+    for token in (None, "", "anything"):
+        with pytest.raises(HTTPException) as error:
+            admin._check_token(token)
+        assert error.value.status_code == 403
+
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "s3cret")
+    for token in (None, "", "s3cre", "s3cret "):
+        with pytest.raises(HTTPException) as error:
+            admin._check_token(token)
+        assert error.value.status_code == 401
+    admin._check_token("s3cret")
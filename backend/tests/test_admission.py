@@ -0,0 +1,75 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.api.services.admission import AdmissionMiddleware, ConcurrencyLimiter, RateLimiter
+
+def test_token_bucket_limits_each_client_and_refills():
+    """A client gets `burst` requests back to back, then waits for tokens; clients are independent"""
+    limiter = RateLimiter(rate=100.0, burst=3)
+    assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    retry_after = limiter.acquire("a")
+    assert 0 < retry_after <= 0.01
+    assert limiter.acquire("b") == 0.0
+
+    time.sleep(0.02)
+    assert limiter.acquire("a") == 0.0
+    stats = limiter.stats()
+    assert stats["rejected"] == 1 and stats["allowed"] == 5 and stats["clients"] == 2
+
+def _request(middleware, path, api_key=None):
+    """Run one GET through the middleware and return the response status"""
+    headers = [(b"x-api-key", api_key.encode())] if api_key else []
+    scope = {"type": "http", "method": "GET", "path": path, "headers": headers, "client": ("10.0.0.1", 1234)}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0]["status"]
+
+def test_middleware_charges_budgets_by_route_and_client():
+    """Model routes use the expensive budget and a concurrency slot; health checks are exempt"""
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    concurrency = ConcurrencyLimiter(limit=4)
+    middleware = AdmissionMiddleware(
+        app, cheap=RateLimiter(1.0, 3), expensive=RateLimiter(1.0, 1), concurrency=concurrency,
+        expensive_prefixes=["/api/v1/recommendations"], exempt_prefixes=["/health"], api_keys=["k", "other"]
+    )
+
+    assert _request(middleware, "/api/v1/recommendations") == 200
+    assert _request(middleware, "/api/v1/recommendations") == 429
+    assert _request(middleware, "/api/v1/recommendations", api_key="k") == 200
+    assert _request(middleware, "/api/v1/movies/popular") == 200
+    assert all(_request(middleware, "/health") == 200 for _ in range(10))
+    assert concurrency.stats()["in_flight"] == 0 and concurrency.stats()["peak"] == 1
+
+    concurrency.limit = 0
+    assert _request(middleware, "/api/v1/recommendations", api_key="other") == 503
+    assert concurrency.stats()["rejected"] == 1
+
+def test_unknown_api_keys_share_the_address_budget():
+    """Rotating made-up X-API-Key values does not reset the client's bucket"""
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    middleware = AdmissionMiddleware(
+        app, cheap=RateLimiter(0.001, 2), expensive=RateLimiter(0.001, 2), concurrency=ConcurrencyLimiter(4),
+        expensive_prefixes=["/api/v1/recommendations"], api_keys=["partner"]
+    )
+    statuses = [_request(middleware, "/api/v1/recommendations", api_key=f"random-{i}") for i in range(4)]
+    assert statuses == [200, 200, 429, 429]
+    assert _request(middleware, "/api/v1/recommendations") == 429
+    assert _request(middleware, "/api/v1/recommendations", api_key="partner") == 200
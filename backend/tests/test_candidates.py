@@ -0,0 +1,114 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.models.als import ALSRecommender
+from app.models.collaborative import CollaborativeRecommender
+from app.models.candidates import CandidateGenerator, SOURCE_COLLABORATIVE, SOURCE_CONTENT, SOURCE_POPULAR
+from app.models.hybrid import HybridRecommender
+
+def test_generate_respects_budgets_and_deduplicates():
+    """Each source fills its own budget, excluded rows never appear and the first source wins duplicates"""
+    allowed = np.ones(6, dtype=bool)
+    allowed[5] = False
+    collab_scores = np.array([0.9, 0.1, 0.8, -np.inf, 0.2, 1.0])
+    neighbors = csr_matrix(np.array([
+        [0, 0, 0, 0.9, 0.5, 0],
+        [0, 0, 0, 0, 0, 0],
+    ] + [[0] * 6] * 4, dtype=np.float32))
+    generator = CandidateGenerator(collab_budget=2, content_budget=2, popular_budget=3)
+
+    rows, sources = generator.generate(
+        allowed, collab_scores, seed_rows=np.array([0]), seed_weights=np.array([5.0]),
+        content_neighbors=neighbors, popularity_ranking=np.array([5, 0, 1, 4, 3])
+    )
+    assert list(rows) == [0, 2, 3, 4, 1]
+    assert list(sources) == [SOURCE_COLLABORATIVE] * 2 + [SOURCE_CONTENT] * 2 + [SOURCE_POPULAR]
+    assert generator.count_sources(sources) == {"collaborative": 2, "content": 2, "popular": 1}
+
+def test_content_neighbors_of_top_rated_movies_reach_the_ranking():
+    """A close content match the collaborative budget misses is retrieved and re-ranked"""
+    movies_df = pd.DataFrame({
+        "movieId": [10, 20, 30, 40, 50],
+        "title": ["Alien (1979)", "Aliens (1986)", "Heat (1995)", "Up (2009)", "Cars (2006)"],
+        "genres": ["Horror|Sci-Fi", "Horror|Sci-Fi", "Crime", "Animation", "Animation"],
+    })
+    ratings = csr_matrix(np.array([
+        [5, 0, 1, 0, 0],
+        [0, 0, 5, 4, 4],
+        [0, 1, 4, 5, 5],
+    ], dtype=np.float32))
+    features = csr_matrix(np.array([
+        [1, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1], [0, 0, 1],
+    ], dtype=np.float32))
+    recommender = HybridRecommender(
+        collab_model=ALSRecommender(n_factors=2, iterations=5, n_jobs=1),
+        candidate_generator=CandidateGenerator(collab_budget=1, content_budget=5, popular_budget=0)
+    )
+    recommender.fit(movies_df, (ratings, [1, 2, 3], [10, 20, 30, 40, 50]),
+                    {mid: i for i, mid in enumerate(movies_df["movieId"])},
+                    dict(enumerate(movies_df["movieId"])), content_features=(features, None))
+
+    timings = {}
+    recs = recommender.get_recommendations(1, 5, timings=timings)
+    movie_ids = [rec["movieId"] for rec in recs]
+    assert 20 in movie_ids
+    assert 10 not in movie_ids and 30 not in movie_ids  # Rated movies are excluded
+    assert max(recs, key=lambda rec: rec["content_score"])["movieId"] == 20
+    assert set(timings) == {"retrieval", "rerank"}
+
+def test_svd_without_item_item_model_excludes_rated_movies_and_seeds_content():
+    """The hybrid keeps its own ratings, so SVD alone still knows what the user rated"""
+    movies_df = pd.DataFrame({
+        "movieId": [10, 20, 30, 40, 50],
+        "title": ["Alien (1979)", "Aliens (1986)", "Heat (1995)", "Up (2009)", "Cars (2006)"],
+        "genres": ["Horror|Sci-Fi", "Horror|Sci-Fi", "Crime", "Animation", "Animation"],
+    })
+    ratings = csr_matrix(np.array([
+        [5, 0, 1, 0, 0],
+        [0, 0, 5, 4, 4],
+        [0, 1, 4, 5, 5],
+    ], dtype=np.float32))
+    features = csr_matrix(np.array([
+        [1, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1], [0, 0, 1],
+    ], dtype=np.float32))
+    recommender = HybridRecommender(
+        collab_model=CollaborativeRecommender(n_components=2),
+        item_model=None,
+        candidate_generator=CandidateGenerator(collab_budget=5, content_budget=5, popular_budget=0)
+    )
+    recommender.fit(movies_df, (ratings, [1, 2, 3], [10, 20, 30, 40, 50]),
+                    {mid: i for i, mid in enumerate(movies_df["movieId"])},
+                    dict(enumerate(movies_df["movieId"])), content_features=(features, None))
+
+    rated_rows, _ = recommender._user_ratings(1)
+    assert sorted(rated_rows) == [0, 2]
+    recs = recommender.get_recommendations(1, 5)
+    movie_ids = [rec["movieId"] for rec in recs]
+    assert 10 not in movie_ids and 30 not in movie_ids
+    assert max(recs, key=lambda rec: rec["content_score"])["movieId"] == 20
+
+def test_cold_start_recommendations_use_display_titles():
+    """Fallback tiers describe movies through the metadata store like the personalized path"""
+    movies_df = pd.DataFrame({
+        "movieId": [10, 20, 30],
+        "title": ["Thing, The (1982)", "Heat (1995)", "Up (2009)"],
+        "genres": ["Horror|Sci-Fi", "Crime", "Animation"],
+    })
+    ratings = csr_matrix(np.array([[5, 0, 1], [4, 2, 0]], dtype=np.float32))
+    recommender = HybridRecommender(
+        collab_model=CollaborativeRecommender(n_components=1),
+        candidate_generator=CandidateGenerator(collab_budget=3, content_budget=0, popular_budget=0)
+    )
+    recommender.fit(movies_df, (ratings, [1, 2], [10, 20, 30]),
+                    {mid: i for i, mid in enumerate(movies_df["movieId"])},
+                    dict(enumerate(movies_df["movieId"])), content_features=(csr_matrix(np.eye(3)), None))
+
+    recs = recommender.get_recommendations(999, 3)
+    assert recs[0]["tier"] == "popular"
+    assert recs[0]["title"] == "The Thing (1982)" and recs[0]["genres"] == "Horror|Sci-Fi"
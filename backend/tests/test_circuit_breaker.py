@@ -0,0 +1,44 @@
+import sys
+import time
+from pathlib import Path
+import pytest
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.api.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+def test_breaker_opens_on_failure_rate_and_fails_fast():
+    """Failures and slow calls open the circuit once min_calls is reached; callers are then rejected"""
+    breaker = CircuitBreaker(window=10, min_calls=4, failure_rate=0.5, slow_call_seconds=1.0, reset_timeout=60)
+    for succeeded, duration in [(True, 0.1), (False, 0.1), (True, 0.1)]:
+        breaker.before_call()
+        breaker.record(succeeded, duration)
+    assert breaker.state == "closed"
+
+    breaker.before_call()
+    breaker.record(True, 5.0)  # Slow counts as bad: 2 of 4
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats()["rejected"] == 1
+
+def test_half_open_allows_one_trial():
+    """After the reset timeout one trial call decides whether the circuit closes or reopens"""
+    breaker = CircuitBreaker(min_calls=1, failure_rate=0.5, reset_timeout=0.05)
+    breaker.before_call()
+    breaker.record(False, 0.0)
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # Trial already in flight
+    breaker.record(False, 0.0)
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record(True, 0.0)
+    assert breaker.state == "closed"
+    breaker.before_call()
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.data.content_features import ContentFeaturePipeline
+
+def test_hashed_features_include_streamed_tags(tmp_path):
+    """Tags are streamed in chunks into L2-normalized float32 rows aligned with movies"""
+    movies_df = pd.DataFrame({
+        "movieId": [30, 10, 20],
+        "title": ["Heat (1995)", "Alien (1979)", "Aliens (1986)"],
+        "genres": ["Crime|Thriller", "Horror|Sci-Fi", "Action|Sci-Fi"],
+    })
+    tags_path = tmp_path / "tags.csv"
+    pd.DataFrame({
+        "userId": [1, 2, 3, 4, 5],
+        "movieId": [10, 20, 20, 99, 30],
+        "tag": ["xenomorph", "xenomorph", "ripley", "unknown movie", "heist"],
+        "timestamp": [0] * 5,
+    }).to_csv(tags_path, index=False)
+
+    pipeline = ContentFeaturePipeline(n_features=2 ** 12, chunk_size=2, n_jobs=1)
+    features, names = pipeline.transform(movies_df, tags_path)
+
+    assert features.shape == (3, 2 ** 12) and features.dtype == np.float32
+    assert np.allclose(np.sqrt(features.multiply(features).sum(axis=1)).A.ravel(), 1.0)
+    assert "xenomorph" in set(names) and "heist" in set(names) and "unknown" not in set(names)
+    similarity = (features @ features.T).toarray()
+    # The shared tag makes Alien closer to Aliens than to Heat
+    assert similarity[1, 2] > similarity[1, 0]
+
+    parallel, _ = ContentFeaturePipeline(n_features=2 ** 12, chunk_size=2, n_jobs=2).transform(movies_df, tags_path)
+    assert np.allclose(parallel.toarray(), features.toarray())
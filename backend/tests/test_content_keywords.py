@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.models.content import ContentBasedRecommender
+
+def test_keyword_profile_uses_precomputed_filtered_keywords():
+    """Only the top word-like features per movie are kept, and profiles sum them across movies"""
+    movies = pd.DataFrame({"movieId": [1, 2, 3], "title": ["a", "b", "c"], "genres": ["x", "y", "z"]})
+    names = ["heist", "1995", "crime", "ox", "space"]
+    features = csr_matrix(np.array([
+        [0.5, 0.9, 0.3, 0.8, 0.0],
+        [0.2, 0.0, 0.6, 0.0, 0.1],
+        [0.0, 0.0, 0.0, 0.0, 0.0],
+    ], dtype=np.float32))
+    model = ContentBasedRecommender(keywords_per_movie=1)
+    model.fit(movies, {1: 0, 2: 1, 3: 2}, {0: 1, 1: 2, 2: 3}, features, names)
+
+    # "1995" and "ox" are filtered before the top-1 cut, and unused features leave the vocabulary
+    assert list(model.keyword_names) == ["heist", "crime"]
+    assert model.keyword_profile([0]) == {"heist": 1.0}
+    profile = model.keyword_profile([0, 1, 2, -1])
+    assert list(profile) == ["crime", "heist"]
+    assert abs(profile["crime"] - 0.6 / 1.1) < 1e-6
+    assert model.keyword_profile([2]) == {}
@@ -0,0 +1,48 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+import pytest
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.api.services.executor import BoundedExecutor, ExecutorSaturatedError
+
+def test_full_executor_rejects_and_recovers():
+    """Work beyond workers + queue is rejected at once; finished jobs free their slots"""
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+    running = executor.submit(release.wait)
+    queued = executor.submit(lambda: 42)
+    with pytest.raises(ExecutorSaturatedError):
+        executor.submit(lambda: 0)
+
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["queued"] + stats["running"] == 2
+
+    release.set()
+    assert running.result(timeout=1) is True
+    assert queued.result(timeout=1) == 42
+    assert executor.submit(lambda: 7).result(timeout=1) == 7
+    stats = executor.stats()
+    assert stats["completed"] == 3 and stats["queued"] == 0
+
+def test_run_awaits_result_off_the_event_loop():
+    """run() returns the job's result and raises saturation to the awaiting coroutine"""
+    executor = BoundedExecutor("test", max_workers=1, max_queue=0)
+
+    async def main():
+        caller = threading.get_ident()
+        worker = await executor.run(threading.get_ident)
+        release = threading.Event()
+        blocker = executor.submit(release.wait)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(lambda: 0)
+        release.set()
+        await asyncio.wrap_future(blocker)
+        return caller, worker
+
+    caller, worker = asyncio.run(main())
+    assert caller != worker
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.models.fallback import ColdStartRecommender
+
+def _fit_model():
+    movies_df = pd.DataFrame({
+        "movieId": [1, 2, 3, 4],
+        "title": ["A (1990)", "B (1991)", "C (1992)", "D (1993)"],
+        "genres": ["Comedy", "Drama", "Comedy|Drama", "Horror"],
+    })
+    # Movie 1 has many good ratings, movie 4 a single perfect one
+    ratings = csr_matrix(np.array([
+        [5, 3, 4, 0],
+        [5, 2, 4, 0],
+        [4, 3, 0, 5],
+    ], dtype=np.float32))
+    tfidf = csr_matrix(np.array([
+        [1, 0, 0],
+        [0, 1, 0],
+        [0.7, 0.7, 0],
+        [0, 0, 1],
+    ], dtype=np.float32))
+    model = ColdStartRecommender(prior_ratings=2, list_size=10, n_content_neighbors=2)
+    model.fit(movies_df, ratings, tfidf, user_ids=[1, 2, 3], movie_ids=[1, 2, 3, 4])
+    return model
+
+def test_popular_tier_uses_bayesian_average():
+    """A single perfect rating does not outrank many good ones"""
+    recs = _fit_model().get_recommendations(n_recommendations=4)
+    assert recs[0]["movieId"] == 1
+    assert {rec["tier"] for rec in recs} == {"popular"}
+
+def test_genre_and_seeded_tiers():
+    """Genre lists filter by genre and seeds return content neighbors"""
+    model = _fit_model()
+    genre_recs = model.get_recommendations(n_recommendations=5, genres=["drama"])
+    assert [rec["movieId"] for rec in genre_recs] == [3, 2]
+    assert genre_recs[0]["tier"] == "genre"
+
+    seeded = model.get_recommendations(n_recommendations=5, seed_movie_ids=[1])
+    assert seeded[0]["movieId"] == 3
+    assert seeded[0]["tier"] == "content_seeded"
+    assert 1 not in {rec["movieId"] for rec in seeded}
+
+def test_seeded_tier_is_backfilled_from_the_filtered_ranking():
+    """Seed neighbors come first, then the genre or popular ranking fills the list without repeats"""
+    model = _fit_model()
+    recs = model.get_recommendations(n_recommendations=3, seed_movie_ids=[1])
+    assert [rec["movieId"] for rec in recs] == [3, 4, 2]
+    assert [rec["tier"] for rec in recs] == ["content_seeded", "popular", "popular"]
+    scores = [rec["score"] for rec in recs]
+    assert scores == sorted(scores, reverse=True)
+
+    mask = np.array([True, False, True, True])
+    recs = model.get_recommendations(n_recommendations=3, seed_movie_ids=[1], genres=["horror"], mask=mask)
+    assert [(rec["movieId"], rec["tier"]) for rec in recs] == [(3, "content_seeded"), (4, "genre")]
@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+import pandas as pd
+import pytest
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.data.filters import MovieFilterIndex, parse_release_year
+
+def test_parse_release_year():
+    """Years are read from the end of MovieLens titles"""
+    assert parse_release_year("Toy Story (1995)") == 1995
+    assert parse_release_year("Babylon 5 (1994-1998)") == 1994
+    assert parse_release_year("2001: A Space Odyssey (1968) ") == 1968
+    assert parse_release_year("Black Mirror") == 0
+
+def test_genre_and_year_mask():
+    """Masks combine genre bits and year ranges"""
+    movies_df = pd.DataFrame({
+        "movieId": [10, 20, 30, 40],
+        "title": ["A (1991)", "B (1995)", "C (2005)", "D"],
+        "genres": ["Comedy|Drama", "Drama", "Comedy", "Comedy"],
+    })
+    index = MovieFilterIndex().fit(movies_df)
+
+    assert index.mask() is None
+    assert index.mask(genres=["comedy"], year_from=1990, year_to=1999).tolist() == [True, False, False, False]
+    assert index.mask(genres=["Comedy", "Drama"]).tolist() == [True, True, True, True]
+    assert index.mask(genres=["Comedy", "Drama"], match_all_genres=True).tolist() == [True, False, False, False]
+    assert index.positions([30, 99, 10]).tolist() == [2, -1, 0]
+    with pytest.raises(ValueError):
+        index.mask(genres=["Western"])
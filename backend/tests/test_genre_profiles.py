@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.models.genre_profiles import UserGenreProfiles
+
+def test_profiles_are_sparse_products_with_rating_and_count_variants():
+    """Rating-weighted and count profiles read per user and in batches"""
+    # Users 7 and 3; movies: Comedy, Comedy|Drama, Drama
+    ratings = csr_matrix(np.array([[5.0, 1.0, 0.0], [0.0, 0.0, 4.0]], dtype=np.float32))
+    movie_genres = csr_matrix(np.array([[1, 0], [1, 1], [0, 1]], dtype=np.float32))
+    profiles = UserGenreProfiles().fit(ratings, [7, 3], movie_genres, ["Comedy", "Drama"])
+
+    assert profiles.preferences(7) == {"Comedy": 6 / 7, "Drama": 1 / 7}
+    assert profiles.preferences(7, "count") == {"Comedy": 2 / 3, "Drama": 1 / 3}
+    assert profiles.preferences(3) == {"Drama": 1.0}
+    assert profiles.preferences(42) == {}
+
+    matrix, known = profiles.profiles([3, 42, 7], "count")
+    assert list(known) == [True, False, True]
+    np.testing.assert_array_equal(matrix, [[0, 1], [0, 0], [2, 1]])
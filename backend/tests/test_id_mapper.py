@@ -8,11 +8,16 @@ sys.path.append(str(Path(__file__).parent.parent))
 from app.data.id_mapper import MovieIdMapper
 from app.core.config import settings
 
-def test_movie_id_mapping():
+def test_movie_id_mapping(tmp_path, monkeypatch):
     """Test ID mapping between MovieLens and TMDB"""
+    # Keep the binary cache out of the source tree
+    cache_path = tmp_path / "id_mappings.npy"
+    monkeypatch.setattr(settings, "ID_MAPPER_CACHE_PATH", cache_path)
+    
     # Initialize mapper
     mapper = MovieIdMapper()
     mapper.load_mappings()
+    assert cache_path.exists()
     
     # Test with sample MovieLens ID
     movielens_id = 1
@@ -27,6 +32,20 @@ def test_movie_id_mapping():
     assert movielens_from_tmdb == movielens_id, f"Expected MovieLens ID {movielens_id}, got {movielens_from_tmdb}"
     print("\nAll ID mapping tests passed successfully!")
 
+def test_batch_lookups_and_cache(tmp_path):
+    """Batch lookups mark missing IDs with -1 and survive a cache round trip"""
+    mapper = MovieIdMapper.from_arrays([3, 1, 2], [300, 100, 200])
+    assert mapper.get_tmdb_ids([1, 2, 99, 3]).tolist() == [100, 200, -1, 300]
+    assert mapper.get_movielens_ids([300, 5]).tolist() == [3, -1]
+    
+    cache_path = tmp_path / "id_mappings.npy"
+    mapper.save_cache(cache_path)
+    cached = MovieIdMapper()
+    cached.load_cache(cache_path)
+    assert cached.get_tmdb_id(2) == 200
+    assert cached.get_movielens_id_from_tmdb(100) == 1
+    assert cached.get_tmdb_id(42) is None
+
 def show_tmdb_id(movielens_id):
     """Hiển thị TMDB ID tương ứng với một MovieLens ID cụ thể"""
     # Initialize mapper
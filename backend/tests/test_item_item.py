@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.models.item_item import ItemItemRecommender
+
+def _make_ratings():
+    # Movies 1/2 are co-rated by the same users, movies 3/4 by another group
+    dense = np.array([
+        [5, 5, 0, 0, 1],
+        [4, 5, 0, 0, 0],
+        [5, 0, 0, 0, 2],
+        [0, 0, 5, 4, 0],
+        [0, 0, 4, 5, 1],
+        [0, 1, 5, 0, 0],
+    ], dtype=np.float32)
+    return csr_matrix(dense), [10, 11, 12, 13, 14, 15], [1, 2, 3, 4, 5]
+
+def test_neighbors_are_truncated_and_exclude_self():
+    """Each movie keeps at most K neighbors and never itself"""
+    ratings, user_ids, movie_ids = _make_ratings()
+    model = ItemItemRecommender(n_neighbors=2, block_size=2, min_support=1)
+    model.fit(ratings, user_ids, movie_ids)
+
+    counts = np.diff(model.similarities.indptr)
+    assert counts.max() <= 2
+    assert model.similarities.diagonal().sum() == 0
+    assert model.get_similar_movies(1, 1)[0]["movieId"] == 2
+
+def test_recommendations_explain_source_movie():
+    """Recommendations skip rated movies and name the rated movie behind them"""
+    ratings, user_ids, movie_ids = _make_ratings()
+    model = ItemItemRecommender(n_neighbors=3, min_support=1)
+    model.fit(ratings, user_ids, movie_ids)
+
+    recs = model.get_recommendations(12, 3)
+    assert recs
+    assert recs[0]["movieId"] == 2
+    assert recs[0]["because_of"] == 1
+    assert not {1, 5} & {rec["movieId"] for rec in recs}
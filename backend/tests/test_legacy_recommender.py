@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scipy.sparse import random as sparse_random
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from recommender import HybridRecommender, top_k_cosine_similarities
+
+def test_blockwise_top_k_matches_dense_cosine():
+    """Every block size keeps exactly the K largest off-diagonal similarities of each row"""
+    features = sparse_random(40, 30, density=0.2, format="csr", random_state=0, dtype=np.float32)
+    norms = np.sqrt(features.multiply(features).sum(axis=1)).A.ravel()
+    norms[norms == 0] = 1.0
+    features = features.multiply(1.0 / norms[:, None]).tocsr()
+    dense = (features @ features.T).toarray()
+    np.fill_diagonal(dense, 0.0)
+
+    # 0.001 MB forces one-row blocks; 64 MB computes everything in one block
+    for budget in (0.001, 64):
+        top = top_k_cosine_similarities(features, k=5, memory_budget_mb=budget)
+        assert top.shape == (40, 40) and top.dtype == np.float32
+        assert np.all(top.diagonal() == 0)
+        for row in range(40):
+            kept = np.sort(top[row].data)[::-1]
+            expected = np.sort(dense[row])[::-1][:5]
+            assert np.allclose(kept, expected[expected > 0], atol=1e-6)
+
+def test_content_recommendations_survive_save_and_load(tmp_path):
+    """Lookups come from the sparse top-K matrix before and after a save/load round trip"""
+    pd.DataFrame({
+        "movieId": [1, 2, 3, 4],
+        "title": ["Alien (1979)", "Aliens (1986)", "Heat (1995)", "Toy Story (1995)"],
+        "genres": ["Horror|Sci-Fi", "Action|Horror|Sci-Fi", "Crime|Thriller", "Animation|Children"],
+    }).to_csv(tmp_path / "movies.csv", index=False)
+    pd.DataFrame({
+        "userId": [1, 1, 2, 2], "movieId": [1, 2, 3, 4], "rating": [5.0, 4.0, 3.0, 4.5], "timestamp": [0] * 4
+    }).to_csv(tmp_path / "ratings.csv", index=False)
+
+    recommender = HybridRecommender(str(tmp_path), similarity_top_k=2, similarity_memory_mb=0.001)
+    recommender.load_data()
+    recommender.train_content_based_model()
+    recommendations = recommender.get_content_based_recommendations(1, n_recommendations=3)
+    assert recommendations["movieId"].iloc[0] == 2
+    assert 1 not in set(recommendations["movieId"]) and len(recommendations) <= 2
+
+    recommender.train_collaborative_model(n_components=1)
+    model_path = str(tmp_path / "legacy_model")
+    recommender.save_model(model_path)
+    loaded = HybridRecommender(str(tmp_path))
+    loaded.load_model(model_path)
+    reloaded = loaded.get_content_based_recommendations(1, n_recommendations=3)
+    assert list(reloaded["movieId"]) == list(recommendations["movieId"])
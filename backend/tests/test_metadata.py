@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.data.metadata import MovieMetadataStore
+
+def test_metadata_store_builds_response_rows_in_bulk():
+    """Display titles, interned genres, years and MovieLens ratings come back per catalog row without pandas"""
+    movies = pd.DataFrame({
+        "movieId": [10, 20, 30],
+        "title": ["Matrix, The (1999)", "Amélie (2001)", "Untitled"],
+        "genres": ["Action|Sci-Fi", "Comedy|Romance", "(no genres listed)"],
+    })
+    # Two users; movie 30 is unrated and an unknown movie 99 is ignored
+    ratings = csr_matrix(np.array([[5.0, 4.0, 3.0], [4.0, 0.0, 1.0]], dtype=np.float32))
+    store = MovieMetadataStore().fit(movies, ratings, [20, 10, 99])
+
+    assert store.genre_names == ["Action", "Comedy", "Romance", "Sci-Fi"]
+    assert store.title(1) == "Amélie (2001)"
+    assert store.title(0) == "The Matrix (1999)"  # Same display form as records()
+    assert store.genres(0) == ["Action", "Sci-Fi"]
+    assert store.records([2, 0]) == [
+        {"movieId": 30, "title": "Untitled", "genres": [], "year": None, "ml_rating_10": 0.0},
+        {"movieId": 10, "title": "The Matrix (1999)", "genres": ["Action", "Sci-Fi"], "year": 1999,
+         "ml_rating_10": 8.0},
+    ]
+    assert store.records([1])[0]["ml_rating_10"] == 9.0
@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pytest
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.api.services import recommendation
+from app.api.services.recommendation import ModelStore, model_version, save_model
+
+class FakeModel:
+    """Minimal picklable stand-in for a fitted recommender"""
+
+    def __init__(self, value):
+        self.factors = np.full((2, 3), value, dtype=np.float32)
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(recommendation.settings, "SAVED_MODELS_PATH", tmp_path)
+    return tmp_path
+
+def test_store_maps_arrays_and_follows_replaced_file(model_dir):
+    """Arrays are mapped read-only and a replaced artifact is reloaded in the background"""
+    model_path = model_dir / "model.joblib"
+    save_model(FakeModel(1), model_path)
+
+    store = ModelStore(model_path, check_interval=1e-9, warmup=None)
+    first = store.get()
+    assert isinstance(first.factors, np.memmap)
+    assert not first.factors.flags.writeable
+
+    save_model(FakeModel(2), model_path)
+    assert store.check_for_update()
+    store._reload_lock.acquire()  # Waits for the background reload
+    store._reload_lock.release()
+    second = store.get()
+    assert second is not first and second.factors.sum() == 12
+    # The old mapping stays readable after the file was replaced
+    assert first.factors[1, 2] == 1
+    assert store.previous is first
+
+def test_reload_version_warmup_and_rollback(model_dir):
+    """Versions are promoted on reload, broken models are never swapped in, rollback is instant"""
+    model_path = model_dir / "model.joblib"
+    old = save_model(FakeModel(1), model_path).stem
+    new = save_model(FakeModel(2), model_path, promote=False).stem
+
+    def warmup(model):
+        if model.factors[0, 0] == 3:
+            raise ValueError("bad model")
+
+    store = ModelStore(model_path, check_interval=0, warmup=warmup)
+    assert store.load() and store.version == old
+    store.reload(new)
+    assert store.version == new
+    assert ModelStore(model_path).load().factors[0, 0] == 2  # Other workers follow the promotion
+
+    bad = save_model(FakeModel(3), model_path, promote=False).stem
+    with pytest.raises(ValueError):
+        store.reload(bad)
+    assert store.version == new and store.status["state"] == "failed"
+
+    store.rollback()
+    assert store.version == old and model_version(store.previous) == new
+    assert ModelStore(model_path).load().factors[0, 0] == 1
+
+def test_promotion_prunes_old_versions_but_keeps_the_replaced_one(model_dir, monkeypatch):
+    """Only the newest MODEL_KEEP_VERSIONS survive a promotion, plus the version it replaced for rollback"""
+    monkeypatch.setattr(recommendation.settings, "MODEL_KEEP_VERSIONS", 2)
+    model_path = model_dir / "model.joblib"
+    serving = save_model(FakeModel(1), model_path).stem
+    unpromoted = [save_model(FakeModel(i), model_path, promote=False).stem for i in (2, 3, 4)]
+    assert recommendation.serving_version(model_path) == serving
+
+    promoted = save_model(FakeModel(5), model_path).stem
+    remaining = [version["version"] for version in recommendation.list_versions()]
+    assert remaining == [promoted, unpromoted[-1], serving]
+    assert not (model_dir / "versions" / f"{unpromoted[0]}.json").exists()
+    assert recommendation.serving_version(model_path) == promoted
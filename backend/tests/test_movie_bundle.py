@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+import orjson
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.api.routes import movies
+
+def test_bundle_fetches_once_and_seeds_fragment_cache(monkeypatch):
+    """Details, credits and videos come from one append_to_response call cached as one record"""
+    calls = []
+    def get_movie_full(movie_id):
+        calls.append(movie_id)
+        return {
+            "id": movie_id, "title": "Heat", "overview": "o", "poster_path": None, "release_date": "1995-12-15",
+            "vote_average": 7.9, "genres": [{"id": 80, "name": "Crime"}],
+            "credits": {"cast": [{"id": 1, "name": "Al Pacino", "character": "Hanna", "profile_path": None}],
+                        "crew": []},
+            "videos": {"results": [{"id": "v", "key": "k", "name": "Trailer", "site": "YouTube", "type": "Trailer"}]}
+        }
+    monkeypatch.setattr(movies.tmdb_service, "get_movie_full", get_movie_full)
+    movies.movie_bundles.clear()
+
+    bundle = movies.movie_bundle(949)
+    assert movies.movie_bundle(949) is bundle
+    assert calls == [949]
+    assert orjson.loads(bundle["movie"])["genres"] == ["Crime"]
+    assert orjson.loads(bundle["credits"])["cast"][0]["character"] == "Hanna"
+    assert orjson.loads(bundle["videos"])[0]["key"] == "k"
+
+    # Recommendation enrichment reuses the details without another call
+    assert movies.movie_fragment_by_id(949) == bundle["movie"]
+    assert calls == [949]
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+import pytest
+from pydantic import ValidationError
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.api.services import recommendation
+from app.api.services.pagination import decode_cursor, encode_cursor, query_fingerprint
+from app.api.services.recommendation import get_ranked_list
+from app.core.config import settings
+from main import RecommendationRequest
+
+class FakeRecommender:
+    """Counts ranking calls; returns a ranked list of n items"""
+
+    def __init__(self, version):
+        self.version = version
+        self.calls = 0
+
+    def get_recommendations(self, user_id, n_recommendations, timings=None, **filters):
+        self.calls += 1
+        if timings is not None:
+            timings.update(retrieval=0.001, rerank=0.002)
+        return [{"movieId": i, "tier": "personalized"} for i in range(n_recommendations)]
+
+def test_cursor_round_trip_and_rejects_garbage():
+    """Cursors are opaque but carry version, offset and query fingerprint"""
+    fingerprint = query_fingerprint(7, ["comedy"], None, 1990, None, False)
+    assert fingerprint == query_fingerprint(7, ["comedy"], None, 1990, None, False)
+    assert fingerprint != query_fingerprint(8, ["comedy"], None, 1990, None, False)
+    cursor = encode_cursor("20240101T000000Z", 16, fingerprint)
+    assert decode_cursor(cursor) == ("20240101T000000Z", 16, fingerprint)
+    for garbage in ("", "not a cursor", encode_cursor("v", -1, fingerprint)):
+        with pytest.raises(ValueError):
+            decode_cursor(garbage)
+
+def test_ranked_list_is_computed_once_and_survives_a_model_swap(monkeypatch):
+    """Pages slice one cached ranking; cursors of the previous model keep their list until it expires"""
+    monkeypatch.setattr(recommendation.settings, "RANKED_LIST_SIZE", 50)
+    recommendation.ranked_list_cache.clear()
+    recommendation.pipeline_timings.clear()
+    old = FakeRecommender("v1")
+    first = get_ranked_list(old, "q", 7)
+    assert len(first) == 50 and get_ranked_list(old, "q", 7, version="v1") is first
+    assert old.calls == 1
+    # Computed rankings report their stage timings; cache hits don't
+    assert {stage: stats["count"] for stage, stats in recommendation.pipeline_timings.stats().items()} == \
+        {"retrieval": 1, "rerank": 1}
+
+    new = FakeRecommender("v2")
+    assert get_ranked_list(new, "q", 7, version="v1") is first
+    assert get_ranked_list(new, "q", 7, version="v0") is None
+    assert new.calls == 0
+    recommendation.ranked_list_cache.clear()
+
+def test_recommendation_page_size_is_validated():
+    """Empty, negative and oversized pages are rejected instead of looping cursors or being capped"""
+    assert RecommendationRequest(user_id=1).limit == 10
+    assert RecommendationRequest(user_id=1, limit=settings.RANKED_LIST_SIZE).limit == settings.RANKED_LIST_SIZE
+    for limit in (0, -3, settings.RANKED_LIST_SIZE + 1):
+        with pytest.raises(ValidationError):
+            RecommendationRequest(user_id=1, limit=limit)
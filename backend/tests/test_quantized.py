@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.models.als import ALSRecommender
+from app.models.candidates import CandidateGenerator
+from app.models.hybrid import HybridRecommender
+from app.models.quantized import QuantizedFactors
+
+def test_quantized_scan_approximates_scores_and_reranks_to_exact_top_k():
+    """Int8 scores are close to the float ones; re-ranking a wider quantized top list recovers the exact top k"""
+    rng = np.random.default_rng(0)
+    factors = rng.standard_normal((5000, 32)).astype(np.float32)
+    users = rng.standard_normal((20, 32)).astype(np.float32)
+    quantized = QuantizedFactors(block_size=1000).fit(factors)
+
+    assert quantized.codes.dtype == np.int8
+    assert quantized.nbytes < factors.nbytes / 3
+    exact, approximate = factors @ users[0], quantized.scores(users[0])
+    assert np.abs(exact - approximate).max() < 0.05 * np.abs(exact).max()
+
+    report = quantized.evaluate(factors, users, k=50, rerank=200)
+    assert report["recall_at_k"] == 1.0
+    assert report["quantized_mib"] < report["exact_mib"]
+
+def test_hybrid_with_quantized_factors_ranks_like_exact_path():
+    """Retrieval on int8 factors with exact re-scoring returns the same recommendations and scores"""
+    movies_df = pd.DataFrame({
+        "movieId": [10, 20, 30, 40, 50, 60],
+        "title": ["Alien (1979)", "Aliens (1986)", "Heat (1995)", "Up (2009)", "Cars (2006)", "Ran (1985)"],
+        "genres": ["Horror|Sci-Fi", "Horror|Sci-Fi", "Crime", "Animation", "Animation", "Drama|War"],
+    })
+    ratings = csr_matrix(np.array([
+        [5, 0, 1, 0, 0, 0],
+        [0, 3, 5, 4, 4, 0],
+        [0, 1, 4, 5, 5, 2],
+        [4, 5, 0, 0, 1, 5],
+    ], dtype=np.float32))
+    features = csr_matrix(np.eye(6, dtype=np.float32))
+    recommendations = []
+    for quantize in (False, True):
+        recommender = HybridRecommender(
+            collab_model=ALSRecommender(n_factors=3, iterations=5, n_jobs=1),
+            candidate_generator=CandidateGenerator(collab_budget=6, content_budget=0, popular_budget=0),
+            quantize_factors=quantize
+        )
+        recommender.fit(movies_df, (ratings, [1, 2, 3, 4], list(movies_df["movieId"])),
+                        {mid: i for i, mid in enumerate(movies_df["movieId"])},
+                        dict(enumerate(movies_df["movieId"])), content_features=(features, None))
+        recommendations.append(recommender.get_recommendations(1, 4))
+
+    exact, quantized = recommendations
+    assert [rec["movieId"] for rec in quantized] == [rec["movieId"] for rec in exact]
+    assert np.allclose([rec["collab_score"] for rec in quantized], [rec["collab_score"] for rec in exact])
+    assert recommender.quantized_factors.report["recall_at_k"] == 1.0
@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+import numpy as np
+import orjson
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.api.routes import movies
+from app.api.services.tmdb import TMDBUnavailableError
+from app.data.id_mapper import MovieIdMapper
+from app.data.search_index import TitleSearchIndex, display_title, normalize_tokens
+from app.models.collaborative import CollaborativeRecommender
+from app.models.hybrid import HybridRecommender
+
+MOVIES_DF = pd.DataFrame({
+    "movieId": [1, 2, 3, 4],
+    "title": ["Toy Story (1995)", "Toy Story 2 (1999)", "Matrix, The (1999)", "Amélie (2001)"],
+    "genres": ["Animation|Comedy", "Animation|Comedy", "Action|Sci-Fi", "Comedy|Romance"],
+})
+RATINGS_DF = pd.DataFrame({"userId": [1, 2, 3, 1, 1, 2, 3], "movieId": [1, 1, 1, 2, 3, 3, 4],
+                           "rating": [5, 4, 5, 3, 5, 4, 4]})
+
+def _mapper():
+    return MovieIdMapper.from_arrays([1, 2, 3, 4], [862, 863, 603, 194])
+
+def _build_index():
+    return TitleSearchIndex().build(MOVIES_DF, _mapper(), RATINGS_DF)
+
+def test_title_normalization():
+    """Articles are restored and accents stripped"""
+    assert display_title("Matrix, The (1999)") == "The Matrix (1999)"
+    assert normalize_tokens("Amélie: Le Fabuleux!") == ["amelie", "le", "fabuleux"]
+
+def test_prefix_search_returns_tmdb_ids():
+    """The last token is a prefix and popularity breaks ties"""
+    index = _build_index()
+    results = index.search("toy st")
+    assert [r["id"] for r in results] == [862, 863]
+    assert index.search("the matr")[0]["title"] == "The Matrix (1999)"
+
+def test_fuzzy_search_tolerates_typos():
+    """Misspelled tokens match through the trigram index"""
+    index = _build_index()
+    assert index.search("amelei")[0]["movieId"] == 4
+    assert index.search("matirx")[0]["id"] == 603
+    assert index.search("zzzz") == []
+
+def test_complete_only_rejects_typo_and_partial_matches():
+    """Only titles containing every query token count as a confident local answer"""
+    index = _build_index()
+    assert [r["id"] for r in index.search("toy st", complete_only=True)] == [862, 863]
+    assert index.search("matirx", complete_only=True) == []
+    # "toy" matches but no title contains "matrix" too
+    assert index.search("toy matrix")
+    assert index.search("toy matrix", complete_only=True) == []
+
+def test_search_route_uses_one_source_per_query(monkeypatch):
+    """Complete local matches answer every page; typos go to TMDB, with local stand-ins only while it is down"""
+    index = _build_index()
+    calls = []
+    def search_movies(query, page):
+        calls.append((query, page))
+        return {"results": [{"id": 9, "title": "The Matrix", "overview": "o", "poster_path": None,
+                             "release_date": "1999-03-30", "vote_average": 8.2, "genre_ids": []}]}
+    monkeypatch.setattr(movies, "get_search_index", lambda: index)
+    monkeypatch.setattr(movies.tmdb_service, "search_movies", search_movies)
+    monkeypatch.setattr(movies, "cache", {})
+    movies.movie_fragments.put(863, orjson.dumps({"overview": "o", "poster_path": "/p.jpg",
+                                                   "release_date": "1999-11-24", "vote_average": 7.6}))
+
+    first = orjson.loads(movies._search_movies("toy st", 1, None).body)
+    assert [m["id"] for m in first] == [862, 863] and first[0]["year"] == 1995
+    assert first[1]["poster_path"] == "/p.jpg" and first[0]["poster_path"] is None
+    assert orjson.loads(movies._search_movies("toy st", 2, None).body) == []
+    assert calls == []
+
+    assert [m["id"] for m in orjson.loads(movies._search_movies("matirx", 1, None).body)] == [9]
+    assert calls == [("matirx", 1)]
+
+    def unavailable(query, page):
+        raise TMDBUnavailableError()
+    monkeypatch.setattr(movies.tmdb_service, "search_movies", unavailable)
+    response = movies._search_movies("amelei", 1, None)
+    assert response.headers["X-Degraded"] == "tmdb"
+    assert [m["id"] for m in orjson.loads(response.body)] == [194]
+
+def test_index_built_from_the_model_matches_the_dataset_files():
+    """Titles, popularity and MovieLens ratings come from the model's metadata store and ratings"""
+    ratings = csr_matrix((RATINGS_DF["rating"].astype(np.float32), (RATINGS_DF["userId"] - 1,
+                          RATINGS_DF["movieId"] - 1)), shape=(3, 4))
+    recommender = HybridRecommender(collab_model=CollaborativeRecommender(n_components=1), item_model=None)
+    recommender.fit(MOVIES_DF, (ratings, [1, 2, 3], [1, 2, 3, 4]),
+                    {mid: i for i, mid in enumerate(MOVIES_DF["movieId"])},
+                    dict(enumerate(MOVIES_DF["movieId"])), content_features=(csr_matrix(np.eye(4)), None))
+
+    from_model = TitleSearchIndex().build_from_model(recommender, _mapper())
+    from_files = _build_index()
+    for query in ("toy st", "the matr", "amelei"):
+        assert from_model.search(query) == from_files.search(query)
+    assert from_model.most_popular() == from_files.most_popular()
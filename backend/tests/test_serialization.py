@@ -0,0 +1,47 @@
+import sys
+import json
+from pathlib import Path
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.api.serialization import (
+    NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE, FragmentCache, dumps, encode_array, encode_event, extend_fragment,
+    stream_media_type
+)
+
+def test_fragments_assemble_valid_json():
+    """Pre-encoded objects can be extended and joined without decoding"""
+    fragment = dumps({"id": 1, "title": "Toy Story"})
+    extended = extend_fragment(fragment, {"score": np.float32(0.5)})
+    assert json.loads(encode_array([extended, fragment])) == [
+        {"id": 1, "title": "Toy Story", "score": 0.5},
+        {"id": 1, "title": "Toy Story"},
+    ]
+    assert extend_fragment(b"{}", {"a": 1}) == dumps({"a": 1})
+
+def test_fragment_cache_encodes_once_and_evicts():
+    """Builds run only on misses and the cache stays bounded"""
+    calls = []
+    cache = FragmentCache(max_entries=2, ttl=60)
+    build = lambda: calls.append(1) or {"n": len(calls)}
+    assert cache.get("a", build) == cache.get("a", build) == b'{"n":1}'
+    cache.get("b", build)
+    cache.get("c", build)
+    assert len(cache) == 2
+    assert len(calls) == 3
+
+def test_stream_events_frame_encoded_fragments():
+    """Accept selects the stream format; NDJSON lines and SSE events wrap fragments as-is"""
+    assert stream_media_type(None) is None
+    assert stream_media_type("application/json") is None
+    assert stream_media_type("text/event-stream") == SSE_MEDIA_TYPE
+    assert stream_media_type("application/x-ndjson, */*") == NDJSON_MEDIA_TYPE
+
+    fragment = dumps({"id": 1, "title": "Line\nbreak"})
+    line = encode_event("recommendation", fragment, NDJSON_MEDIA_TYPE)
+    assert line.endswith(b"\n") and line.count(b"\n") == 1
+    assert json.loads(line) == {"event": "recommendation", "data": {"id": 1, "title": "Line\nbreak"}}
+    event = encode_event("end", b"{}", SSE_MEDIA_TYPE)
+    assert event == b"event: end\ndata: {}\n\n"
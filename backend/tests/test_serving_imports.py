@@ -0,0 +1,18 @@
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+def test_serving_imports_skip_sklearn_and_pandas():
+    """The API process only needs NumPy/SciPy; sklearn and pandas stay training-only"""
+    code = (
+        "import sys, time; started = time.perf_counter(); import main; "
+        "print(round(time.perf_counter() - started, 3)); "
+        "print(sorted(m for m in ('sklearn', 'pandas') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True)
+    import_seconds, heavy_modules = result.stdout.strip().splitlines()[-2:]
+    print(f"import main: {import_seconds}s")
+    assert heavy_modules == "[]"
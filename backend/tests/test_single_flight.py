@@ -0,0 +1,53 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pytest
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.api.services.single_flight import SingleFlightCache
+
+def test_concurrent_calls_share_one_computation():
+    """A burst of identical calls computes once and is then cached"""
+    cache = SingleFlightCache(ttl=60)
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return [{"movieId": 1}]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        first = pool.submit(cache.get, "user-1", compute)
+        started.wait()
+        followers = [pool.submit(cache.get, "user-1", compute) for _ in range(7)]
+        results = [first.result()] + [f.result() for f in followers]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.get("user-1", compute) is results[0]
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] + stats["hits"] == 8
+
+def test_errors_are_shared_but_not_cached():
+    """A failed computation raises for its callers and is retried next time"""
+    cache = SingleFlightCache(ttl=60)
+
+    def fail():
+        raise ValueError("User ID 7 not found.")
+
+    with pytest.raises(ValueError):
+        cache.get(7, fail)
+    assert cache.get(7, lambda: "ok") == "ok"
+
+def test_zero_ttl_only_coalesces():
+    """With ttl=0 finished results are not kept"""
+    cache = SingleFlightCache(ttl=0)
+    assert cache.get("k", lambda: 1) == 1
+    assert cache.get("k", lambda: 2) == 2
+    assert cache.stats()["size"] == 0
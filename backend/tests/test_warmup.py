@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.api.services.warmup import touch_model_arrays
+
+class Part:
+    def __init__(self, **arrays):
+        self.__dict__.update(arrays)
+
+def test_touch_model_arrays_walks_nested_models():
+    """Arrays on sub-models and inside sparse matrices are touched once each"""
+    factors = np.ones((10, 4), dtype=np.float32)
+    tfidf = csr_matrix(np.eye(3, dtype=np.float64))
+    model = Part(
+        collab_model=Part(user_factors=factors, movie_factors=factors),
+        content_model=Part(tfidf_matrix=tfidf),
+        titles=np.array(["a", "b"], dtype=object)
+    )
+    expected = factors.nbytes + tfidf.data.nbytes + tfidf.indices.nbytes + tfidf.indptr.nbytes
+    assert touch_model_arrays(model) == expected
@@ -76,6 +76,21 @@ const ApiService = {    /**
             });
     },
 
+    /**
+     * Get movie details, credits and videos in one request
+     * @param {number} movieId - Movie ID
+     * @returns {Promise} - Promise with {movie, credits, videos}
+     */
+    getMovieFull: function(movieId) {
+        return fetch(`${API_BASE_URL}/movies/${movieId}/full`)
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Network response was not ok');
+                }
+                return response.json();
+            });
+    },
+
     /**
      * Get movie credits (cast and crew) by movie ID
      * @param {number} movieId - Movie ID
@@ -138,7 +153,116 @@ const ApiService = {    /**
             throw error;
         });
     },
-    
+
+    /**
+     * Stream personalized recommendations, each delivered as soon as its details are loaded
+     * @param {number} userId - User ID
+     * @param {number} limit - Number of recommendations to get
+     * @param {Function} onMovie - Called with each movie; movie.rank is its position in the ranking
+     * @param {AbortSignal} signal - Optional abort signal
+     * @returns {Promise} - Promise with {count, next_cursor} once the stream ends
+     */
+    streamRecommendations: async function(userId, limit = 10, onMovie = () => {}, signal = undefined) {
+        const response = await fetch(`${API_BASE_URL}/recommendations`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'application/x-ndjson'
+            },
+            body: JSON.stringify({
+                user_id: userId,
+                limit: limit
+            }),
+            signal
+        });
+        if (!response.ok) {
+            throw new Error(`Network response was not ok: ${response.status} ${response.statusText}`);
+        }
+
+        // Each line is {"event": ..., "data": ...}
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            buffered += decoder.decode(value || new Uint8Array(), { stream: !done });
+            const lines = buffered.split('\n');
+            buffered = lines.pop();
+            for (const line of lines) {
+                if (!line.trim()) continue;
+                const { event, data } = JSON.parse(line);
+                if (event === 'recommendation') {
+                    onMovie(data);
+                } else if (event === 'end') {
+                    return data;
+                } else if (event === 'error') {
+                    throw new Error(data.detail);
+                }
+            }
+            if (done) {
+                throw new Error('Recommendation stream ended unexpectedly');
+            }
+        }
+    },
+
+    /**
+     * Stream the user dashboard, section by section as the server computes them
+     * @param {number} userId - User ID
+     * @param {Function} onSection - Called with (name, data) for each section
+     * @returns {Promise} - Resolves when every section has arrived
+     */
+    streamUserDashboard: function(userId, onSection) {
+        const sections = ['recommendations', 'genre_preferences', 'user_factors', 'similar_users',
+                          'content_keywords', 'because_you_watched', 'model_version'];
+        return new Promise((resolve, reject) => {
+            const source = new EventSource(`${API_BASE_URL}/dashboard/user/${userId}`);
+            sections.forEach(name => {
+                source.addEventListener(name, event => onSection(name, JSON.parse(event.data)));
+            });
+            source.addEventListener('end', () => {
+                source.close();
+                resolve();
+            });
+            source.addEventListener('error', event => {
+                // Close instead of letting EventSource reconnect and recompute the dashboard
+                source.close();
+                reject(new Error(event.data ? JSON.parse(event.data).detail : 'Dashboard stream failed'));
+            });
+        });
+    },
+
+    /**
+     * Get one page of personalized recommendations
+     * @param {number} userId - User ID
+     * @param {number} limit - Page size
+     * @param {string|null} cursor - nextCursor of the previous page, null for the first page
+     * @returns {Promise} - Promise with {movies, nextCursor}; nextCursor is null on the last page
+     */
+    getRecommendationsPage: function(userId, limit = 10, cursor = null) {
+        return fetch(`${API_BASE_URL}/recommendations`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                user_id: userId,
+                limit: limit,
+                cursor: cursor
+            })
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`Network response was not ok: ${response.status} ${response.statusText}`);
+            }
+            const nextCursor = response.headers.get('X-Next-Cursor');
+            return response.json().then(movies => ({ movies, nextCursor }));
+        })
+        .catch(error => {
+            console.error('Error fetching recommendations page:', error);
+            throw error;
+        });
+    },
+
     /**
      * Get user dashboard data with recommendation analysis
      * @param {number} userId - User ID
@@ -82,19 +82,21 @@ document.addEventListener('DOMContentLoaded', function() {
         // Xóa nội dung biểu đồ cũ trước khi tải dữ liệu mới
         resetCharts();
         
-        // Fetch dashboard data
-        ApiService.getUserDashboard(userId)
-            .then(data => {
-                // Hide loading and show content
-                loadingSection.classList.add('hidden');
-                dashboardContent.classList.remove('hidden');
-
-                // Render dashboard components
-                renderGenrePreferences(data.genre_preferences);
-                renderContentKeywords(data.content_keywords);
-                renderUserFactors(data.user_factors);
-                renderRecommendations(data.recommendations);
-            })
+        // Stream dashboard data; each section renders as soon as the server sends it
+        const renderers = {
+            recommendations: renderRecommendations,
+            genre_preferences: renderGenrePreferences,
+            content_keywords: renderContentKeywords,
+            user_factors: renderUserFactors
+        };
+        ApiService.streamUserDashboard(userId, (name, data) => {
+            // Hide loading and show content with the first section
+            loadingSection.classList.add('hidden');
+            dashboardContent.classList.remove('hidden');
+            if (renderers[name]) {
+                renderers[name](data);
+            }
+        })
             .catch(error => {
                 console.error('Error loading dashboard:', error);
                 loadingSection.classList.add('hidden');
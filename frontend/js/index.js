@@ -114,18 +114,25 @@ function loadRecommendationsPreview(userId) {
         </div>
     `;
 
-    // Fetch recommendations with abort support
-    ApiService.getRecommendations(userId, 4, currentRecommendationAbortController.signal)
-        .then(recommendations => {
-            // If aborted, do nothing
-            if (!recommendations) return;
+    // Stream recommendations with abort support; each card appears as soon as its movie is loaded
+    const received = [];
+    ApiService.streamRecommendations(userId, 4, movie => {
+        if (!received.length) {
+            recommendationsContainer.innerHTML = '';
+        }
+        appendRecommendationCard(movie, received, recommendationsContainer);
+    }, currentRecommendationAbortController.signal)
+        .then(() => {
+            if (!received.length) {
+                renderRecommendationsPreview(received, recommendationsContainer);
+                return;
+            }
             // Save to cache
             localStorage.setItem(RECOMMENDATION_CACHE_KEY, JSON.stringify({
                 userId: userId,
-                data: recommendations,
+                data: received,
                 timestamp: Date.now()
             }));
-            renderRecommendationsPreview(recommendations, recommendationsContainer);
         })
         .catch(error => {
             if (error && error.name === 'AbortError') return; // Ignore abort errors
@@ -140,6 +147,24 @@ function loadRecommendationsPreview(userId) {
         });
 }
 
+/**
+ * Insert a streamed recommendation at its rank among the cards already shown
+ * @param {Object} movie - Recommended movie with its rank
+ * @param {Array} received - Movies shown so far, kept in rank order
+ * @param {HTMLElement} container - Cards container
+ */
+function appendRecommendationCard(movie, received, container) {
+    const position = received.findIndex(other => other.rank > movie.rank);
+    const movieCard = Utils.createMovieCard(movie, true);
+    if (position === -1) {
+        received.push(movie);
+        container.appendChild(movieCard);
+    } else {
+        received.splice(position, 0, movie);
+        container.insertBefore(movieCard, container.children[position]);
+    }
+}
+
 // Helper to render recommendations (same as before)
 function renderRecommendationsPreview(recommendations, container) {
     container.innerHTML = '';
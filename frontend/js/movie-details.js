@@ -84,12 +84,8 @@ function loadMovieDetails(movieId) {
         </div>
     `;
     
-    // Fetch movie details, credits, and videos in parallel for better performance
-    Promise.all([
-        ApiService.getMovieDetails(movieId),
-        ApiService.getMovieCredits(movieId),
-        ApiService.getMovieVideos(movieId)
-    ]).then(([movie, credits, videos]) => {
+    // Fetch movie details, credits, and videos in one request
+    ApiService.getMovieFull(movieId).then(({movie, credits, videos}) => {
         // Update page title with movie name
         document.title = `${movie.title} - MovieRex`;
         
@@ -106,9 +102,9 @@ function loadMovieDetails(movieId) {
                     <div class="d-flex align-items-center mb-2">
                         <div class="me-3">
                             <i class="fas fa-star text-warning"></i>
-                            <span>${movie.vote_average?.toFixed(1) || 'N/A'}</span>
+                            <span>${(movie.vote_average ?? movie.ml_rating_10)?.toFixed(1) || 'N/A'}</span>
                         </div>
-                        <div>${Utils.formatDate(movie.release_date)}</div>
+                        <div>${Utils.formatDate(movie.release_date, movie.year)}</div>
                     </div>
                     <div class="movie-detail-overview">
                         <h5>Overview</h5>
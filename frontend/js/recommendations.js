@@ -52,6 +52,7 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 let allRecommendations = [];
+let nextCursor = null;
 let currentPage = 1;
 const MOVIES_PER_PAGE = 8;
 const MAX_PAGES = 3;
@@ -90,7 +91,9 @@ function renderPaginationControls() {
     pagination.id = 'recommendation-pagination';
     pagination.className = 'd-flex justify-content-center my-4';
     
-    const totalPages = Math.min(Math.ceil(allRecommendations.length / MOVIES_PER_PAGE), MAX_PAGES);
+    // One page past the loaded ones while the server has more
+    const loadedPages = Math.ceil(allRecommendations.length / MOVIES_PER_PAGE);
+    const totalPages = Math.min(loadedPages + (nextCursor ? 1 : 0), MAX_PAGES);
     pagination.innerHTML = Array.from({length: totalPages}, (_, i) => i + 1)
         .map(page => `
             <button class="btn btn-sm ${page === currentPage ? 'btn-primary' : 'btn-outline-primary'} mx-1" 
@@ -98,8 +101,18 @@ function renderPaginationControls() {
         `).join('');
 
     pagination.querySelectorAll('button').forEach(btn => {
-        btn.addEventListener('click', () => {
-            currentPage = parseInt(btn.dataset.page);
+        btn.addEventListener('click', async () => {
+            const page = parseInt(btn.dataset.page);
+            if (page * MOVIES_PER_PAGE > allRecommendations.length && nextCursor) {
+                // Fetch only the next page; the server continues its cached ranking
+                try {
+                    await loadNextPage(Utils.getCurrentUser().id);
+                } catch (error) {
+                    console.error('Error loading more recommendations:', error);
+                    return;
+                }
+            }
+            currentPage = page;
             renderRecommendationsPage(currentPage);
         });
     });
@@ -109,11 +122,45 @@ function renderPaginationControls() {
     }
 }
 
+function toRecommendation(rec) {
+    return {
+        id: rec.movieId ?? rec.id,
+        title: rec.title,
+        poster_path: rec.poster_path,
+        vote_average: rec.vote_average,
+        ml_rating_10: rec.ml_rating_10, // MovieLens mean rating x2, shown when TMDB has no vote average
+        genres: rec.genres,
+        release_date: rec.release_date,
+        content_score: rec.content_score,
+        collab_score: rec.collab_score,
+        final_score: rec.final_score,
+        content_weight: rec.content_weight,
+        collab_weight: rec.collab_weight
+    };
+}
+
+async function loadNextPage(userId) {
+    if (isLoading) return;
+    isLoading = true;
+    try {
+        const page = await ApiService.getRecommendationsPage(userId, MOVIES_PER_PAGE, nextCursor);
+        // Pages arrive in ranked order, so appending keeps earlier pages stable
+        allRecommendations = allRecommendations.concat(
+            page.movies
+                .filter(rec => rec && (rec.content_score || rec.collab_score || rec.final_score))
+                .map(toRecommendation)
+        );
+        nextCursor = page.nextCursor;
+        recommendationsCache.set({ movies: allRecommendations, nextCursor });
+    } finally {
+        isLoading = false;
+    }
+}
+
 async function loadRecommendations(userId) {
     const recommendationsContainer = document.getElementById('recommendation-list');
     if (!recommendationsContainer || isLoading) return;
     
-    isLoading = true;
     recommendationsContainer.innerHTML = `
         <div class="col-12 text-center py-5">
             <div class="spinner-border text-primary" role="status">
@@ -126,14 +173,17 @@ async function loadRecommendations(userId) {
         // Check cache first
         const cachedData = recommendationsCache.get();
         if (cachedData) {
-            allRecommendations = cachedData;
+            allRecommendations = cachedData.movies;
+            nextCursor = cachedData.nextCursor;
             renderRecommendationsPage(currentPage);
             return;
         }
 
-        const recommendations = await ApiService.getRecommendations(userId, MOVIES_PER_PAGE * MAX_PAGES);
+        allRecommendations = [];
+        nextCursor = null;
+        await loadNextPage(userId);
         
-        if (!recommendations?.length) {
+        if (!allRecommendations.length) {
             recommendationsContainer.innerHTML = `
                 <div class="col-12 text-center py-5">
                     <p>No recommendations found for your profile.</p>
@@ -141,35 +191,6 @@ async function loadRecommendations(userId) {
             `;
             return;
         }
-
-        // Process recommendations in parallel
-        allRecommendations = await Promise.all(
-            recommendations
-                .filter(rec => rec && (rec.content_score || rec.collab_score || rec.final_score))
-                .map(async rec => ({
-                    id: rec.movieId ?? rec.id,
-                    title: rec.title,
-                    poster_path: rec.poster_path,
-                    vote_average: rec.vote_average,
-                    genres: rec.genres,
-                    release_date: rec.release_date,
-                    content_score: rec.content_score,
-                    collab_score: rec.collab_score,
-                    final_score: rec.final_score,
-                    content_weight: rec.content_weight,
-                    collab_weight: rec.collab_weight
-                }))
-        );
-
-        // Sort by match score
-        allRecommendations.sort((a, b) => {
-            const scoreA = (a.content_score * a.content_weight + a.collab_score * a.collab_weight) || a.final_score || 0;
-            const scoreB = (b.content_score * b.content_weight + b.collab_score * b.collab_weight) || b.final_score || 0;
-            return scoreB - scoreA;
-        });
-
-        // Cache the results
-        recommendationsCache.set(allRecommendations);
         
         currentPage = 1;
         renderRecommendationsPage(currentPage);
@@ -182,7 +203,5 @@ async function loadRecommendations(userId) {
                 </div>
             </div>
         `;
-    } finally {
-        isLoading = false;
     }
-}
\ No newline at end of file
+}
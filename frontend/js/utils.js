@@ -11,10 +11,11 @@ const Utils = {
     /**
      * Format date from YYYY-MM-DD to Month DD, YYYY
      * @param {string} dateString - Date string in format YYYY-MM-DD
+     * @param {number} [year] - Release year shown when there is no full date
      * @returns {string} - Formatted date string
      */
-    formatDate: function(dateString) {
-        if (!dateString) return 'Release date unknown';
+    formatDate: function(dateString, year) {
+        if (!dateString) return year ? String(year) : 'Release date unknown';
         
         const options = { year: 'numeric', month: 'long', day: 'numeric' };
         const date = new Date(dateString);
@@ -132,9 +133,9 @@ const Utils = {
                 </div>
                 <div class="movie-rating">
                     <i class="fas fa-star"></i>
-                    <span>${movie.vote_average?.toFixed(1) || 'N/A'}</span>
+                    <span>${(movie.vote_average ?? movie.ml_rating_10)?.toFixed(1) || 'N/A'}</span>
                 </div>
-                <p class="movie-release-date">${this.formatDate(movie.release_date)}</p>
+                <p class="movie-release-date">${this.formatDate(movie.release_date, movie.year)}</p>
         `;
         
         // Add recommendation metrics if applicable
@@ -211,12 +212,8 @@ const Utils = {
         
         modalInstance.show();
         
-        // Fetch movie details, credits, and videos
-        Promise.all([
-            ApiService.getMovieDetails(movieId),
-            ApiService.getMovieCredits(movieId),
-            ApiService.getMovieVideos(movieId)
-        ]).then(([movie, credits, videos]) => {
+        // Fetch movie details, credits, and videos in one request
+        ApiService.getMovieFull(movieId).then(({movie, credits, videos}) => {
             // Create modal content with movie details
             let modalHtml = `
                 <div class="movie-detail-header">
@@ -230,9 +227,9 @@ const Utils = {
                         <div class="d-flex align-items-center mb-2">
                             <div class="me-3">
                                 <i class="fas fa-star text-warning"></i>
-                                <span>${movie.vote_average?.toFixed(1) || 'N/A'}</span>
+                                <span>${(movie.vote_average ?? movie.ml_rating_10)?.toFixed(1) || 'N/A'}</span>
                             </div>
-                            <div>${this.formatDate(movie.release_date)}</div>
+                            <div>${this.formatDate(movie.release_date, movie.year)}</div>
                         </div>
                         <div class="movie-detail-overview">
                             <h5>Overview</h5>